@@ -0,0 +1,211 @@
+"""Base SQLite con las filas unificadas, indexada para consultas puntuales.
+
+normalize_and_merge.py la mantiene al día junto con validacion_unificado.csv
+(con --sqlite): una fila por respuesta unificada, con las 11 columnas del
+esquema como texto tal cual quedaron en el CSV, más el archivo de origen y la
+posición de la fila dentro de él (linaje). Hay índices por cédula, fecha de
+envío y profesión, así preguntas como "todas las respuestas de tal profesión
+desde tal fecha" o "¿esta cédula ya respondió?" se contestan con una búsqueda
+en el índice en lugar de volver a leer el CSV entero.
+
+    with Almacen("validacion_unificado.sqlite") as almacen:
+        df = almacen.consultar(profesion="Psicóloga", desde="2025-09-01")
+        almacen.envios_de("44587901")
+"""
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from esquema import COLUMNAS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ALMACEN_NAME = "validacion_unificado.sqlite"
+TABLA = "respuestas"
+# Cambiarla hace que la base se vuelva a crear desde cero
+VERSION_ESQUEMA = 1
+
+# Columna -> índice. La profesión se compara sin distinguir mayúsculas
+# ("Lic. en" y "Lic. En" son la misma), con el índice en esa misma collation
+INDICES = {
+    "cedula_profesional": "ix_respuestas_cedula",
+    "fecha_envio": "ix_respuestas_fecha",
+    "profesion_profesional": "ix_respuestas_profesion",
+}
+
+
+def _q(col: str) -> str:
+    # satisfaccion_diseño lleva ñ: siempre entre comillas
+    return '"' + col.replace('"', '""') + '"'
+
+
+class Almacen:
+    """Conexión a la base de respuestas unificadas"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._crear_esquema()
+
+    def __enter__(self) -> "Almacen":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _crear_esquema(self) -> None:
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        with self.conn:
+            if version != VERSION_ESQUEMA:
+                self.conn.execute(f"DROP TABLE IF EXISTS {TABLA}")
+                self.conn.execute("DROP TABLE IF EXISTS meta")
+            columnas = ", ".join(
+                f"{_q(c)} TEXT NOT NULL" + (" COLLATE NOCASE" if c == "profesion_profesional" else "")
+                for c in COLUMNAS
+            )
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABLA} ("
+                f"id TEXT PRIMARY KEY, {columnas}, archivo TEXT NOT NULL, fila INTEGER NOT NULL)"
+            )
+            for col, nombre in INDICES.items():
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {TABLA} ({_q(col)})")
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS ix_respuestas_origen ON {TABLA} (archivo, fila)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)")
+            self.conn.execute(f"PRAGMA user_version={VERSION_ESQUEMA}")
+
+    # --- Escritura (desde normalize_and_merge) ---
+
+    def _meta(self) -> Dict[str, str]:
+        return dict(self.conn.execute("SELECT clave, valor FROM meta"))
+
+    def en_sincronia(self, unificado: Union[str, Path]) -> bool:
+        """True si la base corresponde exactamente al CSV unificado actual"""
+        unificado = Path(unificado)
+        if not unificado.exists():
+            return False
+        st = unificado.stat()
+        meta = self._meta()
+        return meta.get("size") == str(st.st_size) and meta.get("mtime_ns") == str(st.st_mtime_ns)
+
+    def _marcar(self, unificado: Path) -> None:
+        st = unificado.stat()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)",
+            [("size", str(st.st_size)), ("mtime_ns", str(st.st_mtime_ns))],
+        )
+
+    def _insertar(self, ids: Iterable[str], filas: Sequence[Tuple[str, ...]], origenes: Sequence[Tuple[str, int]]) -> None:
+        columnas = ", ".join(_q(c) for c in COLUMNAS)
+        marcas = ", ".join("?" * (len(COLUMNAS) + 3))
+        # Una fila que ya estaba (mismo id) solo actualiza su linaje
+        self.conn.executemany(
+            f"INSERT INTO {TABLA} (id, {columnas}, archivo, fila) VALUES ({marcas}) "
+            "ON CONFLICT(id) DO UPDATE SET archivo = excluded.archivo, fila = excluded.fila",
+            ((i, *fila, archivo, n) for i, fila, (archivo, n) in zip(ids, filas, origenes)),
+        )
+
+    def reemplazar(
+        self,
+        ids: Iterable[str],
+        filas: Sequence[Tuple[str, ...]],
+        origenes: Sequence[Tuple[str, int]],
+        unificado: Union[str, Path],
+    ) -> None:
+        """Deja en la base exactamente estas filas, en una sola transacción"""
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {TABLA}")
+            self._insertar(ids, filas, origenes)
+            self._marcar(Path(unificado))
+
+    def agregar(
+        self,
+        ids: Iterable[str],
+        filas: Sequence[Tuple[str, ...]],
+        origenes: Sequence[Tuple[str, int]],
+        unificado: Union[str, Path],
+    ) -> None:
+        """Agrega (o actualiza) filas nuevas, en una sola transacción"""
+        with self.conn:
+            self._insertar(ids, filas, origenes)
+            self._marcar(Path(unificado))
+
+    def vaciar(self) -> None:
+        """Deja la base sin filas y sin CSV asociado (no hay unificado)"""
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {TABLA}")
+            self.conn.execute("DELETE FROM meta")
+
+    # --- Consultas ---
+
+    def _where(
+        self,
+        profesion: Optional[str] = None,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+        cedula: Optional[str] = None,
+        archivo: Optional[str] = None,
+    ) -> Tuple[str, List[str]]:
+        condiciones, params = [], []
+        if profesion is not None:
+            condiciones.append(f"{_q('profesion_profesional')} = ?")
+            params.append(profesion.strip())
+        # Las fechas se guardan como "YYYY-MM-DD HH:MM:SS": el orden del texto es el cronológico
+        if desde is not None:
+            condiciones.append(f"{_q('fecha_envio')} >= ?")
+            params.append(desde)
+        if hasta is not None:
+            condiciones.append(f"{_q('fecha_envio')} < ?")
+            params.append(hasta)
+        if cedula is not None:
+            condiciones.append(f"{_q('cedula_profesional')} = ?")
+            params.append(cedula.strip())
+        if archivo is not None:
+            condiciones.append("archivo = ?")
+            params.append(archivo)
+        return (" WHERE " + " AND ".join(condiciones)) if condiciones else "", params
+
+    def consultar(
+        self,
+        columnas: Optional[Iterable[str]] = None,
+        tipado: bool = True,
+        **filtros,
+    ) -> "pd.DataFrame":
+        """Filas que cumplen los filtros (profesion, desde, hasta, cedula, archivo), en el orden del unificado.
+
+        hasta es exclusivo. Con tipado=True se aplican los tipos del esquema,
+        igual que leer_csv.
+        """
+        import pandas as pd
+
+        from esquema import aplicar_tipos
+
+        pedidas = [c for c in COLUMNAS if columnas is None or c in set(columnas)]
+        where, params = self._where(**filtros)
+        cursor = self.conn.execute(f"SELECT {', '.join(_q(c) for c in pedidas)} FROM {TABLA}{where} ORDER BY rowid", params)
+        df = pd.DataFrame(cursor.fetchall(), columns=pedidas, dtype=str)
+        return aplicar_tipos(df) if tipado else df
+
+    def contar(self, **filtros) -> int:
+        where, params = self._where(**filtros)
+        return self.conn.execute(f"SELECT COUNT(*) FROM {TABLA}{where}", params).fetchone()[0]
+
+    def envios_de(self, cedula: str) -> List[Dict[str, object]]:
+        """Respuestas de una cédula con su origen: [{fecha_envio, archivo, fila, ...}]"""
+        where, params = self._where(cedula=cedula)
+        cursor = self.conn.execute(
+            f"SELECT {_q('nombre_profesional')}, {_q('profesion_profesional')}, {_q('fecha_envio')}, archivo, fila "
+            f"FROM {TABLA}{where} ORDER BY {_q('fecha_envio')}",
+            params,
+        )
+        claves = ["nombre_profesional", "profesion_profesional", "fecha_envio", "archivo", "fila"]
+        return [dict(zip(claves, r)) for r in cursor]
+
+    def filas_por_archivo(self) -> Dict[str, int]:
+        """Cuántas filas del unificado vienen de cada archivo"""
+        return dict(self.conn.execute(f"SELECT archivo, COUNT(*) FROM {TABLA} GROUP BY archivo"))
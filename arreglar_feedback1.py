@@ -1,26 +1,18 @@
 import pandas as pd
 
-# Leer con latin-1 para manejar encoding corrupto
-df = pd.read_csv('feedback1.csv', encoding='latin-1', dtype=str, keep_default_na=False)
+from esquema import COLUMNAS, escribir_csv, leer_csv
+from reparar_mojibake import reparar_frame
+
+# Leer con latin-1 para manejar encoding corrupto y reparar encabezados y celdas
+# (incluye el BOM leído como "ï»¿" y "satisfaccion_diseÃ±o")
+df = reparar_frame(leer_csv('feedback1.csv', encoding='latin-1', tipado=False))
 
 print("Columnas originales:")
 for i, col in enumerate(df.columns):
     print(f"{i}: {col}")
 
 # Mapear a estructura estándar
-cols_std = [
-    'nombre_profesional',
-    'utilidad', 
-    'eficiencia',
-    'intencion_uso',
-    'satisfaccion_claridad',
-    'satisfaccion_diseño', 
-    'modificar_secciones',
-    'comentarios',
-    'fecha_envio',
-    'cedula_profesional',
-    'profesion_profesional'
-]
+cols_std = COLUMNAS
 
 df_std = pd.DataFrame(columns=cols_std)
 
@@ -49,16 +41,6 @@ df_std['fecha_envio'] = df['fecha_envio']
 df_std['cedula_profesional'] = df['cedula_profesional']
 df_std['profesion_profesional'] = df['profesion_profesional']
 
-# Limpiar caracteres corruptos
-for col in df_std.columns:
-    if df_std[col].dtype == 'object':
-        df_std[col] = df_std[col].str.replace('Ã±', 'ñ', regex=False)
-        df_std[col] = df_std[col].str.replace('Ã¡', 'á', regex=False) 
-        df_std[col] = df_std[col].str.replace('Ã©', 'é', regex=False)
-        df_std[col] = df_std[col].str.replace('Ã­', 'í', regex=False)
-        df_std[col] = df_std[col].str.replace('Ã³', 'ó', regex=False)
-        df_std[col] = df_std[col].str.replace('Ãº', 'ú', regex=False)
-
 # Guardar
-df_std.to_csv('feedback1.csv', index=False, encoding='utf-8-sig')
+escribir_csv(df_std, 'feedback1.csv')
 print("✅ feedback1.csv arreglado y estandarizado")
\ No newline at end of file
@@ -1,5 +1,78 @@
-import pandas as pd
+import codecs
+import csv
+import io
 import os
+import time
+
+import pandas as pd
+
+from esquema import COLUMNAS, escribir_csv, leer_csv
+
+# Se prueban en este orden; latin-1 acepta cualquier byte y cierra la lista
+ENCODINGS = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
+
+# Bytes que se validan por vez al elegir el codec
+BLOQUE_VALIDACION = 1 << 16
+
+
+def decodificar(crudo, encodings=ENCODINGS):
+    """Devuelve (texto, encoding, intentos_fallidos) validando los bytes por bloques.
+
+    Un codec que no sirve se descarta en el primer bloque inválido, sin parsear
+    nada; el texto del que sirve ya queda decodificado.
+    """
+    fallidos = 0
+    for encoding in encodings:
+        decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+        partes = []
+        try:
+            for i in range(0, len(crudo), BLOQUE_VALIDACION):
+                partes.append(decoder.decode(crudo[i:i + BLOQUE_VALIDACION]))
+            partes.append(decoder.decode(b'', final=True))
+        except UnicodeDecodeError:
+            fallidos += 1
+            continue
+        return ''.join(partes), encoding, fallidos
+    raise UnicodeDecodeError(encodings[-1], crudo, 0, len(crudo), 'ningún encoding válido')
+
+
+def contar_columnas(texto):
+    """Cantidad de columnas del encabezado, sin parsear el resto del archivo"""
+    return len(next(csv.reader(io.StringIO(texto)), []))
+
+
+def cargar_csv(archivo):
+    """Lee un CSV con una sola lectura de bytes y una sola decodificación.
+
+    Devuelve (df, info). df es None si la estructura no es la esperada. info
+    trae el encoding elegido, los tiempos y una estimación del tiempo evitado
+    respecto de reintentar pd.read_csv con cada encoding: cada intento
+    fallido era un parseo completo, y un archivo con columnas de más o de
+    menos se parseaba entero antes de descartarlo.
+    """
+    inicio = time.perf_counter()
+    with open(archivo, 'rb') as f:
+        crudo = f.read()
+    texto, encoding, fallidos = decodificar(crudo)
+    info = {'encoding': encoding, 'columnas': contar_columnas(texto), 'bytes': len(crudo)}
+    info['t_decodificacion'] = time.perf_counter() - inicio
+
+    if info['columnas'] != len(COLUMNAS):
+        info['t_parseo'] = 0.0
+        info['parseos_evitados'] = fallidos + 1
+        return None, info
+
+    inicio = time.perf_counter()
+    # Sin tipar: el archivo se reescribe y un valor mal formado tiene que sobrevivir
+    df = leer_csv(io.StringIO(texto), tipado=False)
+    info['t_parseo'] = time.perf_counter() - inicio
+    info['parseos_evitados'] = fallidos
+    return df, info
+
+
+def tiempo_evitado(info, segundos_por_byte):
+    """Estimación del tiempo de los parseos que no se hicieron"""
+    return info['parseos_evitados'] * info['bytes'] * segundos_por_byte
 
 def arreglar_validacion_unificado():
     """Arregla el archivo validacion_unificado.csv usando los CSV individuales correctos"""
@@ -13,41 +86,48 @@ def arreglar_validacion_unificado():
     
     # Lista para almacenar todos los DataFrames
     dfs_unidos = []
+    resumen = []
+    bytes_parseados = 0
+    t_parseo = 0.0
     
     # Leer cada archivo CSV individual
     for archivo in archivos_csv:
         print(f"Procesando {archivo}...")
         
         try:
-            # Leer con diferentes codificaciones
-            df = None
-            encodings = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
+            df, info = cargar_csv(archivo)
+            resumen.append((archivo, info))
             
-            for encoding in encodings:
-                try:
-                    df = pd.read_csv(archivo, encoding=encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if df is not None and len(df.columns) == 11:
+            if df is not None:
                 dfs_unidos.append(df)
-                print(f"  {archivo}: OK - {len(df)} filas agregadas")
+                bytes_parseados += info['bytes']
+                t_parseo += info['t_parseo']
+                print(f"  {archivo}: OK - {len(df)} filas agregadas ({info['encoding']})")
             else:
-                print(f"  {archivo}: ERROR - estructura incorrecta")
+                print(f"  {archivo}: ERROR - estructura incorrecta "
+                      f"({info['columnas']} columnas, esperaba {len(COLUMNAS)})")
                 
         except Exception as e:
             print(f"  {archivo}: ERROR - {str(e)}")
     
+    # Tiempo evitado por archivo, con la velocidad de parseo medida en esta corrida
+    if resumen and bytes_parseados:
+        segundos_por_byte = t_parseo / bytes_parseados
+        print("\nTiempo evitado (parseos completos que no se hicieron):")
+        total = 0.0
+        for archivo, info in resumen:
+            evitado = tiempo_evitado(info, segundos_por_byte)
+            total += evitado
+            print(f"  {archivo}: {info['parseos_evitados']} parseo(s), ~{evitado * 1000:.2f} ms")
+        print(f"  Total: ~{total * 1000:.2f} ms")
+    
     # Unir todos los DataFrames
     if dfs_unidos:
         df_final = pd.concat(dfs_unidos, ignore_index=True)
         
         # Guardar el archivo unificado corregido
-        df_final.to_csv('validacion_unificado.csv', 
-                       index=False, 
-                       encoding='utf-8-sig',
-                       quoting=1)  # QUOTE_ALL para evitar problemas con comas
+        escribir_csv(df_final, 'validacion_unificado.csv',
+                     quoting=1)  # QUOTE_ALL para evitar problemas con comas
         
         print("=" * 50)
         print(f"ARCHIVO CORREGIDO EXITOSAMENTE!")
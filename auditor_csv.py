@@ -1,82 +1,163 @@
-import pandas as pd
+import argparse
+import io
+import json
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def verificar_estructura_csv(archivo_path):
+from almacen import ALMACEN_NAME, Almacen
+from esquema import COLUMNAS, leer_csv
+from instrumentacion import DESTINO_POR_DEFECTO, activa, activar, etapa, resumen
+
+# Secuencias típicas de UTF-8 leído como Latin-1/cp1252 (Ã±, Ã©, Â¿, â€œ...)
+MOJIBAKE_RE = re.compile("Ã|Â|â€")
+
+# Menos celdas con datos que esto marca la fila como incompleta
+MIN_CELDAS_VALIDAS = 5
+
+
+def auditar_archivo(archivo_path):
     """
-    Verifica si un CSV tiene la estructura correcta
+    Audita un CSV con una sola lectura de sus bytes y chequeos por columna.
+    Devuelve un dict serializable a JSON con los problemas encontrados.
     """
+    nombre = os.path.basename(archivo_path)
+    with etapa("auditoria", nombre) as medida:
+        resultado = _auditar(archivo_path, nombre)
+        medida.update(filas=resultado["filas"], bytes=os.path.getsize(archivo_path))
+    return resultado
+
+
+def _auditar(archivo_path, nombre):
+    resultado = {"archivo": nombre, "ok": False, "filas": 0, "problemas": []}
+    problemas = resultado["problemas"]
+
+    def agregar(tipo, mensaje, fila=None):
+        problemas.append({"tipo": tipo, "fila": fila, "mensaje": mensaje})
+
     try:
-        df = pd.read_csv(archivo_path, dtype=str)
-        
-        # Estructura esperada
-        columnas_esperadas = [
-            'nombre_profesional', 'utilidad', 'eficiencia', 'intencion_uso',
-            'satisfaccion_claridad', 'satisfaccion_diseño', 'modificar_secciones',
-            'comentarios', 'fecha_envio', 'cedula_profesional', 'profesion_profesional'
-        ]
-        
-        problemas = []
-        
-        # 1. Verificar número de columnas
-        if len(df.columns) != len(columnas_esperadas):
-            problemas.append(f"❌ Columnas incorrectas: tiene {len(df.columns)}, esperaba {len(columnas_esperadas)}")
-        
-        # 2. Verificar nombres de columnas
-        for col in columnas_esperadas:
-            if col not in df.columns:
-                problemas.append(f"❌ Falta columna: {col}")
-        
-        # 3. Verificar si se puede leer correctamente
-        if df.empty:
-            problemas.append("⚠️ Archivo vacío (solo headers)")
-        else:
-            # Verificar filas problemáticas
-            for i, row in df.iterrows():
-                if row.isna().all():
-                    problemas.append(f"❌ Fila {i+2} completamente vacía")
-                elif len([x for x in row if pd.notna(x) and str(x).strip()]) < 5:
-                    problemas.append(f"⚠️ Fila {i+2} tiene pocos datos válidos")
-        
-        # 4. Verificar encoding
-        try:
-            with open(archivo_path, 'r', encoding='utf-8') as f:
-                contenido = f.read()
-            if 'Ã' in contenido:
-                problemas.append("⚠️ Posible problema de encoding (caracteres Ã)")
-        except:
-            problemas.append("⚠️ Problema de encoding detectado")
-        
-        if not problemas:
-            return True, [f"✅ {os.path.basename(archivo_path)}: Estructura correcta ({len(df)} filas)"]
-        else:
-            return False, [f"📄 {os.path.basename(archivo_path)}:"] + problemas
-            
+        with open(archivo_path, 'rb') as f:
+            crudo = f.read()
+        texto = crudo.decode('utf-8-sig')
+        # Texto tal cual: un puntaje mal escrito ("muy", "x") cuenta como dato, no como vacío
+        df = leer_csv(io.StringIO(texto), tipado=False)
     except Exception as e:
-        return False, [f"❌ {os.path.basename(archivo_path)}: Error leyendo archivo - {e}"]
+        agregar("lectura", f"❌ {nombre}: Error leyendo archivo - {e}")
+        return resultado
+
+    resultado["filas"] = len(df)
+    columnas_esperadas = COLUMNAS
 
-def auditar_todos_los_csv():
+    # 1. Verificar número de columnas
+    if len(df.columns) != len(columnas_esperadas):
+        agregar("columnas", f"❌ Columnas incorrectas: tiene {len(df.columns)}, esperaba {len(columnas_esperadas)}")
+
+    # 2. Verificar nombres de columnas (faltantes y sobrantes)
+    for col in columnas_esperadas:
+        if col not in df.columns:
+            agregar("columna_faltante", f"❌ Falta columna: {col}")
+    for col in df.columns:
+        if col not in columnas_esperadas:
+            agregar("columna_extra", f"⚠️ Columna extra: {col}")
+
+    # 3. Filas vacías o con pocos datos, calculado por columna y no fila a fila
+    if df.empty:
+        agregar("vacio", "⚠️ Archivo vacío (solo headers)")
+    else:
+        # Las filas cortas traen NaN en las columnas que faltan
+        con_texto = df.apply(lambda c: c.fillna("").str.strip().ne(""))
+        vacias = ~con_texto.any(axis=1)
+        con_datos = con_texto.sum(axis=1)
+        pocas = ~vacias & (con_datos < MIN_CELDAS_VALIDAS)
+        # Solo se recorren las filas con problemas, en orden
+        for i in df.index[vacias | pocas]:
+            if vacias[i]:
+                agregar("fila_vacia", f"❌ Fila {i+2} completamente vacía", int(i) + 2)
+            else:
+                agregar("fila_incompleta", f"⚠️ Fila {i+2} tiene pocos datos válidos", int(i) + 2)
+
+    # 4. Verificar encoding sobre el mismo texto ya decodificado
+    if MOJIBAKE_RE.search(texto):
+        agregar("encoding", "⚠️ Posible problema de encoding (mojibake: Ã, Â o â€)")
+
+    resultado["ok"] = not problemas
+    return resultado
+
+
+def mensajes_de(resultado):
+    if resultado["ok"]:
+        return [f"✅ {resultado['archivo']}: Estructura correcta ({resultado['filas']} filas)"]
+    if resultado["problemas"] and resultado["problemas"][0]["tipo"] == "lectura":
+        return [resultado["problemas"][0]["mensaje"]]
+    return [f"📄 {resultado['archivo']}:"] + [p["mensaje"] for p in resultado["problemas"]]
+
+
+def verificar_estructura_csv(archivo_path):
     """
-    Audita todos los CSV de feedback
+    Verifica si un CSV tiene la estructura correcta
     """
-    archivos = ['feedback1.csv', 'feedback2.csv', 'feedback3.csv', 'feedback4.csv', 
-               'feedback5.csv', 'feedback6.csv', 'feedback7.csv']
-    
+    resultado = auditar_archivo(archivo_path)
+    return resultado["ok"], mensajes_de(resultado)
+
+
+def envios_registrados(sqlite, cedula):
+    """
+    Consulta en la base SQLite (normalize_and_merge.py --sqlite) si una cédula
+    ya respondió, con el archivo y la fila de cada respuesta
+    """
+    with Almacen(sqlite) as almacen:
+        envios = almacen.envios_de(cedula)
+    if not envios:
+        print(f"ℹ️ La cédula {cedula} no tiene respuestas en {sqlite}")
+    for e in envios:
+        print(f"📄 {e['fecha_envio']} {e['nombre_profesional']} ({e['profesion_profesional']}): "
+              f"{e['archivo']}, fila {e['fila'] + 2}")
+    return envios
+
+
+def filas_en_almacen(sqlite, resultados):
+    """
+    Para cada archivo auditado, cuántas de sus filas llegaron al unificado
+    según el linaje de la base (el resto se descartó como duplicado o vacío)
+    """
+    with Almacen(sqlite) as almacen:
+        por_archivo = almacen.filas_por_archivo()
+    print(f"🗄️ Filas en {sqlite} por archivo:")
+    for resultado in resultados:
+        unificadas = por_archivo.get(resultado["archivo"], 0)
+        resultado["filas_unificadas"] = unificadas
+        leido = not (resultado["problemas"] and resultado["problemas"][0]["tipo"] == "lectura")
+        print(f"   {resultado['archivo']}: {unificadas} de {resultado['filas'] if leido else '?'}")
+
+
+def auditar_todos_los_csv(directorio='.', patron='feedback*.csv', workers=1, json_path=None, sqlite=None):
+    """
+    Audita todos los CSV de feedback que encuentre el patrón
+    """
+    archivos = sorted(Path(directorio).glob(patron))
+
     print("🔍 AUDITORÍA DE ESTRUCTURA CSV")
     print("=" * 50)
-    
-    todos_ok = True
-    for archivo in archivos:
-        if os.path.exists(archivo):
-            ok, mensajes = verificar_estructura_csv(archivo)
-            for msg in mensajes:
-                print(msg)
-            if not ok:
-                todos_ok = False
-        else:
-            print(f"❌ {archivo}: No encontrado")
+
+    if workers > 1 and len(archivos) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(archivos) // (workers * 4))
+            resultados = list(pool.map(auditar_archivo, archivos, chunksize=chunksize))
+    else:
+        resultados = [auditar_archivo(a) for a in archivos]
+
+    todos_ok = bool(resultados)
+    for resultado in resultados:
+        for msg in mensajes_de(resultado):
+            print(msg)
+        if not resultado["ok"]:
             todos_ok = False
-    
+    if not archivos:
+        print(f"❌ No se encontraron archivos con el patrón {patron}")
+    if sqlite and resultados:
+        filas_en_almacen(sqlite, resultados)
+
     print("=" * 50)
     if todos_ok:
         print("🎉 ¡TODOS LOS CSV TIENEN ESTRUCTURA CORRECTA!")
@@ -84,8 +165,40 @@ def auditar_todos_los_csv():
     else:
         print("⚠️ Algunos CSV necesitan corrección")
         print("💡 Ejecuta el script de corrección correspondiente")
-    
+
+    if json_path:
+        reporte = {"ok": todos_ok, "archivos": resultados}
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f"📝 Reporte JSON: {json_path}")
+
     return todos_ok
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audita la estructura de los CSV de feedback")
+    parser.add_argument("--dir", default=".", help="carpeta con los CSV (por defecto la actual)")
+    parser.add_argument("--patron", default="feedback*.csv", help="glob de archivos a auditar")
+    parser.add_argument("--workers", type=int, default=1, help="procesos en paralelo (0 = todos los núcleos)")
+    parser.add_argument("--json", dest="json_path", help="guardar además un reporte JSON en esta ruta")
+    parser.add_argument("--metricas", nargs="?", const=DESTINO_POR_DEFECTO, metavar="RUTA",
+                        help=f"medir cada archivo en JSON Lines (por defecto {DESTINO_POR_DEFECTO}); también FEEDBACK_METRICAS")
+    parser.add_argument("--sqlite", nargs="?", const=ALMACEN_NAME, metavar="RUTA",
+                        help=f"base SQLite de normalize_and_merge.py --sqlite (por defecto {ALMACEN_NAME})")
+    parser.add_argument("--cedula", help="solo consultar en la base si esta cédula ya respondió (requiere --sqlite)")
+    args = parser.parse_args(argv)
+    if args.sqlite and not os.path.exists(args.sqlite):
+        parser.error(f"no existe la base {args.sqlite}: correr normalize_and_merge.py --sqlite")
+    if args.cedula:
+        if not args.sqlite:
+            parser.error("--cedula requiere --sqlite")
+        envios_registrados(args.sqlite, args.cedula)
+        return
+    if args.metricas:
+        activar(args.metricas)
+    auditar_todos_los_csv(args.dir, args.patron, args.workers or (os.cpu_count() or 1), args.json_path, args.sqlite)
+    if activa():
+        resumen()
+
+
 if __name__ == "__main__":
-    auditar_todos_los_csv()
\ No newline at end of file
+    main()
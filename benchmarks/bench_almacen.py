@@ -0,0 +1,75 @@
+"""Benchmark: consultas sobre la base SQLite vs. volver a leer el CSV unificado.
+
+Genera un corpus sintético, lo unifica con --sqlite y mide dos consultas
+típicas: respuestas de una profesión desde una fecha, y si una cédula ya
+respondió. Verifica que ambos caminos devuelvan las mismas filas.
+
+    python benchmarks/bench_almacen.py [--filas 200000] [--repeticiones 5]
+"""
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import normalize_and_merge as nm  # noqa: E402
+from almacen import Almacen  # noqa: E402
+from esquema import leer_csv  # noqa: E402
+from generar_corpus import generar_corpus  # noqa: E402
+
+
+def _mejor(fn, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        valor = fn()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos), valor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=200_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        generar_corpus(tmp, args.filas)
+        with contextlib.redirect_stdout(io.StringIO()):
+            nm.process_all(full=True, sqlite=tmp / "validacion_unificado.sqlite", base_dir=tmp)
+        unificado = tmp / "validacion_unificado.csv"
+        almacen = Almacen(tmp / "validacion_unificado.sqlite")
+        cedula = almacen.conn.execute("SELECT cedula_profesional FROM respuestas LIMIT 1 OFFSET 1000").fetchone()[0]
+
+        def por_profesion_csv():
+            df = leer_csv(unificado, tipado=False)
+            return df[(df["profesion_profesional"].str.lower() == "psicóloga") & (df["fecha_envio"] >= "2025-06-01")]
+
+        def por_cedula_csv():
+            df = leer_csv(unificado, columnas=["cedula_profesional", "fecha_envio"], tipado=False)
+            return df[df["cedula_profesional"] == cedula]
+
+        casos = [
+            ("profesión desde fecha", por_profesion_csv,
+             lambda: almacen.consultar(tipado=False, profesion="Psicóloga", desde="2025-06-01")),
+            ("cédula ya respondió", por_cedula_csv, lambda: almacen.envios_de(cedula)),
+        ]
+        print(f"{args.filas} filas generadas, {almacen.contar()} en el unificado")
+        print(f"{'Consulta':<24} {'CSV (s)':>9} {'SQLite (s)':>11} {'x':>8} {'filas':>7}")
+        for nombre, csv_fn, sql_fn in casos:
+            t_csv, filas_csv = _mejor(csv_fn, args.repeticiones)
+            t_sql, filas_sql = _mejor(sql_fn, args.repeticiones)
+            assert len(filas_csv) == len(filas_sql), (nombre, len(filas_csv), len(filas_sql))
+            print(f"{nombre:<24} {t_csv:>9.4f} {t_sql:>11.4f} {t_csv / max(t_sql, 1e-9):>8.0f} {len(filas_sql):>7}")
+        almacen.close()
+
+
+if __name__ == "__main__":
+    main()
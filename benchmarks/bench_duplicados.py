@@ -0,0 +1,112 @@
+"""Benchmark: duplicados cercanos con MinHash + LSH vs. comparar todos los pares.
+
+Arma respuestas con texto aleatorio (vocabulario de palabras inventadas) y
+agrega un porcentaje de reenvíos retocados: una palabra cambiada, quitada o
+agregada, tildes y mayúsculas distintas. Mide el tiempo de detectar() a
+varios tamaños y, en el más chico, compara los pares encontrados con los de
+la comparación exhaustiva de firmas (recall) y cuántos reenvíos plantados se
+recuperan.
+
+    python benchmarks/bench_duplicados.py [--tamanios 5000 50000 200000] [--umbral 0.8]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import duplicados_cercanos as dc  # noqa: E402
+
+SILABAS = ["ma", "pe", "ti", "lo", "su", "ra", "ne", "co", "vi", "da", "gu", "re", "so", "ña", "ción", "té"]
+
+
+def _vocabulario(rng: random.Random, n: int = 3000):
+    return ["".join(rng.choice(SILABAS) for _ in range(rng.randint(2, 4))) for _ in range(n)]
+
+
+def _retocar(rng: random.Random, texto: str, vocabulario) -> str:
+    palabras = texto.split()
+    cambio = rng.choice(["cambiar", "quitar", "agregar", "tildes"])
+    i = rng.randrange(len(palabras))
+    if cambio == "cambiar":
+        palabras[i] = rng.choice(vocabulario)
+    elif cambio == "quitar" and len(palabras) > 1:
+        del palabras[i]
+    elif cambio == "agregar":
+        palabras.insert(i, rng.choice(vocabulario))
+    else:
+        palabras = [p.upper() if rng.random() < 0.2 else p.replace("o", "ó") for p in palabras]
+    return " ".join(palabras)
+
+
+def frame_sintetico(filas: int, proporcion: float = 0.05, seed: int = 0):
+    """(df, pares plantados) con `proporcion` de filas que retocan una fila anterior"""
+    rng = random.Random(seed)
+    vocabulario = _vocabulario(rng)
+    comentarios, plantados = [], []
+    for i in range(filas):
+        if comentarios and rng.random() < proporcion:
+            j = rng.randrange(len(comentarios))
+            comentarios.append(_retocar(rng, comentarios[j], vocabulario))
+            plantados.append((j, i))
+        else:
+            comentarios.append(" ".join(rng.choice(vocabulario) for _ in range(rng.randint(12, 30))))
+    df = pd.DataFrame({"comentarios": comentarios, "modificar_secciones": [""] * filas})
+    return df, plantados
+
+
+def exhaustivo(firmas: np.ndarray, umbral: float, bloque: int = 256) -> set:
+    """Todos los pares (i < j) con similitud estimada >= umbral, comparando cada par"""
+    pares = set()
+    for inicio in range(0, len(firmas), bloque):
+        parte = firmas[inicio:inicio + bloque]
+        iguales = (parte[:, None, :] == firmas[None, :, :]).mean(axis=2)
+        for a, b in zip(*np.nonzero(iguales >= umbral)):
+            if inicio + a < b:
+                pares.add((inicio + a, b))
+    return pares
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanios", type=int, nargs="+", default=[5_000, 50_000, 200_000])
+    parser.add_argument("--umbral", type=float, default=0.8)
+    args = parser.parse_args()
+
+    for n, filas in enumerate(sorted(args.tamanios)):
+        df, plantados = frame_sintetico(filas)
+        t0 = time.perf_counter()
+        grupos = dc.detectar(df, umbral=args.umbral)
+        segundos = time.perf_counter() - t0
+        grupo_de = dict(zip(grupos["fila"], grupos["grupo"]))
+        recuperados = sum(1 for a, b in plantados if a in grupo_de and grupo_de.get(a) == grupo_de.get(b))
+        print(f"{filas:>8} filas  LSH {segundos:8.2f} s  {grupos['grupo'].nunique():>6} grupos  "
+              f"reenvíos plantados recuperados {recuperados}/{len(plantados)}")
+        if n:
+            continue
+
+        # Comparación exhaustiva sobre las mismas firmas (solo en el tamaño más chico)
+        texto = dc.textos_normalizados(df)
+        unicos = list(pd.unique(texto[texto.str.len() >= dc.MIN_CARACTERES]))
+        firmas = dc.MinHasher().firmas(unicos)
+        t0 = time.perf_counter()
+        todos = exhaustivo(firmas, args.umbral)
+        t_exhaustivo = time.perf_counter() - t0
+        bandas, filas_banda = dc.parametros_lsh(args.umbral, dc.NUM_PERM)
+        t0 = time.perf_counter()
+        candidatos = dc.pares_candidatos(firmas, bandas, filas_banda)
+        lsh = {tuple(p) for p, s in zip(candidatos.tolist(), dc.similitud(firmas, candidatos)) if s >= args.umbral}
+        t_lsh = time.perf_counter() - t0
+        recall = len(lsh & todos) / len(todos) if todos else 1.0
+        print(f"{'':>8}        exhaustivo {t_exhaustivo:.2f} s vs. bandas LSH {t_lsh:.3f} s "
+              f"({bandas}x{filas_banda}, {len(candidatos)} candidatos): recall {recall:.3f} "
+              f"({len(lsh & todos)}/{len(todos)} pares)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Compara la cascada de detect_encoding_info con el detector anterior (solo chardet).
+
+Arma un corpus en memoria a partir de los feedback*.csv del repo, re-codificado
+en UTF-8, UTF-8 con BOM, Latin-1, cp1252, UTF-16 y cp1251 (este último fuerza a
+la cascada a terminar en chardet), y mide tiempo por archivo y si el texto
+decodificado coincide con el original.
+
+    python benchmarks/bench_encoding.py [--repeat 5] [--json resultados.json]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from normalize_and_merge import BASE_DIR, _chardet_guess, detect_encoding_info  # noqa: E402
+
+CYRILLIC = "Отзыв о приложении: удобно, быстро и понятно.\n"
+
+
+def build_corpus(scale: int) -> List[Tuple[str, str, bytes]]:
+    # (nombre, texto original, bytes) para cada combinación archivo/encoding
+    texts = [p.read_text(encoding="utf-8-sig") for p in sorted(BASE_DIR.glob("feedback*.csv"))]
+    corpus: List[Tuple[str, str, bytes]] = []
+    for i, text in enumerate(texts):
+        text = text * scale
+        corpus.append((f"utf-8#{i}", text, text.encode("utf-8")))
+        corpus.append((f"utf-8-sig#{i}", text, text.encode("utf-8-sig")))
+        corpus.append((f"utf-16#{i}", text, text.encode("utf-16")))
+        latin = text.encode("latin-1", errors="replace").decode("latin-1")
+        corpus.append((f"latin-1#{i}", latin, latin.encode("latin-1")))
+        smart = latin.replace('"', "“", 1)
+        corpus.append((f"cp1252#{i}", smart, smart.encode("cp1252")))
+    cyr = CYRILLIC * 20 * scale
+    corpus.append(("cp1251", cyr, cyr.encode("cp1251")))
+    return corpus
+
+
+def legacy_guess(raw: bytes) -> str:
+    return _chardet_guess(raw[:65536]).encoding
+
+
+def cascade_guess(raw: bytes) -> str:
+    return detect_encoding_info(raw).encoding
+
+
+def run(detector: Callable[[bytes], str], corpus: List[Tuple[str, str, bytes]], repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _name, _text, raw in corpus:
+            detector(raw)
+        best = min(best, time.perf_counter() - t0)
+    correct = 0
+    for _name, text, raw in corpus:
+        try:
+            correct += raw.decode(detector(raw)) == text
+        except (UnicodeDecodeError, LookupError):
+            pass
+    return {"segundos": best, "ms_por_archivo": best * 1000 / len(corpus), "correctos": correct}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=int, default=1, help="repite cada texto N veces")
+    parser.add_argument("--json", type=Path, help="guardar resultados en este archivo")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.scale)
+    results = {
+        "archivos": len(corpus),
+        "chardet": run(legacy_guess, corpus, args.repeat),
+        "cascada": run(cascade_guess, corpus, args.repeat),
+    }
+    methods: Dict[str, int] = {}
+    for _name, _text, raw in corpus:
+        m = detect_encoding_info(raw).method
+        methods[m] = methods.get(m, 0) + 1
+    results["metodos_cascada"] = methods
+    results["aceleracion"] = results["chardet"]["segundos"] / max(results["cascada"]["segundos"], 1e-9)
+
+    print(f"Corpus: {len(corpus)} archivos")
+    for key in ("chardet", "cascada"):
+        r = results[key]
+        print(f"  {key:8s} {r['ms_por_archivo']:8.3f} ms/archivo  correctos={r['correctos']}/{len(corpus)}")
+    print(f"  métodos de la cascada: {methods}")
+    print(f"  aceleración: x{results['aceleracion']:.1f}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
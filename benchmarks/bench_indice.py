@@ -0,0 +1,120 @@
+"""Benchmark: índice invertido vs. recorrer todos los comentarios en cada consulta.
+
+Arma respuestas con texto aleatorio (palabras inventadas más algunas de los
+temas reales, con tildes y mayúsculas mezcladas) y mide: construir el índice,
+guardarlo y cargarlo, agregar un 1% de filas nuevas, y cada consulta contra
+dos recorridos lineales: el de informe_validacion.py (unidecode + `in` fila
+por fila) y str.contains sobre el texto ya normalizado. Verifica que el
+índice y el recorrido con expresiones regulares devuelvan las mismas filas.
+
+    python benchmarks/bench_indice.py [--filas 200000] [--repeticiones 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_duplicados import _vocabulario  # noqa: E402
+from clasificador import normalizar_textos  # noqa: E402
+from indice_texto import COLUMNAS_TEXTO, IndiceTexto  # noqa: E402
+
+TEMAS = [
+    "informe", "Informes", "imprimir", "PDF", "colores", "color", "contraste", "Entrevista inicial",
+    "diseño", "gráficos", "exportar", "información", "celular",
+]
+
+
+def _hay(normalizado, patron: str) -> np.ndarray:
+    """Filas donde alguna de las columnas normalizadas tiene el patrón"""
+    return np.logical_or.reduce([s.str.contains(patron).to_numpy() for s in normalizado.values()])
+
+
+# (nombre, consulta del índice, mismo criterio con expresiones regulares sobre todas las filas)
+CONSULTAS = [
+    ("palabra", "pdf", lambda t: _hay(t, r"\bpdf\b")),
+    ("prefijo", "color*", lambda t: _hay(t, r"\bcolor")),
+    ("frase", '"entrevista inicial"', lambda t: _hay(t, r"\bentrevista[^a-z0-9]+inicial\b")),
+    ("tema (OR)", "informe* OR imprimir*", lambda t: _hay(t, r"\binforme|\bimprimir")),
+    ("AND NOT", "pdf AND NOT exportar", lambda t: _hay(t, r"\bpdf\b") & ~_hay(t, r"\bexportar\b")),
+]
+
+
+def frame_sintetico(filas: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    vocabulario = _vocabulario(rng)
+
+    def texto() -> str:
+        if rng.random() < 0.05:
+            return ""
+        palabras = [rng.choice(vocabulario) for _ in range(rng.randint(5, 25))]
+        for _ in range(rng.randint(0, 2)):
+            palabras.insert(rng.randrange(len(palabras) + 1), rng.choice(TEMAS))
+        return " ".join(palabras).capitalize() + rng.choice([".", "", "!", "?"])
+
+    return pd.DataFrame({c: [texto() for _ in range(filas)] for c in COLUMNAS_TEXTO})
+
+
+def _mejor(fn, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        valor = fn()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos), valor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=200_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    df = frame_sintetico(args.filas)
+    base, extra = df.iloc[: args.filas * 99 // 100], df
+
+    indice = IndiceTexto()
+    t0 = time.perf_counter()
+    indice.actualizar(base)
+    t_construir = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    nuevos = indice.actualizar(extra)
+    t_incremental = time.perf_counter() - t0
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "indice.npz"
+        t_guardar, _ = _mejor(lambda: indice.guardar(ruta), 1)
+        t_cargar, indice = _mejor(lambda: IndiceTexto.cargar(ruta), 1)
+        tamanio = os.path.getsize(ruta)
+    print(f"{args.filas} filas, {len(indice.digests)} textos, {len(indice.vocabulario)} palabras, "
+          f"{len(indice.doc)} apariciones")
+    print(f"construir {t_construir:.2f} s  +{nuevos} textos {t_incremental:.2f} s  "
+          f"guardar {t_guardar:.2f} s  cargar {t_cargar:.3f} s  ({tamanio / 1e6:.1f} MB)")
+
+    normalizado = {c: normalizar_textos(df[c]) for c in COLUMNAS_TEXTO}
+    crudos = {c: df[c].tolist() for c in COLUMNAS_TEXTO}
+    print(f"{'Consulta':<12} {'Índice (s)':>11} {'str.contains (s)':>17} {'por fila (s)':>13} {'filas':>7}")
+    for nombre, consulta, predicado in CONSULTAS:
+        t_indice, resultado = _mejor(lambda: indice.buscar(consulta), args.repeticiones)
+        t_lineal, filas = _mejor(lambda: np.flatnonzero(predicado(normalizado)), args.repeticiones)
+        assert np.array_equal(resultado.filas, filas), (nombre, len(resultado), len(filas))
+
+        # Como informe_validacion.py: unidecode de cada texto y `in` (subcadena) en cada consulta
+        palabra = consulta.split()[0].strip('"*')
+        t_fila, _ = _mejor(
+            lambda: [i for i, t in enumerate(zip(*crudos.values())) if any(palabra in unidecode(x.lower()) for x in t)],
+            1,
+        )
+        print(f"{nombre:<12} {t_indice:>11.4f} {t_lineal:>17.3f} {t_fila:>13.2f} {len(resultado):>7}")
+
+
+if __name__ == "__main__":
+    main()
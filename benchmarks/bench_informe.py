@@ -0,0 +1,100 @@
+"""Benchmark del PDF con secciones largas: párrafo por ítem vs. tabla paginada perezosa.
+
+Para cada tamaño (cantidad de comentarios) y modo genera un frame sintético,
+lo prepara y renderiza el informe en un proceso aparte, y registra el tiempo
+total y el pico de memoria (RSS máximo) de ese proceso. Uno de los comentarios
+es más largo que una página, así que la tabla paginada tiene que cortar esa fila.
+
+    python benchmarks/bench_informe.py [--tamanios 10000 100000] [--modos perezoso eager] [--json r.json]
+"""
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+FRASES = [
+    "Muy buena herramienta", "es muy útil", "la app es lenta", "me resulta difícil",
+    "agregaría un campo de observaciones", "el diseño es claro", "podría mejorar el contraste",
+    "permitir exportar en PDF", "funciona bien", "nada",
+]
+
+
+def frame_sintetico(filas: int, seed: int = 0) -> pd.DataFrame:
+    from esquema import COLUMNAS_PUNTAJE, aplicar_tipos
+
+    rng = random.Random(seed)
+    datos = {col: [str(rng.randint(1, 5)) for _ in range(filas)] for col in COLUMNAS_PUNTAJE}
+    # El número hace único cada texto, como en un export real
+    datos["comentarios"] = [f"{' y '.join(rng.sample(FRASES, 2))} ({i})" for i in range(filas)]
+    if filas:
+        # Solo frases positivas: así cae en la lista de comentarios positivos
+        positivas = ["Muy buena herramienta", "es muy útil", "el diseño es claro", "funciona bien"]
+        datos["comentarios"][filas // 2] = ", ".join(rng.choice(positivas) for _ in range(2000)) + " (largo)"
+    datos["modificar_secciones"] = [f"Sección {rng.randint(1, 40)}: {rng.choice(FRASES)} ({i})" for i in range(filas)]
+    return aplicar_tipos(pd.DataFrame(datos))
+
+
+def correr_caso(filas: int, modo: str, salida: Path) -> dict:
+    # Corre dentro del subproceso: el RSS máximo es solo de este caso
+    import informe_validacion as iv
+
+    df, agregador = iv.preparar(frame_sintetico(filas))
+    t0 = time.perf_counter()
+    iv.generar_informe(df, salida, agregador=agregador, perezoso=(modo == "perezoso"))
+    segundos = time.perf_counter() - t0
+    return {
+        "comentarios": filas,
+        "modo": modo,
+        "segundos_render": segundos,
+        "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "bytes_pdf": salida.stat().st_size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanios", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--modos", nargs="+", choices=["perezoso", "eager"], default=["perezoso", "eager"])
+    parser.add_argument("--json", type=Path, help="guardar resultados en este archivo")
+    parser.add_argument("--caso", nargs=3, help=argparse.SUPPRESS)  # filas modo salida (uso interno)
+    args = parser.parse_args()
+
+    if args.caso:
+        filas, modo, salida = args.caso
+        print(json.dumps(correr_caso(int(filas), modo, Path(salida))))
+        return
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for filas in args.tamanios:
+            for modo in args.modos:
+                salida = Path(tmp) / f"informe_{filas}_{modo}.pdf"
+                t0 = time.perf_counter()
+                proc = subprocess.run(
+                    [sys.executable, __file__, "--caso", str(filas), modo, str(salida)],
+                    cwd=tmp, capture_output=True, text=True, check=True,
+                )
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                r["segundos_total"] = time.perf_counter() - t0
+                resultados.append(r)
+                print(
+                    f"{filas:>8} comentarios  {modo:<9} render {r['segundos_render']:8.2f} s  "
+                    f"total {r['segundos_total']:8.2f} s  pico RSS {r['pico_rss_mb']:8.1f} MB  "
+                    f"PDF {r['bytes_pdf'] / 1024:8.0f} KB"
+                )
+    if args.json:
+        args.json.write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
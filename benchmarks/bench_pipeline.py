@@ -0,0 +1,134 @@
+"""Suite de benchmarks del pipeline completo sobre un corpus sintético.
+
+Para cada tamaño (por defecto 1k, 100k y 1M filas) genera el corpus con
+generar_corpus.py y mide cada etapa por separado: lectura (read_csv_robust),
+saneamiento, deduplicación, unificación completa (process_all), clasificación
+de comentarios, métricas y PDF. Los resultados se guardan en JSON junto con el
+commit, para comparar corridas entre commits con --comparar.
+
+    python benchmarks/bench_pipeline.py [--tamanios 1000 100000 1000000] [--json r.json] [--comparar viejo.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import informe_validacion as iv  # noqa: E402
+import normalize_and_merge as nm  # noqa: E402
+from estadisticas import AgregadorPuntajes  # noqa: E402
+from esquema import COLUMNAS_PUNTAJE, leer_csv  # noqa: E402
+from generar_corpus import generar_corpus  # noqa: E402
+
+ETAPAS = ["generar", "lectura", "saneamiento", "dedupe", "unificar", "clasificar", "metricas", "pdf"]
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def _medir(resultados, filas, etapa, fn):
+    # Las etapas que imprimen progreso se corren en silencio
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        valor = fn()
+    segundos = time.perf_counter() - t0
+    resultados.append({
+        "filas": filas,
+        "etapa": etapa,
+        "segundos": segundos,
+        "filas_por_segundo": filas / segundos if segundos else None,
+    })
+    print(f"{filas:>9} filas  {etapa:<12} {segundos:9.3f} s  {filas / max(segundos, 1e-9):>12,.0f} filas/s")
+    return valor
+
+
+def correr_tamanio(filas: int, seed: int, limite_pdf: int, resultados: list) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        rutas = _medir(resultados, filas, "generar", lambda: generar_corpus(tmp, filas, seed=seed))
+
+        frames = _medir(resultados, filas, "lectura", lambda: [nm.read_csv_robust(p) for p in rutas])
+        frames = _medir(resultados, filas, "saneamiento", lambda: [nm.sanitize_frame(f) for f in frames])
+
+        def dedupe():
+            deduper = nm.RowDeduper()
+            for f in frames:
+                for _ in deduper.filter(f.itertuples(index=False, name=None)):
+                    pass
+        _medir(resultados, filas, "dedupe", dedupe)
+        del frames
+
+        def unificar():
+            nm.process_all(workers=1, full=True, base_dir=tmp)
+        _medir(resultados, filas, "unificar", unificar)
+
+        df = leer_csv(tmp / "validacion_unificado.csv", columnas=iv.columnas_informe)
+        _medir(resultados, filas, "clasificar", lambda: iv.clasificador.clasificar(df["comentarios"]))
+        _medir(resultados, filas, "metricas", lambda: AgregadorPuntajes(COLUMNAS_PUNTAJE).actualizar(df).resultado())
+
+        def pdf():
+            preparado, agregador = iv.preparar(df)
+            iv.generar_informe(preparado, tmp / "informe.pdf", agregador=agregador, limite=limite_pdf)
+        _medir(resultados, filas, "pdf", pdf)
+
+
+def comparar(actual: list, anterior_path: Path) -> None:
+    anterior = json.loads(anterior_path.read_text(encoding="utf-8"))
+    previos = {(r["filas"], r["etapa"]): r["segundos"] for r in anterior["resultados"]}
+    print(f"\nComparación con {anterior_path.name} (commit {anterior.get('commit')}):")
+    for r in actual:
+        previo = previos.get((r["filas"], r["etapa"]))
+        if previo:
+            print(f"{r['filas']:>9} filas  {r['etapa']:<12} {previo:9.3f} s -> {r['segundos']:9.3f} s  "
+                  f"x{previo / max(r['segundos'], 1e-9):.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanios", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--limite-pdf", type=int, default=2000, help="ítems por lista en el PDF (el resto va a apéndice)")
+    parser.add_argument("--json", type=Path, help="archivo de resultados (por defecto benchmarks/resultados/pipeline-<commit>.json)")
+    parser.add_argument("--comparar", type=Path, help="resultados de otra corrida para comparar")
+    args = parser.parse_args()
+
+    commit = _commit()
+    resultados: list = []
+    for filas in args.tamanios:
+        correr_tamanio(filas, args.seed, args.limite_pdf, resultados)
+
+    salida = args.json or RAIZ / "benchmarks" / "resultados" / f"pipeline-{commit}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps({
+        "commit": commit,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "seed": args.seed,
+        "resultados": resultados,
+    }, indent=2), encoding="utf-8")
+    print(f"Resultados: {salida}")
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
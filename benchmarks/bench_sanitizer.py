@@ -0,0 +1,87 @@
+"""Micro-benchmark del saneamiento de celdas: cadena de str.replace vs sanitize_series.
+
+Genera una columna de N celdas (por defecto 1M) con comas, comillas, saltos de
+línea, tabs, pipes, barras y espacios Unicode, verifica que ambas versiones
+den exactamente el mismo resultado y mide el tiempo de cada una.
+
+    python benchmarks/bench_sanitizer.py [--cells 1000000] [--json resultados.json]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from normalize_and_merge import sanitize_series  # noqa: E402
+
+PIECES = [
+    "Muy buena herramienta", "fácil de usar", ",", '"', "'", ";", "\n", "\r\n", "\t",
+    "|", "\\", "  ", " ", " ", "\x1c", "sección", "ñandú", "5", "",
+]
+
+
+def legacy_sanitize(series: pd.Series) -> pd.Series:
+    # La cadena original de process_all (nueve replace + \s+ + strip)
+    out = (series.astype(str)
+           .str.replace(',', ' ')
+           .str.replace('"', ' ')
+           .str.replace("'", ' ')
+           .str.replace(';', ' ')
+           .str.replace('\n', ' ')
+           .str.replace('\r', ' ')
+           .str.replace('\t', ' ')
+           .str.replace('|', ' ')
+           .str.replace('\\', ' '))
+    return out.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def build_column(cells: int, seed: int) -> pd.Series:
+    rng = random.Random(seed)
+    values = ["".join(rng.choices(PIECES, k=rng.randint(0, 8))) for _ in range(cells)]
+    # Todos los caracteres hasta U+3000 al menos una vez, para cubrir cada espacio Unicode
+    values[: 0x3001] = [chr(c) + "x" + chr(c) for c in range(0x3001)][:cells]
+    return pd.Series(values, dtype=object)
+
+
+def timed(fn, series: pd.Series):
+    t0 = time.perf_counter()
+    out = fn(series)
+    return out, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cells", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="guardar resultados en este archivo")
+    args = parser.parse_args()
+
+    series = build_column(args.cells, args.seed)
+    old, t_old = timed(legacy_sanitize, series)
+    new, t_new = timed(sanitize_series, series)
+    equal = old.tolist() == new.tolist()
+
+    results = {
+        "celdas": args.cells,
+        "cadena_replace_s": t_old,
+        "sanitize_series_s": t_new,
+        "aceleracion": t_old / max(t_new, 1e-9),
+        "equivalente": equal,
+    }
+    print(f"Celdas: {args.cells}")
+    print(f"  cadena de replace: {t_old:.3f} s")
+    print(f"  sanitize_series:   {t_new:.3f} s")
+    print(f"  aceleración: x{results['aceleracion']:.1f}  equivalente={equal}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if not equal:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Generador determinista de archivos feedback*.csv realistas para benchmarks.
+
+Mismo esquema de 11 columnas que los exports reales, con texto libre en
+español que trae comas, comillas y saltos de línea, y la misma variedad de
+formatos que aparece en el repo: UTF-8 con y sin BOM, Latin-1, UTF-8
+doblemente codificado (mojibake), delimitadores ',', ';', tab y '|',
+columnas *_opcion de más, celdas vacías y filas duplicadas dentro de un
+archivo y entre archivos. Con la misma semilla los archivos salen idénticos
+byte a byte.
+
+    python benchmarks/generar_corpus.py --filas 100000 --dir /tmp/corpus [--archivos 10] [--seed 0]
+"""
+import argparse
+import csv
+import io
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from esquema import COLUMNAS, COLUMNAS_PUNTAJE  # noqa: E402
+
+# Formato de archivo: (encoding, bom, doble_codificado); el peso es la proporción
+FORMATOS = [
+    (("utf-8", True, False), 5),
+    (("utf-8", False, False), 2),
+    (("latin-1", False, False), 1),
+    (("utf-8", True, True), 1),
+]
+DELIMITADORES = [(",", 6), (";", 2), ("\t", 1), ("|", 1)]
+
+# Proporción de filas que repiten una fila anterior (del mismo u otro archivo)
+PROPORCION_DUPLICADOS = 0.03
+# Proporción de archivos con las columnas *_opcion de los formularios nuevos
+PROPORCION_OPCION = 0.25
+
+NOMBRES = [
+    "Florencia", "Martina", "Cynthia", "Paula", "Tamara", "Mathías", "Sofía", "Lucía",
+    "Joaquín", "Valentina", "Inés", "Ramón", "Begoña", "Agustín", "Natalia", "José",
+]
+APELLIDOS = [
+    "Michelin", "Blengio", "Bertullo", "Pérez Salvo", "Sánchez", "Bautista", "Núñez",
+    "Rodríguez", "Fernández", "Martínez", "González", "Peña", "Ibáñez", "De Los Santos",
+]
+PROFESIONES = [
+    "Psicomotricista", "Psicomotricista ", "Lic. en Psicomotricidad", "licenciada en psicomotricidad",
+    "Psicóloga", "Psicologa", "Psicopedagoga", "Licenciada en Psicopedagogía", "Fisioterapeuta",
+    "Lic. en Fonoaudiología", "Maestra", "Docente", "Trabajadora Social",
+]
+COMENTARIOS = [
+    "Me parece muy práctico",
+    "Está muy bien organizado y permite sistematizar la información",
+    "Es útil, aunque a veces es un poco lento",
+    "Gran proyecto, muy buena herramienta de registro",
+    "Me resulta difícil encontrar la pestaña de test",
+    "Sería bueno poder exportar el informe en PDF",
+    'La sección "entrevista inicial" es excelente',
+    "Mejorar colores y contraste; en el celular se ve chico",
+    "Nada",
+    "Si algo",
+    "¿Se podrá usar sin conexión?",
+    "Funciona bien, ágil y claro",
+]
+MODIFICACIONES = [
+    "En entrevista inicial agregaría la pregunta de con quién vive",
+    "Agregaría un lugar para subir informes pedagógicos de las maestras",
+    "En los datos del paciente agregaría edad",
+    "Agregaría foto del paciente, y que permita subir más de 1 archivo",
+    'Un campo de "observaciones" para otros técnicos',
+    "Composición familiar, relación con los integrantes de la familia, actividades compartidas",
+    "Nada",
+    "-",
+    ".",
+]
+OPCIONES = {"utilidad": ["Mucho", "Bastante", "Poco"], "eficiencia": ["Sí", "No"],
+            "satisfaccion_claridad": ["Sí", "No"], "satisfaccion_diseño": ["Bueno", "Regular"]}
+
+
+def _elegir(rng: random.Random, opciones_con_peso):
+    valores, pesos = zip(*opciones_con_peso)
+    return rng.choices(valores, weights=pesos)[0]
+
+
+def _texto_libre(rng: random.Random, frases: List[str]) -> str:
+    # Una a tres frases; a veces en varias líneas o con una coma extra
+    partes = rng.sample(frases, rng.randint(1, 3))
+    separador = rng.choice([". ", ", ", "\n", " – "])
+    return separador.join(partes)
+
+
+def generar_fila(rng: random.Random, i: int) -> Dict[str, str]:
+    fila = {
+        "nombre_profesional": f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}",
+        "modificar_secciones": _texto_libre(rng, MODIFICACIONES),
+        "comentarios": "" if rng.random() < 0.05 else _texto_libre(rng, COMENTARIOS),
+        "fecha_envio": (
+            f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} "
+            f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+        ),
+        "cedula_profesional": str(rng.randint(10_000_000, 59_999_999)),
+        "profesion_profesional": rng.choice(PROFESIONES),
+    }
+    for col in COLUMNAS_PUNTAJE:
+        tope = 10 if col == "intencion_uso" else 5
+        fila[col] = "" if rng.random() < 0.01 else str(rng.randint(1, tope))
+    return fila
+
+
+def _encabezado(con_opcion: bool) -> List[str]:
+    if not con_opcion:
+        return list(COLUMNAS)
+    cols = []
+    for col in COLUMNAS:
+        cols.append(col)
+        if col in OPCIONES:
+            cols.append(f"{col}_opcion")
+    return cols
+
+
+def _codificar(texto: str, encoding: str, bom: bool, doble: bool) -> bytes:
+    if doble:
+        # UTF-8 leído como Latin-1 y vuelto a guardar como UTF-8
+        texto = texto.encode("utf-8").decode("latin-1")
+    datos = texto.encode(encoding, errors="replace")
+    return (b"\xef\xbb\xbf" + datos) if bom and encoding == "utf-8" else datos
+
+
+def generar_corpus(
+    directorio: Path, filas: int, archivos: Optional[int] = None, seed: int = 0
+) -> List[Path]:
+    """Escribe `archivos` CSV (por defecto uno cada 10.000 filas) con `filas` filas en total"""
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    archivos = archivos or max(1, filas // 10_000)
+    rng = random.Random(seed)
+    previas: List[Dict[str, str]] = []
+    rutas = []
+    for n in range(archivos):
+        cantidad = filas // archivos + (1 if n < filas % archivos else 0)
+        encoding, bom, doble = _elegir(rng, FORMATOS)
+        delimitador = _elegir(rng, DELIMITADORES)
+        con_opcion = rng.random() < PROPORCION_OPCION
+        encabezado = _encabezado(con_opcion)
+
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer, delimiter=delimitador, lineterminator="\r\n")
+        escritor.writerow(encabezado)
+        for i in range(cantidad):
+            if previas and rng.random() < PROPORCION_DUPLICADOS:
+                fila = rng.choice(previas)
+            else:
+                fila = generar_fila(rng, i)
+                if con_opcion:
+                    fila = dict(fila, **{f"{c}_opcion": rng.choice(v) for c, v in OPCIONES.items()})
+                # Solo se guarda una muestra acotada para elegir duplicados
+                if len(previas) < 1000:
+                    previas.append(fila)
+            escritor.writerow([fila.get(c, "") for c in encabezado])
+
+        ruta = directorio / f"feedback{n + 1}.csv"
+        ruta.write_bytes(_codificar(buffer.getvalue(), encoding, bom, doble))
+        rutas.append(ruta)
+    return rutas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=1000)
+    parser.add_argument("--dir", type=Path, required=True, help="carpeta donde escribir los feedback*.csv")
+    parser.add_argument("--archivos", type=int, help="cantidad de archivos (por defecto uno cada 10.000 filas)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rutas = generar_corpus(args.dir, args.filas, args.archivos, args.seed)
+    print(f"{len(rutas)} archivos, {args.filas} filas en {args.dir}")
+
+
+if __name__ == "__main__":
+    main()
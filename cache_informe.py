@@ -0,0 +1,132 @@
+"""Caché persistente de resultados por fila para informe_validacion.py.
+
+Cada fila del unificado se identifica por un digest de su contenido (las
+columnas que usa el informe). Para cada sección del informe (limpieza de
+modificar_secciones, clasificación de comentarios) se guardan los resultados
+por digest, junto con una firma de lo que los produjo: si la firma cambia (por
+ejemplo, otras palabras clave) esa sección se recalcula entera. Las métricas
+se guardan como estado combinable de AgregadorPuntajes más el multiconjunto
+de filas que cubre, así una corrida con filas nuevas solo agrega esas filas.
+
+Al regenerar el informe solo se limpian, clasifican y agregan las filas que
+no estaban en la corrida anterior.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+import pandas as pd
+
+from estadisticas import AgregadorPuntajes
+
+CACHE_VERSION = 1
+CACHE_NAME = "informe_validacion.cache.json"
+
+
+def digests_filas(df: pd.DataFrame, columnas: List[str]) -> pd.Series:
+    """Digest de 64 bits del contenido de cada fila, calculado vectorizado"""
+    hashes = pd.util.hash_pandas_object(df[columnas], index=False)
+    return hashes.map("{:016x}".format)
+
+
+class CacheInforme:
+    def __init__(self, path: Union[str, Path], columnas: List[str]):
+        self.path = Path(path)
+        self.columnas = list(columnas)
+        self.secciones: Dict[str, Dict[str, object]] = {}
+        self.agregado: Optional[Dict[str, object]] = None
+        self.cubiertas: Dict[str, int] = {}
+        self.calculadas: set = set()
+
+    def _firma(self) -> Dict[str, object]:
+        # El digest depende de las columnas y de cómo pandas hashea cada tipo
+        return {"version": CACHE_VERSION, "columnas": self.columnas, "pandas": pd.__version__}
+
+    @classmethod
+    def cargar(cls, path: Union[str, Path], columnas: List[str]) -> "CacheInforme":
+        """Carga la caché; si no existe o no corresponde, arranca vacía"""
+        cache = cls(path, columnas)
+        try:
+            with open(cache.path, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return cache
+        if datos.get("firma") != cache._firma():
+            return cache
+        cache.secciones = datos.get("secciones") or {}
+        cache.agregado = datos.get("agregado")
+        cache.cubiertas = datos.get("cubiertas") or {}
+        return cache
+
+    def guardar(self, digests: pd.Series) -> None:
+        """Escribe la caché descartando filas que ya no están en el unificado"""
+        vigentes = set(digests)
+        for seccion in self.secciones.values():
+            seccion["filas"] = {d: v for d, v in seccion["filas"].items() if d in vigentes}
+        datos = {
+            "firma": self._firma(),
+            "secciones": self.secciones,
+            "agregado": self.agregado,
+            "cubiertas": self.cubiertas,
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def completar(
+        self,
+        nombre: str,
+        firma: object,
+        digests: pd.Series,
+        df: pd.DataFrame,
+        calcular: Callable[[pd.DataFrame], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Resultado de calcular() para todas las filas de df.
+
+        calcular() solo se llama con las filas cuyo digest no está en la
+        sección (una vez por digest); el resto sale de la caché.
+        """
+        seccion = self.secciones.get(nombre)
+        if seccion is None or seccion.get("firma") != firma:
+            seccion = {"firma": firma, "columnas": None, "filas": {}}
+            self.secciones[nombre] = seccion
+        filas = seccion["filas"]
+
+        nuevas = ~digests.isin(filas.keys()) & ~digests.duplicated()
+        if nuevas.any():
+            resultado = calcular(df[nuevas])
+            seccion["columnas"] = list(resultado.columns)
+            for d, valores in zip(digests[nuevas], resultado.itertuples(index=False, name=None)):
+                filas[d] = list(valores)
+            self.calculadas.update(digests[nuevas])
+
+        if not filas:
+            return pd.DataFrame(index=df.index, columns=seccion["columnas"] or [])
+        return pd.DataFrame(digests.map(filas).tolist(), index=df.index, columns=seccion["columnas"])
+
+    def agregar_puntajes(self, digests: pd.Series, df: pd.DataFrame, columnas: List[str]) -> AgregadorPuntajes:
+        """Métricas de todas las filas, sumando al estado guardado solo las filas nuevas.
+
+        Si desde la corrida anterior se quitó o cambió alguna fila, el estado
+        guardado ya no sirve y se agrega todo de nuevo.
+        """
+        actuales = digests.value_counts().to_dict()
+        vigente = (
+            self.agregado is not None
+            and list(self.agregado) == list(columnas)
+            and all(actuales.get(d, 0) >= n for d, n in self.cubiertas.items())
+        )
+        if vigente:
+            agregador = AgregadorPuntajes.desde_dict(self.agregado)
+            # Las primeras n apariciones de cada digest ya están en el estado
+            ocurrencia = digests.groupby(digests).cumcount()
+            nuevas = ocurrencia >= digests.map(self.cubiertas).fillna(0)
+            if nuevas.any():
+                agregador.combinar(AgregadorPuntajes(columnas).actualizar(df[nuevas]))
+        else:
+            agregador = AgregadorPuntajes(columnas).actualizar(df)
+        self.agregado = agregador.a_dict()
+        self.cubiertas = actuales
+        return agregador
@@ -0,0 +1,94 @@
+"""Clasificación de comentarios por palabras clave, vectorizada.
+
+Las listas de palabras clave se compilan una sola vez en una expresión regular
+de alternancia por polaridad, y una Serie completa se clasifica con una sola
+llamada. La semántica es la misma que la de la versión fila por fila de
+informe_validacion.py: el texto se pasa a minúsculas y por unidecode, y una
+palabra clave "aparece" si es subcadena de ese texto.
+"""
+import re
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+
+def compilar_palabras(palabras: Iterable[str]) -> "re.Pattern[str]":
+    """Alternancia de todas las palabras, las más largas primero.
+
+    Va dentro de un lookahead para que findall devuelva también coincidencias
+    solapadas ("muy bien" y "bien"). En cada posición solo se reporta la más
+    larga; las contenidas en ella se agregan con contenidas_en().
+    """
+    unicas = sorted(set(palabras), key=lambda p: (-len(p), p))
+    if not unicas:
+        return re.compile(r"(?!)")
+    return re.compile("(?=(" + "|".join(re.escape(p) for p in unicas) + "))")
+
+
+def contenidas_en(palabras: Iterable[str]) -> Dict[str, List[str]]:
+    """Para cada palabra, todas las palabras de la lista que son subcadena de ella"""
+    unicas = sorted(set(palabras))
+    return {p: [q for q in unicas if q in p] for p in unicas}
+
+
+# Temas de mejora de los comentarios: (frase del informe, palabras que lo indican).
+# Se prueban en orden; un comentario cuenta para el primer tema que menciona
+TEMAS_COMENTARIOS = [
+    ("Generar una versión de informe para imprimir.", ["informe", "imprimir"]),
+    ("Permitir exportar e importar archivos en PDF.", ["pdf"]),
+    ("Mejorar colores y contraste de la app.", ["color", "contraste"]),
+]
+
+
+def normalizar_textos(serie: pd.Series) -> pd.Series:
+    """Minúsculas + unidecode, calculado una vez por valor distinto"""
+    # astype(str) directo sobre string[pyarrow] pasa por un arreglo numpy de
+    # ancho fijo: filas × el texto más largo. Por object no hay copia así
+    texto = serie.astype(object).fillna("").astype(str)
+    unicos = pd.unique(texto)
+    mapa = {t: unidecode(t.lower()) for t in unicos}
+    return texto.map(mapa)
+
+
+class ClasificadorComentarios:
+    """Etiqueta comentarios como positivo, negativo, mixto o neutral."""
+
+    def __init__(self, positivas: Iterable[str], negativas: Iterable[str]):
+        self.positivas: List[str] = list(positivas)
+        self.negativas: List[str] = list(negativas)
+        self._patron_pos = compilar_palabras(self.positivas)
+        self._patron_neg = compilar_palabras(self.negativas)
+        self._contenidas_pos = contenidas_en(self.positivas)
+        self._contenidas_neg = contenidas_en(self.negativas)
+
+    @staticmethod
+    def _expandir(encontradas: List[str], contenidas: Dict[str, List[str]]) -> List[str]:
+        return sorted({q for p in encontradas for q in contenidas[p]})
+
+    def clasificar(self, comentarios: pd.Series) -> pd.DataFrame:
+        """Clasifica una Serie completa.
+
+        Devuelve un DataFrame con el mismo índice y las columnas
+        clasificacion, palabras_positivas y palabras_negativas (las palabras
+        clave encontradas en cada fila, para poder auditar la etiqueta).
+        """
+        texto = normalizar_textos(comentarios)
+        pos = texto.str.findall(self._patron_pos).map(lambda m: self._expandir(m, self._contenidas_pos))
+        neg = texto.str.findall(self._patron_neg).map(lambda m: self._expandir(m, self._contenidas_neg))
+        tiene_pos = pos.str.len().gt(0).to_numpy()
+        tiene_neg = neg.str.len().gt(0).to_numpy()
+        etiqueta = np.select(
+            [tiene_pos & tiene_neg, tiene_pos, tiene_neg],
+            ["mixto", "positivo", "negativo"],
+            default="neutral",
+        )
+        return pd.DataFrame(
+            {
+                "clasificacion": pd.Series(etiqueta, index=comentarios.index, dtype=object),
+                "palabras_positivas": pos,
+                "palabras_negativas": neg,
+            },
+            index=comentarios.index,
+        )
@@ -0,0 +1,320 @@
+"""Detección de respuestas casi duplicadas con MinHash y LSH.
+
+drop_duplicates solo descarta filas idénticas; un profesional que vuelve a
+enviar el formulario con el comentario apenas retocado queda dos veces. Acá
+cada respuesta se reduce al texto de comentarios y modificar_secciones,
+normalizado como en el clasificador (minúsculas + unidecode, sin
+puntuación), y a su conjunto de shingles de K_SHINGLE caracteres. De cada
+conjunto se calcula una firma MinHash, y las firmas se reparten en bandas
+(LSH): solo se comparan las respuestas que coinciden en alguna banda, así el
+costo crece con la cantidad de respuestas y no con la de pares.
+
+Los pares candidatos se confirman con la similitud de Jaccard estimada por
+las firmas (>= umbral) y se agrupan por componentes conexas. Con una clave
+(p. ej. cedula_profesional) solo se comparan respuestas con la misma clave.
+
+    python duplicados_cercanos.py [--umbral 0.8] [--clave cedula_profesional] [--salida duplicados_cercanos.csv]
+"""
+import argparse
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from clasificador import normalizar_textos
+
+COLUMNAS_TEXTO = ["comentarios", "modificar_secciones"]
+NO_ALFANUMERICO = r"[^a-z0-9]+"
+# Caracteres por shingle; hasta 8 (cada k-grama se empaqueta en un entero de 64 bits)
+K_SHINGLE = 5
+NUM_PERM = 128
+UMBRAL = 0.8
+# Textos más cortos que esto ("Nada", "Muy bueno") no se comparan
+MIN_CARACTERES = 20
+# Probabilidad mínima de que un par con similitud == umbral sea candidato
+RECALL_LSH = 0.99
+# En cubetas más grandes se enlaza cada miembro con el primero en lugar de todos con todos
+MAX_CUBETA = 64
+SALIDA_POR_DEFECTO = "duplicados_cercanos.csv"
+COLUMNAS_RESULTADO = ["grupo", "tamanio", "fila", "similitud", "texto"]
+
+
+def textos_normalizados(df: pd.DataFrame, columnas: Sequence[str] = COLUMNAS_TEXTO) -> pd.Series:
+    """Texto comparable de cada fila: las columnas normalizadas, unidas"""
+    partes = [
+        normalizar_textos(df[c]).str.replace(NO_ALFANUMERICO, " ", regex=True).str.strip()
+        for c in columnas
+    ]
+    texto = partes[0]
+    for parte in partes[1:]:
+        texto = texto + " | " + parte
+    return texto.str.strip(" |")
+
+
+def shingles(texto: str, k: int = K_SHINGLE) -> np.ndarray:
+    """Los k-gramas de bytes distintos del texto, cada uno empaquetado en un uint64.
+
+    El texto normalizado es ASCII, así que son k-gramas de caracteres; el
+    empaquetado es exacto (sin colisiones) y no depende del proceso.
+    """
+    codigos, _ = _shingles_lote([texto], k)
+    return np.unique(codigos)
+
+
+def _shingles_lote(textos: Sequence[str], k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """k-gramas de muchos textos a la vez: (códigos, inicio de cada texto en códigos).
+
+    Los textos se concatenan y los k-gramas se arman sobre el buffer entero;
+    uno más corto que k queda como un único shingle. Puede haber repetidos
+    dentro de un texto (al mínimo de MinHash no le cambian nada).
+    """
+    if not 0 < k <= 8:
+        raise ValueError("k debe estar entre 1 y 8")
+    crudos = [t.encode("utf-8") for t in textos]
+    largos = np.fromiter(map(len, crudos), dtype=np.int64, count=len(crudos))
+    inicios = np.cumsum(largos) - largos
+    datos = np.frombuffer(b"".join(crudos) + bytes(k), dtype=np.uint8).astype(np.uint64)
+
+    # Código de la ventana que empieza en cada posición del buffer
+    n = len(datos) - k
+    todos = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        todos |= datos[j:n + j] << np.uint64(8 * j)
+
+    ventanas = np.maximum(largos - k + 1, 1)
+    comienzo_texto = np.repeat(inicios, ventanas)
+    posicion = np.arange(len(comienzo_texto)) - np.repeat(np.cumsum(ventanas) - ventanas, ventanas) + comienzo_texto
+    codigos = todos[np.minimum(posicion, max(n - 1, 0))] if n else np.zeros(len(posicion), dtype=np.uint64)
+    # Textos más cortos que k: la ventana no puede incluir bytes del texto siguiente
+    for t in np.flatnonzero(largos < k):
+        relleno = crudos[t] + bytes(k - largos[t])
+        codigos[np.sum(ventanas[:t])] = int.from_bytes(relleno[:k], "little")
+    return codigos, np.cumsum(ventanas) - ventanas
+
+
+class MinHasher:
+    """num_perm funciones de hash multiply-shift sobre 64 bits: h(x) = (a*x + b) mod 2^64 >> 32"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def firmas(self, textos: Sequence[str], k: int = K_SHINGLE, shingles_por_bloque: int = 1 << 12) -> np.ndarray:
+        """Una firma (num_perm valores uint32) por texto"""
+        codigos, inicios = _shingles_lote(textos, k)
+        out = np.empty((len(textos), self.num_perm), dtype=np.uint32)
+        primero = 0
+        while primero < len(textos):
+            # Bloques de textos enteros, de unos shingles_por_bloque shingles (que entren en caché)
+            ultimo = max(primero + 1, int(np.searchsorted(inicios, inicios[primero] + shingles_por_bloque)))
+            desde = inicios[primero]
+            hasta = inicios[ultimo] if ultimo < len(textos) else len(codigos)
+            # La multiplicación en uint64 da la vuelta módulo 2^64, que es lo buscado
+            valores = (np.multiply.outer(self.a, codigos[desde:hasta]) + self.b[:, None]) >> np.uint64(32)
+            out[primero:ultimo] = np.minimum.reduceat(valores, inicios[primero:ultimo] - desde, axis=1).T
+            primero = ultimo
+        return out
+
+
+def parametros_lsh(umbral: float, num_perm: int, recall: float = RECALL_LSH) -> Tuple[int, int]:
+    """(bandas, filas por banda) con bandas * filas <= num_perm.
+
+    Se elige la banda más ancha (menos candidatos falsos) con la que un par de
+    similitud `umbral` sigue siendo candidato con probabilidad >= recall.
+    """
+    for filas in range(num_perm, 0, -1):
+        bandas = num_perm // filas
+        if 1 - (1 - umbral**filas) ** bandas >= recall:
+            return bandas, filas
+    return num_perm, 1
+
+
+def componentes(n: int, pares: np.ndarray) -> np.ndarray:
+    """Componente conexa de cada nodo: el menor índice de su componente"""
+    etiqueta = np.arange(n)
+    if not len(pares):
+        return etiqueta
+    i, j = pares[:, 0], pares[:, 1]
+    while True:
+        menor = np.minimum(etiqueta[i], etiqueta[j])
+        previa = etiqueta.copy()
+        np.minimum.at(etiqueta, i, menor)
+        np.minimum.at(etiqueta, j, menor)
+        # Saltos de puntero: cada nodo apunta a la etiqueta de su etiqueta
+        while True:
+            saltada = etiqueta[etiqueta]
+            if np.array_equal(saltada, etiqueta):
+                break
+            etiqueta = saltada
+        if np.array_equal(etiqueta, previa):
+            return etiqueta
+
+
+def _pares_de_cubetas(cubeta: np.ndarray) -> np.ndarray:
+    # Pares dentro de cada cubeta con dos o más miembros, armados de a un
+    # tamaño de cubeta por vez
+    tamanios = np.bincount(cubeta)
+    miembros = np.flatnonzero(tamanios[cubeta] >= 2)
+    miembros = miembros[np.argsort(cubeta[miembros], kind="stable")]
+    if not len(miembros):
+        return np.empty((0, 2), dtype=np.int64)
+    comienzos = np.concatenate([[0], np.flatnonzero(np.diff(cubeta[miembros])) + 1])
+    largo = np.diff(np.concatenate([comienzos, [len(miembros)]]))
+    pares = []
+    for t in np.unique(largo):
+        bloque = miembros[comienzos[largo == t][:, None] + np.arange(t)]
+        if t > MAX_CUBETA:
+            pares.append(np.column_stack([np.repeat(bloque[:, 0], t - 1), bloque[:, 1:].ravel()]))
+        else:
+            i, j = np.triu_indices(t, 1)
+            pares.append(np.column_stack([bloque[:, i].ravel(), bloque[:, j].ravel()]))
+    return np.concatenate(pares)
+
+
+def pares_candidatos(firmas: np.ndarray, bandas: int, filas: int, grupos: Optional[np.ndarray] = None) -> np.ndarray:
+    """Pares (i, j), i < j, que coinciden en al menos una banda (y en el grupo, si hay)"""
+    n = len(firmas)
+    todos = []
+    for banda in range(bandas):
+        tramo = firmas[:, banda * filas:(banda + 1) * filas]
+        if grupos is not None:
+            tramo = np.column_stack([grupos.astype(np.uint32), tramo])
+        # Cada fila del tramo como un único valor opaco, para agrupar con np.unique
+        claves = np.ascontiguousarray(tramo).view(np.dtype((np.void, tramo.dtype.itemsize * tramo.shape[1]))).ravel()
+        _, cubeta = np.unique(claves, return_inverse=True)
+        todos.append(_pares_de_cubetas(cubeta.ravel()))
+    pares = np.concatenate(todos) if todos else np.empty((0, 2), dtype=np.int64)
+    codigos = np.unique(pares[:, 0].astype(np.int64) * n + pares[:, 1])
+    return np.column_stack([codigos // n, codigos % n]) if len(codigos) else np.empty((0, 2), dtype=np.int64)
+
+
+def similitud(firmas: np.ndarray, pares: np.ndarray, bloque: int = 100_000) -> np.ndarray:
+    """Jaccard estimado de cada par: proporción de posiciones iguales de las firmas"""
+    out = np.empty(len(pares))
+    for inicio in range(0, len(pares), bloque):
+        p = pares[inicio:inicio + bloque]
+        out[inicio:inicio + bloque] = (firmas[p[:, 0]] == firmas[p[:, 1]]).mean(axis=1)
+    return out
+
+
+def detectar(
+    df: pd.DataFrame,
+    columnas: Sequence[str] = COLUMNAS_TEXTO,
+    umbral: float = UMBRAL,
+    clave: Optional[str] = None,
+    num_perm: int = NUM_PERM,
+    k: int = K_SHINGLE,
+    min_caracteres: int = MIN_CARACTERES,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Grupos de respuestas casi duplicadas.
+
+    Devuelve una fila por respuesta que cae en un grupo de dos o más, con
+    grupo (0 es el más grande), tamanio, fila (índice en df), similitud con
+    la primera respuesta del grupo y texto normalizado. Respuestas con el
+    mismo texto normalizado (y la misma clave) se firman una sola vez.
+    """
+    texto = textos_normalizados(df, columnas)
+    valida = texto.str.len().ge(min_caracteres)
+    if clave:
+        claves = df[clave].astype("string").str.strip()
+        valida &= claves.notna() & claves.ne("")
+    filas_validas = np.flatnonzero(valida.to_numpy(dtype=bool))
+    texto = texto.iloc[filas_validas]
+
+    # Unidad de comparación: (clave, texto) distinto, en orden de aparición
+    if clave:
+        grupo_de_fila, _ = pd.factorize(claves.iloc[filas_validas])
+        unidad_de_fila, _ = pd.factorize(pd.Series(grupo_de_fila).astype(str).to_numpy() + "\x00" + texto.to_numpy())
+        primera = np.unique(unidad_de_fila, return_index=True)[1]
+        grupos = grupo_de_fila[primera]
+        textos_unidad = texto.to_numpy()[primera]
+    else:
+        unidad_de_fila, textos_unidad = pd.factorize(texto)
+        grupos = None
+    orden = list(textos_unidad)
+    if not orden:
+        # Ninguna respuesta llega a min_caracteres (o todas tienen la clave vacía)
+        return pd.DataFrame(columns=COLUMNAS_RESULTADO)
+
+    hasher = MinHasher(num_perm, seed)
+    firmas = hasher.firmas(orden, k)
+    bandas, filas = parametros_lsh(umbral, num_perm)
+    pares = pares_candidatos(firmas, bandas, filas, grupos)
+    sim = similitud(firmas, pares)
+
+    raices = componentes(len(orden), pares[sim >= umbral])
+
+    resultado = pd.DataFrame({"fila": df.index[filas_validas], "_unidad": unidad_de_fila})
+    resultado["_raiz"] = raices[unidad_de_fila]
+    resultado["tamanio"] = resultado.groupby("_raiz")["fila"].transform("size")
+    resultado = resultado[resultado["tamanio"] > 1].copy()
+    if resultado.empty:
+        return pd.DataFrame(columns=COLUMNAS_RESULTADO)
+
+    # Similitud con la unidad representante (la raíz, la primera en aparecer)
+    u, r = resultado["_unidad"].to_numpy(), resultado["_raiz"].to_numpy()
+    resultado["similitud"] = (firmas[u] == firmas[r]).mean(axis=1).round(3)
+    resultado["texto"] = [orden[x] for x in u]
+    resultado = resultado.sort_values(["tamanio", "_raiz", "fila"], ascending=[False, True, True], kind="stable")
+    resultado["grupo"] = pd.factorize(resultado["_raiz"])[0]
+    return resultado[COLUMNAS_RESULTADO].reset_index(drop=True)
+
+
+def colapsar(df: pd.DataFrame, grupos: pd.DataFrame, columna_fecha: str = "fecha_envio") -> pd.DataFrame:
+    """df con una sola respuesta por grupo: la de fecha_envio más reciente (o la última fila)"""
+    if grupos.empty:
+        return df
+    fechas = pd.to_datetime(df.loc[grupos["fila"], columna_fecha], errors="coerce") if columna_fecha in df else None
+    candidatos = grupos.assign(_fecha=fechas.to_numpy() if fechas is not None else pd.NaT)
+    candidatos = candidatos.sort_values(["grupo", "_fecha", "fila"], na_position="first", kind="stable")
+    conservar = set(candidatos.groupby("grupo")["fila"].last())
+    descartar = set(grupos["fila"]) - conservar
+    return df.drop(index=list(descartar))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Detecta respuestas casi duplicadas (MinHash + LSH)")
+    parser.add_argument("--entrada", default="validacion_unificado.csv", help="CSV unificado a revisar")
+    parser.add_argument("--sqlite", nargs="?", const="validacion_unificado.sqlite", metavar="RUTA",
+                        help="leer las filas de la base SQLite de normalize_and_merge.py --sqlite")
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help=f"similitud de Jaccard mínima (por defecto {UMBRAL})")
+    parser.add_argument("--clave", help="comparar solo respuestas con el mismo valor en esta columna (p. ej. cedula_profesional)")
+    parser.add_argument("--columnas", default=",".join(COLUMNAS_TEXTO), help="columnas de texto a comparar, separadas por coma")
+    parser.add_argument("--min-caracteres", type=int, default=MIN_CARACTERES, help="ignorar textos normalizados más cortos")
+    parser.add_argument("--salida", default=SALIDA_POR_DEFECTO, help="CSV con los grupos para revisar")
+    parser.add_argument("--colapsar", metavar="CSV", help="escribir además el unificado con una respuesta por grupo (la más reciente)")
+    args = parser.parse_args(argv)
+    if not 0 < args.umbral <= 1:
+        parser.error("--umbral debe estar entre 0 y 1")
+
+    from esquema import escribir_csv, leer_csv
+
+    if args.sqlite:
+        from almacen import Almacen
+
+        with Almacen(args.sqlite) as almacen:
+            df = almacen.consultar(tipado=False)
+    else:
+        df = leer_csv(args.entrada, tipado=False)
+    columnas = [c.strip() for c in args.columnas.split(",") if c.strip()]
+
+    grupos = detectar(df, columnas, args.umbral, args.clave, min_caracteres=args.min_caracteres)
+    detalle = grupos.join(df.drop(columns=columnas, errors="ignore"), on="fila")
+    detalle.to_csv(args.salida, index=False, encoding="utf-8-sig")
+
+    n_grupos = grupos["grupo"].nunique()
+    print(f"🔎 {n_grupos} grupos de respuestas casi duplicadas ({len(grupos)} filas de {len(df)}), umbral {args.umbral}")
+    for g, filas in list(grupos.groupby("grupo"))[:5]:
+        print(f"   #{g} ({len(filas)} filas): {filas['texto'].iloc[0][:80]}")
+    print(f"📝 Detalle: {args.salida}")
+    if args.colapsar:
+        colapsado = colapsar(df, grupos)
+        escribir_csv(colapsado, args.colapsar)
+        print(f"🧹 {len(df) - len(colapsado)} filas colapsadas -> {args.colapsar} ({len(colapsado)} filas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Esquema compartido de los CSV de feedback.
+
+Define una sola vez las 11 columnas canónicas y el tipo de cada una, y las
+funciones para leer y escribir a través de ese esquema. Todos los scripts del
+repo toman las columnas de acá en lugar de copiarlas.
+
+Importar este módulo no carga pandas: las constantes sirven para chequeos
+livianos (encabezados con el módulo csv) y pandas se importa recién en las
+funciones que lo usan.
+"""
+from importlib.util import find_spec
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Strings respaldados por Arrow si pyarrow está disponible (sin importarlo)
+TEXTO_DTYPE = "string[pyarrow]" if find_spec("pyarrow") is not None else "string"
+
+COLUMNAS: List[str] = [
+    "nombre_profesional",
+    "utilidad",
+    "eficiencia",
+    "intencion_uso",
+    "satisfaccion_claridad",
+    "satisfaccion_diseño",
+    "modificar_secciones",
+    "comentarios",
+    "fecha_envio",
+    "cedula_profesional",
+    "profesion_profesional",
+]
+
+COLUMNAS_PUNTAJE: List[str] = [
+    "utilidad",
+    "eficiencia",
+    "intencion_uso",
+    "satisfaccion_claridad",
+    "satisfaccion_diseño",
+]
+COLUMNA_FECHA = "fecha_envio"
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+COLUMNAS_CATEGORIA: List[str] = ["profesion_profesional"]
+
+# Tipo en memoria de cada columna
+DTYPES: Dict[str, str] = {
+    col: (
+        "Int8" if col in COLUMNAS_PUNTAJE
+        else "datetime64[ns]" if col == COLUMNA_FECHA
+        else "category" if col in COLUMNAS_CATEGORIA
+        else TEXTO_DTYPE
+    )
+    for col in COLUMNAS
+}
+
+# Los mismos valores que pd.read_csv considera faltantes por defecto
+TOKENS_NA = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+
+def aplicar_tipos(df: "pd.DataFrame", fechas: bool = True) -> "pd.DataFrame":
+    """Convierte las columnas del esquema presentes en df a su tipo.
+
+    Con fechas=False fecha_envio queda como texto (para scripts que reescriben
+    archivos y no deben perder fechas mal formadas).
+    """
+    import pandas as pd
+
+    out = df.copy()
+    for col in COLUMNAS:
+        if col not in out.columns:
+            continue
+        serie = out[col]
+        if str(serie.dtype) == DTYPES[col] and (fechas or col != COLUMNA_FECHA):
+            continue
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            out[col] = serie if fechas else serie.dt.strftime(FORMATO_FECHA).astype(TEXTO_DTYPE)
+            continue
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype(object)
+        valores = serie.astype(TEXTO_DTYPE)
+        valores = valores.mask(valores.isin(TOKENS_NA))
+        if col in COLUMNAS_PUNTAJE:
+            num = pd.to_numeric(valores, errors="coerce")
+            num = num.where(num.eq(num.round()) & num.between(-128, 127))
+            out[col] = num.astype("Int8")
+        elif col == COLUMNA_FECHA and fechas:
+            out[col] = pd.to_datetime(valores, format=FORMATO_FECHA, errors="coerce")
+        elif col in COLUMNAS_CATEGORIA:
+            out[col] = valores.astype("category")
+        else:
+            out[col] = valores
+    return out
+
+
+def leer_csv(
+    path: Union[str, Path],
+    columnas: Optional[Iterable[str]] = None,
+    tipado: bool = True,
+    fechas: bool = True,
+    **kwargs,
+) -> "pd.DataFrame":
+    """Lee un CSV del esquema.
+
+    Siempre se parte del texto tal cual (dtype=str, sin convertir faltantes);
+    con tipado=True se aplican los tipos del esquema, con tipado=False las
+    celdas quedan como texto para poder reescribir el archivo sin cambios.
+    """
+    import pandas as pd
+
+    kwargs.setdefault("encoding", "utf-8-sig")
+    if columnas is not None:
+        pedidas = set(columnas)
+        kwargs["usecols"] = lambda c: c in pedidas
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, **kwargs)
+    if not tipado:
+        return df
+    return aplicar_tipos(df, fechas=fechas)
+
+
+def a_texto(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Vuelve a texto un frame tipado (puntajes como enteros, fechas con FORMATO_FECHA)"""
+    import pandas as pd
+
+    out = df.copy()
+    for col in out.columns:
+        serie = out[col]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            out[col] = serie.dt.strftime(FORMATO_FECHA).fillna("")
+        elif isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_extension_array_dtype(serie):
+            out[col] = serie.astype(object).where(serie.notna(), "").astype(str)
+    return out
+
+
+def escribir_csv(df: "pd.DataFrame", path: Union[str, Path], **kwargs) -> None:
+    """Escribe en UTF-8 con BOM (para Excel) a través del esquema"""
+    kwargs.setdefault("encoding", "utf-8-sig")
+    a_texto(df).to_csv(path, index=False, **kwargs)
@@ -0,0 +1,306 @@
+"""Estadísticas de puntajes en una sola pasada, con estado combinable.
+
+Cada columna acumula n, suma, momentos (para la desviación estándar), mínimo,
+máximo y la distribución de valores. Mientras los valores sean enteros en el
+rango de Int8 del esquema la distribución es un conteo exacto (256 casillas),
+del que salen la mediana exacta y el histograma; si aparece un valor decimal o
+fuera de rango se pasa a un sketch de cuantiles con error relativo acotado.
+
+Los estados de dos agregadores se combinan sin volver a leer filas, así que un
+parcial por archivo (o por bloque) puede guardarse y sumarse después:
+
+    total = AgregadorPuntajes(COLUMNAS_PUNTAJE)
+    for parcial in parciales:
+        total.combinar(parcial)
+"""
+import math
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from esquema import COLUMNAS_PUNTAJE, aplicar_tipos
+
+# Rango de los puntajes tipados (Int8); dentro de él se cuenta exacto
+COTA_MIN, COTA_MAX = -128, 127
+CASILLAS = COTA_MAX - COTA_MIN + 1
+
+# Error relativo de los cuantiles cuando hay que usar el sketch
+ERROR_RELATIVO = 0.01
+
+# Filas por bloque al leer un CSV para agregarlo
+FILAS_POR_BLOQUE = 100_000
+
+
+class SketchCuantiles:
+    """Histograma logarítmico (al estilo DDSketch) combinable.
+
+    Un valor x cae en la casilla ceil(log_gamma(|x|)); cualquier cuantil se
+    devuelve con error relativo menor que error_relativo.
+    """
+
+    def __init__(self, error_relativo: float = ERROR_RELATIVO):
+        self.error_relativo = error_relativo
+        self.gamma = (1 + error_relativo) / (1 - error_relativo)
+        self._log_gamma = math.log(self.gamma)
+        self.positivos: Counter = Counter()
+        self.negativos: Counter = Counter()
+        self.ceros = 0
+
+    @property
+    def n(self) -> int:
+        return self.ceros + sum(self.positivos.values()) + sum(self.negativos.values())
+
+    def _sumar(self, destino: Counter, valores: np.ndarray, pesos: np.ndarray) -> None:
+        if not len(valores):
+            return
+        indices = np.ceil(np.log(valores) / self._log_gamma).astype(np.int64)
+        unicos, inversa = np.unique(indices, return_inverse=True)
+        totales = np.bincount(inversa, weights=pesos)
+        for i, c in zip(unicos.tolist(), totales.tolist()):
+            destino[i] += int(c)
+
+    def agregar(self, valores: np.ndarray, pesos: Optional[np.ndarray] = None) -> None:
+        """Agrega valores (sin NaN), opcionalmente con un peso entero cada uno"""
+        valores = np.asarray(valores, dtype=float)
+        pesos = np.ones(len(valores)) if pesos is None else np.asarray(pesos, dtype=float)
+        pos = valores > 0
+        neg = valores < 0
+        self.ceros += int(pesos[~pos & ~neg].sum())
+        self._sumar(self.positivos, valores[pos], pesos[pos])
+        self._sumar(self.negativos, -valores[neg], pesos[neg])
+
+    def combinar(self, otro: "SketchCuantiles") -> None:
+        if otro.gamma != self.gamma:
+            raise ValueError("No se pueden combinar sketches con distinto error relativo")
+        self.positivos.update(otro.positivos)
+        self.negativos.update(otro.negativos)
+        self.ceros += otro.ceros
+
+    def _valor(self, indice: int) -> float:
+        # Punto de la casilla con el mismo error relativo hacia ambos bordes
+        return 2 * self.gamma ** indice / (self.gamma + 1)
+
+    def cuantil(self, q: float) -> float:
+        n = self.n
+        if not n:
+            return float("nan")
+        rango = int(round(q * (n - 1)))
+        acumulado = 0
+        for i in sorted(self.negativos, reverse=True):
+            acumulado += self.negativos[i]
+            if acumulado > rango:
+                return -self._valor(i)
+        acumulado += self.ceros
+        if acumulado > rango:
+            return 0.0
+        for i in sorted(self.positivos):
+            acumulado += self.positivos[i]
+            if acumulado > rango:
+                return self._valor(i)
+        return self._valor(max(self.positivos))
+
+    def a_dict(self) -> Dict[str, object]:
+        return {
+            "error_relativo": self.error_relativo,
+            "positivos": {str(k): v for k, v in self.positivos.items()},
+            "negativos": {str(k): v for k, v in self.negativos.items()},
+            "ceros": self.ceros,
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, object]) -> "SketchCuantiles":
+        sketch = cls(datos["error_relativo"])
+        sketch.positivos = Counter({int(k): v for k, v in datos["positivos"].items()})
+        sketch.negativos = Counter({int(k): v for k, v in datos["negativos"].items()})
+        sketch.ceros = datos["ceros"]
+        return sketch
+
+
+class ResumenColumna:
+    """Estado acumulado de una columna de puntajes"""
+
+    def __init__(self):
+        self.n = 0
+        self.suma = 0.0
+        self.media = 0.0
+        self.m2 = 0.0  # suma de cuadrados de desvíos (Welford/Chan)
+        self.minimo: Optional[float] = None
+        self.maximo: Optional[float] = None
+        self.conteos: Optional[np.ndarray] = np.zeros(CASILLAS, dtype=np.int64)
+        self.sketch: Optional[SketchCuantiles] = None
+
+    @property
+    def exacto(self) -> bool:
+        return self.conteos is not None
+
+    def _pasar_a_sketch(self) -> None:
+        # Los conteos exactos se vuelcan al sketch como valores con peso
+        self.sketch = SketchCuantiles()
+        usados = np.flatnonzero(self.conteos)
+        self.sketch.agregar(usados + COTA_MIN, self.conteos[usados])
+        self.conteos = None
+
+    def _combinar_momentos(self, n: int, suma: float, media: float, m2: float, minimo, maximo) -> None:
+        total = self.n + n
+        delta = media - self.media
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.media += delta * n / total
+        self.n = total
+        self.suma += suma
+        self.minimo = minimo if self.minimo is None else min(self.minimo, minimo)
+        self.maximo = maximo if self.maximo is None else max(self.maximo, maximo)
+
+    def actualizar(self, serie: pd.Series) -> None:
+        """Agrega un bloque de valores; los faltantes y no numéricos se ignoran"""
+        if not pd.api.types.is_numeric_dtype(serie):
+            serie = pd.to_numeric(serie, errors="coerce")
+        valores = serie.to_numpy(dtype="float64", na_value=np.nan)
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return
+        media = float(valores.mean())
+        self._combinar_momentos(
+            len(valores),
+            float(valores.sum()),
+            media,
+            float(((valores - media) ** 2).sum()),
+            float(valores.min()),
+            float(valores.max()),
+        )
+        if self.exacto and (
+            np.all(valores == np.round(valores)) and valores.min() >= COTA_MIN and valores.max() <= COTA_MAX
+        ):
+            self.conteos += np.bincount((valores - COTA_MIN).astype(np.int64), minlength=CASILLAS)
+            return
+        if self.exacto:
+            self._pasar_a_sketch()
+        self.sketch.agregar(valores)
+
+    def combinar(self, otro: "ResumenColumna") -> None:
+        if not otro.n:
+            return
+        self._combinar_momentos(otro.n, otro.suma, otro.media, otro.m2, otro.minimo, otro.maximo)
+        if self.exacto and otro.exacto:
+            self.conteos += otro.conteos
+            return
+        if self.exacto:
+            self._pasar_a_sketch()
+        if otro.exacto:
+            otro = ResumenColumna.desde_dict(otro.a_dict())
+            otro._pasar_a_sketch()
+        self.sketch.combinar(otro.sketch)
+
+    def _kesimo(self, k: int) -> int:
+        # Valor en la posición k (desde 0) de los datos ordenados
+        return int(np.searchsorted(np.cumsum(self.conteos), k, side="right")) + COTA_MIN
+
+    def mediana(self) -> float:
+        if not self.n:
+            return float("nan")
+        if not self.exacto:
+            return self.sketch.cuantil(0.5)
+        return (self._kesimo((self.n - 1) // 2) + self._kesimo(self.n // 2)) / 2
+
+    def histograma(self) -> Optional[Dict[int, int]]:
+        """Conteo por valor; None si la columna dejó de ser entera acotada"""
+        if not self.exacto:
+            return None
+        usados = np.flatnonzero(self.conteos)
+        return {int(i) + COTA_MIN: int(self.conteos[i]) for i in usados}
+
+    def resultado(self) -> Dict[str, object]:
+        vacia = not self.n
+        entero = self.exacto and not vacia
+        return {
+            "n": self.n,
+            "media": float("nan") if vacia else self.suma / self.n,
+            "mediana": self.mediana(),
+            "min": float("nan") if vacia else int(self.minimo) if entero else self.minimo,
+            "max": float("nan") if vacia else int(self.maximo) if entero else self.maximo,
+            "desvio": math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else float("nan"),
+            "histograma": self.histograma(),
+            "mediana_exacta": self.exacto,
+        }
+
+    def a_dict(self) -> Dict[str, object]:
+        return {
+            "n": self.n,
+            "suma": self.suma,
+            "media": self.media,
+            "m2": self.m2,
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+            "histograma": self.histograma(),
+            "sketch": None if self.exacto else self.sketch.a_dict(),
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, object]) -> "ResumenColumna":
+        resumen = cls()
+        for campo in ("n", "suma", "media", "m2", "minimo", "maximo"):
+            setattr(resumen, campo, datos[campo])
+        if datos["sketch"] is not None:
+            resumen.conteos = None
+            resumen.sketch = SketchCuantiles.desde_dict(datos["sketch"])
+        else:
+            for valor, conteo in datos["histograma"].items():
+                resumen.conteos[int(valor) - COTA_MIN] = conteo
+        return resumen
+
+
+class AgregadorPuntajes:
+    """Agrega todas las columnas de puntaje a la vez, bloque por bloque"""
+
+    def __init__(self, columnas: Iterable[str] = COLUMNAS_PUNTAJE):
+        self.columnas: List[str] = list(columnas)
+        self.resumenes: Dict[str, ResumenColumna] = {col: ResumenColumna() for col in self.columnas}
+
+    def actualizar(self, df: pd.DataFrame) -> "AgregadorPuntajes":
+        for col, resumen in self.resumenes.items():
+            if col in df.columns:
+                resumen.actualizar(df[col])
+        return self
+
+    def combinar(self, otro: "AgregadorPuntajes") -> "AgregadorPuntajes":
+        for col, resumen in otro.resumenes.items():
+            self.resumenes.setdefault(col, ResumenColumna()).combinar(resumen)
+            if col not in self.columnas:
+                self.columnas.append(col)
+        return self
+
+    def resultado(self) -> Dict[str, Dict[str, object]]:
+        return {col: self.resumenes[col].resultado() for col in self.columnas}
+
+    def a_dict(self) -> Dict[str, Dict[str, object]]:
+        """Estado serializable a JSON, para guardar parciales"""
+        return {col: self.resumenes[col].a_dict() for col in self.columnas}
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Dict[str, object]]) -> "AgregadorPuntajes":
+        agregador = cls(datos.keys())
+        agregador.resumenes = {col: ResumenColumna.desde_dict(d) for col, d in datos.items()}
+        return agregador
+
+
+def agregar_csv(
+    path: Union[str, Path],
+    columnas: Iterable[str] = COLUMNAS_PUNTAJE,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+) -> AgregadorPuntajes:
+    """Agrega un CSV del esquema leyéndolo por bloques (memoria acotada)"""
+    agregador = AgregadorPuntajes(columnas)
+    pedidas = set(agregador.columnas)
+    lector = pd.read_csv(
+        path,
+        dtype=str,
+        keep_default_na=False,
+        encoding="utf-8-sig",
+        usecols=lambda c: c in pedidas,
+        chunksize=filas_por_bloque,
+    )
+    for bloque in lector:
+        agregador.actualizar(aplicar_tipos(bloque))
+    return agregador
@@ -1,58 +1,107 @@
-import pandas as pd
+import argparse
+import csv
 import os
 from pathlib import Path
 
-# Estructura estándar basada en feedback3 y feedback5
-COLUMNAS_ESTANDAR = [
-    'nombre_profesional',
-    'utilidad', 
-    'eficiencia',
-    'intencion_uso',
-    'satisfaccion_claridad',
-    'satisfaccion_diseño', 
-    'modificar_secciones',
-    'comentarios',
-    'fecha_envio',
-    'cedula_profesional',
-    'profesion_profesional'
-]
-
-def estandarizar_csv(archivo_path):
-    """Convierte CSV a estructura estándar"""
+from esquema import COLUMNAS
+
+# Estructura estándar basada en feedback3 y feedback5 (definida en esquema.py)
+COLUMNAS_ESTANDAR = COLUMNAS
+
+# Filas que se acumulan antes de escribir al temporal; acota la memoria
+FILAS_POR_LOTE = 10_000
+
+# Los exports que históricamente venían con columnas de más o desordenadas
+ARCHIVOS_POR_DEFECTO = ['feedback1.csv', 'feedback2.csv', 'feedback4.csv', 'feedback6.csv', 'feedback7.csv']
+
+
+def mapa_columnas(encabezado):
+    """Para cada columna estándar, su posición en el encabezado (o None si falta)"""
+    posiciones = {}
+    for i, col in enumerate(encabezado):
+        posiciones.setdefault(col.strip(), i)
+    return [posiciones.get(col) for col in COLUMNAS_ESTANDAR]
+
+
+def remapear_fila(fila, indices):
+    """Reordena una fila según el mapa; las columnas faltantes quedan vacías"""
+    n = len(fila)
+    return [fila[i] if i is not None and i < n else '' for i in indices]
+
+
+def sobran_campos(fila, ancho):
+    """La fila trae datos más allá del encabezado (p. ej. una coma sin comillas
+    en un comentario): remapearla perdería o correría esos campos"""
+    return len(fila) > ancho and any(c.strip() for c in fila[ancho:])
+
+
+def ruta_rechazadas(archivo_path):
+    # Con prefijo para que no coincida con feedback*.csv y se unifique
+    return archivo_path.with_name('rechazadas_' + archivo_path.name)
+
+
+def estandarizar_csv(archivo_path, filas_por_lote=FILAS_POR_LOTE):
+    """Convierte CSV a estructura estándar.
+
+    Lee fila por fila, escribe por lotes a un temporal al lado del original y
+    lo renombra al final: la memoria no depende del tamaño del archivo y un
+    corte a mitad de camino deja el original intacto.
+    """
+    archivo_path = Path(archivo_path)
+    tmp = archivo_path.with_name(archivo_path.name + '.tmp')
+    rechazadas_path = ruta_rechazadas(archivo_path)
+    tmp_rechazadas = rechazadas_path.with_name(rechazadas_path.name + '.tmp')
     try:
-        # Leer con encoding robusto
-        df = pd.read_csv(archivo_path, encoding='utf-8-sig', dtype=str, keep_default_na=False)
-        
-        # Si está vacío, crear con headers estándar
-        if df.empty:
-            df_std = pd.DataFrame(columns=COLUMNAS_ESTANDAR)
-        else:
-            # Crear DataFrame con columnas estándar
-            df_std = pd.DataFrame(columns=COLUMNAS_ESTANDAR)
-            
-            # Mapear datos existentes
-            for col in COLUMNAS_ESTANDAR:
-                if col in df.columns:
-                    df_std[col] = df[col]
-                else:
-                    df_std[col] = ''
-            
-            # Limpiar encoding corrupto (ñ mal codificada)
-            for col in df_std.columns:
-                if df_std[col].dtype == 'object':
-                    df_std[col] = df_std[col].str.replace('Sí', 'Sí', regex=False)
-                    df_std[col] = df_std[col].str.replace('diseño', 'diseño', regex=False)
-        
-        # Guardar con estructura estándar
-        df_std.to_csv(archivo_path, index=False, encoding='utf-8-sig')
-        print(f"✅ {os.path.basename(archivo_path)} - Estandarizado ({len(df_std)} filas)")
-        
+        filas = 0
+        # Las filas con campos de más no se remapean: van tal cual, con el
+        # encabezado original, a rechazadas_<nombre>.csv para corregirlas a mano
+        rechazadas = []
+        with open(archivo_path, 'r', encoding='utf-8-sig', newline='') as origen, \
+                open(tmp, 'w', encoding='utf-8-sig', newline='') as destino:
+            lector = csv.reader(origen)
+            escritor = csv.writer(destino, lineterminator=os.linesep)
+            escritor.writerow(COLUMNAS_ESTANDAR)
+            # Sin encabezado se escribe solo el estándar
+            encabezado = next(lector, [])
+            indices = mapa_columnas(encabezado)
+            lote = []
+            for fila in lector:
+                if not fila:
+                    continue
+                if encabezado and sobran_campos(fila, len(encabezado)):
+                    rechazadas.append(fila)
+                    continue
+                lote.append(remapear_fila(fila, indices))
+                if len(lote) >= filas_por_lote:
+                    escritor.writerows(lote)
+                    filas += len(lote)
+                    lote.clear()
+            escritor.writerows(lote)
+            filas += len(lote)
+        if rechazadas:
+            with open(tmp_rechazadas, 'w', encoding='utf-8-sig', newline='') as f:
+                escritor = csv.writer(f, lineterminator=os.linesep)
+                escritor.writerow(encabezado)
+                escritor.writerows(rechazadas)
+            os.replace(tmp_rechazadas, rechazadas_path)
+        os.replace(tmp, archivo_path)
+        print(f"✅ {archivo_path.name} - Estandarizado ({filas} filas)")
+        if rechazadas:
+            print(f"⚠️  {len(rechazadas)} filas con más campos que el encabezado -> {rechazadas_path.name}")
+
     except Exception as e:
-        print(f"❌ Error en {os.path.basename(archivo_path)}: {e}")
+        print(f"❌ Error en {archivo_path.name}: {e}")
+    finally:
+        for t in (tmp, tmp_rechazadas):
+            if t.exists():
+                t.unlink()
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lleva los CSV de feedback a la estructura estándar de columnas")
+    parser.add_argument("archivos", nargs="*", default=ARCHIVOS_POR_DEFECTO,
+                        help="CSV a estandarizar, relativos a la carpeta del script (se reescriben en el lugar)")
+    archivos_csv = parser.parse_args(argv).archivos
     base_dir = Path(__file__).parent
-    archivos_csv = ['feedback1.csv', 'feedback2.csv', 'feedback4.csv', 'feedback6.csv', 'feedback7.csv']
     
     print("🔧 Estandarizando estructura de CSV...")
     print(f"📋 Estructura estándar: {len(COLUMNAS_ESTANDAR)} columnas")
@@ -0,0 +1,115 @@
+"""Punto de entrada único para los scripts del repo.
+
+    python feedback.py <subcomando> [opciones del subcomando]
+
+Cada subcomando importa su módulo recién cuando se elige, así un chequeo de
+encabezados (`verify`, con el módulo csv) arranca sin cargar pandas,
+chardet ni reportlab. Las opciones que siguen al subcomando pasan tal cual a
+su main: `python feedback.py merge --help` muestra las de normalize_and_merge.py.
+
+`python feedback.py importtime [subcomando ...]` mide con `python -X importtime`
+cuánto cuesta importar cada subcomando y cuáles son sus imports más pesados.
+"""
+import argparse
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+# subcomando -> (módulo, descripción)
+SUBCOMANDOS = {
+    "merge": ("normalize_and_merge", "normaliza y unifica los feedback*.csv"),
+    "audit": ("auditor_csv", "audita columnas, filas y encoding de cada CSV"),
+    "standardize": ("estandarizar_estructura", "lleva los CSV a la estructura estándar de columnas"),
+    "repair": ("reparar_mojibake", "repara mojibake (Ã±, Ã©...) en CSV, en el lugar"),
+    "report": ("informe_validacion", "genera el informe de validación en PDF"),
+    "verify": ("verificar_estructura", "chequeo rápido de encabezados, sin pandas"),
+    "watch": ("vigilar", "vigila la carpeta y unifica cada export nuevo al llegar"),
+    "near-dupes": ("duplicados_cercanos", "agrupa respuestas casi duplicadas (MinHash + LSH)"),
+    "search": ("indice_texto", "busca palabras y frases en los comentarios (índice invertido)"),
+}
+
+# Imports pesados que se informan aparte en la medición
+PESADOS = ("pandas", "numpy", "pyarrow", "chardet", "reportlab", "unidecode")
+
+
+def tiempos_de_importacion(modulo):
+    """Corre `import modulo` en un intérprete nuevo con -X importtime.
+
+    Devuelve (total_ms, hijos, pesados): el tiempo acumulado del módulo, sus
+    imports directos como [(ms, nombre)] de mayor a menor y los de PESADOS que
+    terminó cargando.
+    """
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=Path(__file__).resolve().parent, capture_output=True, text=True,
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+    # Formato: "import time: <self us> | <acumulado us> | <sangría><nombre>"
+    lineas = []
+    for linea in proceso.stderr.splitlines():
+        partes = linea.removeprefix("import time:").split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        nombre = partes[2].rstrip()
+        lineas.append((int(partes[1]) / 1000, nombre.lstrip(), len(nombre) - len(nombre.lstrip())))
+
+    total = next(ms for ms, nombre, nivel in lineas if nombre == modulo and nivel == 1)
+    # Los imports directos tienen un nivel más de sangría que el módulo
+    hijos = sorted(((ms, nombre) for ms, nombre, nivel in lineas if nivel == 3), reverse=True)
+    cargados = {nombre.split(".")[0] for _, nombre, _ in lineas}
+    return total, hijos, [p for p in PESADOS if p in cargados]
+
+
+def medir_arranque(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="feedback.py importtime", description="Mide el costo de importar cada subcomando (-X importtime)"
+    )
+    parser.add_argument("subcomandos", nargs="*", metavar="SUBCOMANDO",
+                        help=f"subcomandos a medir (por defecto todos: {', '.join(SUBCOMANDOS)})")
+    parser.add_argument("--maximo-ms", type=float, help="terminar con error si algún subcomando tarda más que esto")
+    args = parser.parse_args(argv)
+    desconocidos = [s for s in args.subcomandos if s not in SUBCOMANDOS]
+    if desconocidos:
+        parser.error(f"subcomandos desconocidos: {', '.join(desconocidos)}")
+
+    print(f"{'Subcomando':<12} {'Módulo':<24} {'ms':>8}  {'Más pesados':<40} Cargados")
+    excedidos = []
+    for subcomando in args.subcomandos or SUBCOMANDOS:
+        modulo = SUBCOMANDOS[subcomando][0]
+        total, hijos, pesados = tiempos_de_importacion(modulo)
+        top = ", ".join(f"{nombre} {ms:.0f}" for ms, nombre in hijos[:3])
+        print(f"{subcomando:<12} {modulo:<24} {total:>8.1f}  {top[:40]:<40} {', '.join(pesados) or '-'}")
+        if args.maximo_ms is not None and total > args.maximo_ms:
+            excedidos.append(subcomando)
+    if excedidos:
+        print(f"❌ Superan {args.maximo_ms:.0f} ms: {', '.join(excedidos)}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="feedback.py",
+        description="Scripts de los CSV de feedback",
+        epilog="\n".join(f"  {n:<12} {d}" for n, (_, d) in SUBCOMANDOS.items())
+        + "\n  importtime   mide el tiempo de importación de cada subcomando",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("subcomando", choices=list(SUBCOMANDOS) + ["importtime"], metavar="SUBCOMANDO")
+    parser.add_argument("argumentos", nargs=argparse.REMAINDER, help="opciones del subcomando")
+    args = parser.parse_args(argv[:1])
+    resto = argv[1:]
+
+    if args.subcomando == "importtime":
+        return medir_arranque(resto)
+    modulo, _ = SUBCOMANDOS[args.subcomando]
+    # El argparse de cada script muestra el nombre del subcomando en --help y errores
+    sys.argv = [f"feedback.py {args.subcomando}"] + resto
+    return importlib.import_module(modulo).main(resto) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,497 @@
+"""Índice invertido de comentarios y modificar_secciones.
+
+Buscar un tema ("informe", "pdf", "color") con `in` sobre cada comentario es
+una pasada por todas las filas en cada consulta. Acá cada texto distinto se
+normaliza una sola vez como en el clasificador (minúsculas + unidecode), se
+parte en palabras y se guarda, para cada palabra, en qué textos, en qué
+columna y en qué posición aparece. Una consulta solo lee las listas de las
+palabras que nombra.
+
+El índice se guarda junto al unificado (validacion_unificado.indice.npz) con
+la firma del CSV que cubre. Si el CSV cambió, se leen sus dos columnas de
+texto y solo se parten en palabras los textos que no estaban indexados; las
+filas se identifican por un digest de su texto, como en cache_informe.py.
+
+Consultas, sin distinguir tildes ni mayúsculas:
+
+    pdf                         la palabra
+    color*                      palabras que empiezan así (color, colores)
+    "entrevista inicial"        frase: las palabras seguidas
+    informe OR imprimir         cualquiera de las dos
+    pdf AND NOT exportar        AND se puede omitir: `pdf exportar`
+    (informe OR pdf) celular    paréntesis
+
+    indice = IndiceTexto.abrir("validacion_unificado.csv")
+    resultado = indice.buscar('"entrevista inicial" AND edad')
+    resultado.filas, resultado.aciertos   # filas del unificado y apariciones en cada una
+    indice.contar("color* OR contraste")
+
+    python indice_texto.py 'informe* OR imprimir*' [--columnas comentarios] [--mostrar 5]
+    python indice_texto.py --temas
+"""
+import argparse
+import bisect
+import os
+import re
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from unidecode import unidecode
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+COLUMNAS_TEXTO = ["comentarios", "modificar_secciones"]
+INDICE_NAME = "validacion_unificado.indice.npz"
+# Cambiarla hace que el índice se vuelva a construir desde cero
+VERSION_INDICE = 1
+PALABRA = re.compile(r"[a-z0-9]+")
+# Trozos entre separadores ASCII: unidecode va carácter por carácter y deja
+# igual lo ASCII, así que cada trozo se puede pasar por unidecode por separado
+TROZO = re.compile(r"[a-z0-9\x80-\U0010ffff]+")
+# Piezas de una consulta: paréntesis, frases entre comillas, operadores y términos
+PIEZA = re.compile(r'\(|\)|"[^"]*"?|[^\s()"]+')
+OPERADORES = {"AND", "OR", "NOT"}
+# Si más de esta proporción de los textos indexados ya no está en el unificado, se reconstruye
+MAX_HUERFANOS = 0.5
+
+# (textos, apariciones) de una subconsulta: ids de texto ordenados y sin repetir
+Aciertos = Tuple[np.ndarray, np.ndarray]
+
+
+class Resultado(NamedTuple):
+    """Filas del unificado (posición, en orden) y cuántas apariciones tiene cada una"""
+
+    filas: np.ndarray
+    aciertos: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.filas)
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas + unidecode, igual que clasificador.normalizar_textos"""
+    return unidecode(texto.lower())
+
+
+def palabras(texto: str, trozos: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """Palabras de un texto, ya normalizadas: lo mismo que PALABRA.findall(normalizar(texto)).
+
+    unidecode se aplica solo a los trozos con caracteres no ASCII, una vez por
+    trozo distinto si se pasa el diccionario trozos.
+    """
+    texto = texto.lower()
+    if texto.isascii():
+        return PALABRA.findall(texto)
+    if trozos is None:
+        trozos = {}
+    resultado: List[str] = []
+    for trozo in TROZO.findall(texto):
+        partes = trozos.get(trozo)
+        if partes is None:
+            partes = trozos[trozo] = [trozo] if trozo.isascii() else PALABRA.findall(unidecode(trozo))
+        resultado.extend(partes)
+    return resultado
+
+
+def _contar(docs: np.ndarray) -> Aciertos:
+    return np.unique(docs, return_counts=True)
+
+
+def _y(a: Aciertos, b: Aciertos) -> Aciertos:
+    docs, ia, ib = np.intersect1d(a[0], b[0], assume_unique=True, return_indices=True)
+    return docs, a[1][ia] + b[1][ib]
+
+
+def _o(a: Aciertos, b: Aciertos) -> Aciertos:
+    docs = np.union1d(a[0], b[0])
+    aciertos = np.zeros(len(docs), dtype=np.int64)
+    aciertos[np.searchsorted(docs, a[0])] += a[1]
+    aciertos[np.searchsorted(docs, b[0])] += b[1]
+    return docs, aciertos
+
+
+class IndiceTexto:
+    """Índice invertido con posiciones sobre las columnas de texto del unificado.
+
+    Para cada palabra del vocabulario, sus apariciones (texto, columna,
+    posición) están en doc/campo/pos entre inicio[t] e inicio[t + 1],
+    ordenadas por texto. fila_doc dice qué texto tiene cada fila del unificado.
+    """
+
+    def __init__(self, columnas: Sequence[str] = COLUMNAS_TEXTO):
+        self.columnas = list(columnas)
+        self.vocabulario: List[str] = []
+        self.inicio = np.zeros(1, dtype=np.int64)
+        self.doc = np.zeros(0, dtype=np.int32)
+        self.campo = np.zeros(0, dtype=np.int8)
+        self.pos = np.zeros(0, dtype=np.int32)
+        self.digests = np.zeros(0, dtype=np.uint64)
+        self.fila_doc = np.zeros(0, dtype=np.int32)
+        self.firma: Optional[Tuple[int, int]] = None
+        self.agregados = 0
+        self._ids: Optional[Dict[str, int]] = None
+        self._ordenado: Optional[List[str]] = None
+        self._vigentes: Optional[np.ndarray] = None
+
+    # --- Persistencia ---
+
+    @classmethod
+    def cargar(cls, path: Union[str, Path], columnas: Sequence[str] = COLUMNAS_TEXTO) -> "IndiceTexto":
+        """Carga el índice; si no existe o no corresponde, arranca vacío"""
+        indice = cls(columnas)
+        try:
+            with np.load(path, allow_pickle=False) as datos:
+                if int(datos["version"]) != VERSION_INDICE or _texto(datos["columnas"]) != "\n".join(indice.columnas):
+                    return indice
+                vocabulario = _texto(datos["vocabulario"])
+                indice.vocabulario = vocabulario.split("\n") if vocabulario else []
+                for nombre in ("inicio", "doc", "campo", "pos", "digests", "fila_doc"):
+                    setattr(indice, nombre, datos[nombre])
+                indice.firma = tuple(int(v) for v in datos["firma"])
+        except (OSError, ValueError, KeyError):
+            return cls(columnas)
+        return indice
+
+    def guardar(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                version=np.array(VERSION_INDICE),
+                columnas=_bytes("\n".join(self.columnas)),
+                # Las palabras son [a-z0-9]+: se guardan unidas por saltos de línea
+                vocabulario=_bytes("\n".join(self.vocabulario)),
+                inicio=self.inicio,
+                doc=self.doc,
+                campo=self.campo,
+                pos=self.pos,
+                digests=self.digests,
+                fila_doc=self.fila_doc,
+                firma=np.array(self.firma or (-1, -1), dtype=np.int64),
+            )
+        os.replace(tmp, path)
+
+    @staticmethod
+    def firma_de(unificado: Union[str, Path]) -> Tuple[int, int]:
+        st = os.stat(unificado)
+        return st.st_size, st.st_mtime_ns
+
+    def en_sincronia(self, unificado: Union[str, Path]) -> bool:
+        """True si el índice corresponde exactamente al CSV unificado actual"""
+        return os.path.exists(unificado) and self.firma == self.firma_de(unificado)
+
+    @classmethod
+    def abrir(
+        cls,
+        unificado: Union[str, Path] = "validacion_unificado.csv",
+        path: Optional[Union[str, Path]] = None,
+        columnas: Sequence[str] = COLUMNAS_TEXTO,
+        reconstruir: bool = False,
+    ) -> "IndiceTexto":
+        """Índice al día con el unificado: lo carga y, si el CSV cambió, agrega lo nuevo y lo guarda"""
+        from esquema import leer_csv
+
+        path = Path(path) if path is not None else Path(unificado).with_name(INDICE_NAME)
+        indice = cls(columnas) if reconstruir else cls.cargar(path, columnas)
+        if not indice.en_sincronia(unificado):
+            # La firma se toma antes de leer: si el CSV cambia mientras tanto, la próxima vez se vuelve a mirar
+            firma = cls.firma_de(unificado)
+            indice.actualizar(leer_csv(unificado, columnas=indice.columnas, tipado=False))
+            indice.firma = firma
+            indice.guardar(path)
+        return indice
+
+    # --- Construcción ---
+
+    def _digests(self, df: "pd.DataFrame") -> np.ndarray:
+        import pandas as pd
+
+        return pd.util.hash_pandas_object(df[self.columnas].fillna(""), index=False).to_numpy()
+
+    def actualizar(self, df: "pd.DataFrame") -> int:
+        """Deja el índice cubriendo exactamente las filas de df; devuelve cuántos textos se agregaron.
+
+        Los textos ya indexados (mismo digest) no se vuelven a procesar. Si la
+        mayoría de los indexados ya no está en df, se reconstruye desde cero.
+        """
+        digests = self._digests(df)
+        orden = np.argsort(self.digests, kind="stable")
+        conocidos = self.digests[orden]
+        lugar = np.searchsorted(conocidos, digests).clip(max=max(len(conocidos) - 1, 0))
+        encontrados = (conocidos[lugar] == digests) if len(conocidos) else np.zeros(len(digests), dtype=bool)
+
+        # Ids de los textos nuevos en orden de digest, desde el siguiente libre
+        faltan = np.flatnonzero(~encontrados)
+        nuevos, primera = np.unique(digests[faltan], return_index=True)
+        huerfanos = len(self.digests) - len(np.intersect1d(self.digests, digests))
+        if len(self.digests) and huerfanos > MAX_HUERFANOS * (len(self.digests) + len(nuevos)):
+            self.__init__(self.columnas)
+            return self.actualizar(df)
+
+        primero = len(self.digests)
+        if len(nuevos):
+            filas = faltan[primera]
+            self._agregar(primero, [df[c].fillna("").to_numpy()[filas] for c in self.columnas])
+            self.digests = np.concatenate([self.digests, nuevos])
+
+        ids = np.empty(len(digests), dtype=np.int32)
+        ids[encontrados] = orden[lugar[encontrados]]
+        ids[faltan] = primero + np.searchsorted(nuevos, digests[faltan])
+        self.fila_doc = ids
+        self.agregados = len(nuevos)
+        self._vigentes = None
+        return len(nuevos)
+
+    def _agregar(self, primero: int, textos_por_campo: Sequence[Sequence[str]]) -> None:
+        """Apariciones de los textos nuevos (ids primero, primero + 1, ...), mezcladas en las listas"""
+        import pandas as pd
+
+        tokens, docs, campos, posiciones = [], [], [], []
+        trozos: Dict[str, List[str]] = {}
+        for campo, textos in enumerate(textos_por_campo):
+            listas = [palabras(t, trozos) for t in textos]
+            largos = np.fromiter(map(len, listas), dtype=np.int64, count=len(listas))
+            total = int(largos.sum())
+            tokens.append(list(chain.from_iterable(listas)))
+            docs.append(np.repeat(np.arange(primero, primero + len(listas), dtype=np.int32), largos))
+            campos.append(np.full(total, campo, dtype=np.int8))
+            posiciones.append((np.arange(total) - np.repeat(np.cumsum(largos) - largos, largos)).astype(np.int32))
+        tokens = list(chain.from_iterable(tokens))
+
+        # Id de cada palabra: las del vocabulario conservan el suyo, las nuevas van al final
+        termino = pd.Index(self.vocabulario, dtype=object).get_indexer(tokens) if self.vocabulario else (
+            np.full(len(tokens), -1, dtype=np.int64)
+        )
+        faltan = termino < 0
+        codigos, nuevas = pd.factorize(np.asarray(tokens, dtype=object)[faltan])
+        termino[faltan] = len(self.vocabulario) + codigos
+        self.vocabulario.extend(nuevas.tolist())
+
+        doc, campo, pos = np.concatenate(docs), np.concatenate(campos), np.concatenate(posiciones)
+        nuevo = np.lexsort((pos, campo, doc, termino))
+        # Las listas viejas ya están en orden y los textos nuevos tienen ids mayores:
+        # un orden estable por palabra deja cada lista ordenada por texto
+        viejo = np.repeat(np.arange(len(self.inicio) - 1), np.diff(self.inicio))
+        terminos = np.concatenate([viejo, termino[nuevo]])
+        orden = np.argsort(terminos, kind="stable")
+        self.doc = np.concatenate([self.doc, doc[nuevo]])[orden]
+        self.campo = np.concatenate([self.campo, campo[nuevo]])[orden]
+        self.pos = np.concatenate([self.pos, pos[nuevo]])[orden]
+        self.inicio = np.concatenate([[0], np.cumsum(np.bincount(terminos, minlength=len(self.vocabulario)))])
+        self._ids = self._ordenado = None
+
+    # --- Consultas ---
+
+    def _id(self, palabra: str) -> Optional[int]:
+        if self._ids is None:
+            self._ids = {p: i for i, p in enumerate(self.vocabulario)}
+        return self._ids.get(palabra)
+
+    def _con_prefijo(self, prefijo: str) -> List[int]:
+        if self._ordenado is None:
+            self._ordenado = sorted(self.vocabulario)
+        desde = bisect.bisect_left(self._ordenado, prefijo)
+        hasta = bisect.bisect_left(self._ordenado, prefijo + "\x7f")
+        return [self._id(p) for p in self._ordenado[desde:hasta]]
+
+    def _apariciones(self, ids: Sequence[int], campos: Optional[np.ndarray]) -> Tuple[np.ndarray, ...]:
+        """(doc, campo, pos) de todas las apariciones de estas palabras"""
+        tramos = [slice(self.inicio[i], self.inicio[i + 1]) for i in ids]
+        doc, campo, pos = (np.concatenate([a[t] for t in tramos] or [a[:0]]) for a in (self.doc, self.campo, self.pos))
+        if campos is not None:
+            dentro = np.isin(campo, campos)
+            doc, campo, pos = doc[dentro], campo[dentro], pos[dentro]
+        return doc, campo, pos
+
+    def _palabra(self, palabra: str, campos: Optional[np.ndarray]) -> Aciertos:
+        i = self._id(palabra)
+        return _contar(self._apariciones([] if i is None else [i], campos)[0])
+
+    def _prefijo(self, prefijo: str, campos: Optional[np.ndarray]) -> Aciertos:
+        return _contar(self._apariciones(self._con_prefijo(prefijo), campos)[0])
+
+    def _frase(self, frase: Sequence[str], campos: Optional[np.ndarray]) -> Aciertos:
+        """Textos donde las palabras aparecen seguidas, dentro de la misma columna"""
+        claves = None
+        for k, palabra in enumerate(frase):
+            i = self._id(palabra)
+            doc, campo, pos = self._apariciones([] if i is None else [i], campos)
+            # Clave de la posición donde empezaría la frase: (texto, columna, posición - k)
+            validas = pos >= k
+            clave = (
+                (doc[validas].astype(np.int64) << 40)
+                | (campo[validas].astype(np.int64) << 32)
+                | (pos[validas] - k).astype(np.int64)
+            )
+            claves = clave if claves is None else np.intersect1d(claves, clave, assume_unique=True)
+        return _contar(claves >> 40)
+
+    def _vigentes_docs(self) -> np.ndarray:
+        if self._vigentes is None:
+            self._vigentes = np.unique(self.fila_doc)
+        return self._vigentes
+
+    def _no(self, a: Aciertos) -> Aciertos:
+        docs = np.setdiff1d(self._vigentes_docs(), a[0], assume_unique=True)
+        return docs, np.zeros(len(docs), dtype=np.int64)
+
+    def _evaluar(self, consulta: str, campos: Optional[np.ndarray]) -> Aciertos:
+        piezas = PIEZA.findall(consulta)
+        if not piezas:
+            raise ValueError("consulta vacía")
+        lugar = 0
+
+        def ver() -> Optional[str]:
+            return piezas[lugar] if lugar < len(piezas) else None
+
+        def tomar() -> str:
+            nonlocal lugar
+            lugar += 1
+            return piezas[lugar - 1]
+
+        def o() -> Aciertos:
+            izq = y()
+            while ver() == "OR":
+                tomar()
+                izq = _o(izq, y())
+            return izq
+
+        def y() -> Aciertos:
+            izq = no()
+            while ver() not in (None, ")", "OR"):
+                if ver() == "AND":
+                    tomar()
+                izq = _y(izq, no())
+            return izq
+
+        def no() -> Aciertos:
+            if ver() == "NOT":
+                tomar()
+                return self._no(no())
+            return atomo()
+
+        def atomo() -> Aciertos:
+            pieza = tomar() if ver() is not None else None
+            if pieza is None or pieza in OPERADORES or pieza == ")":
+                raise ValueError(f"consulta inválida: falta un término en {consulta!r}")
+            if pieza == "(":
+                dentro = o()
+                if ver() != ")":
+                    raise ValueError(f"consulta inválida: falta ')' en {consulta!r}")
+                tomar()
+                return dentro
+            if pieza.startswith('"'):
+                frase = palabras(pieza.strip('"'))
+                if not frase:
+                    raise ValueError(f"frase sin palabras: {pieza}")
+                return self._frase(frase, campos)
+            prefijo = pieza.endswith("*")
+            partes = palabras(pieza.rstrip("*"))
+            if not partes:
+                raise ValueError(f"término sin palabras: {pieza}")
+            if prefijo:
+                if len(partes) > 1:
+                    raise ValueError(f"el prefijo debe ser una sola palabra: {pieza}")
+                return self._prefijo(partes[0], campos)
+            # "e-mail" se parte en dos palabras: se busca como frase
+            return self._palabra(partes[0], campos) if len(partes) == 1 else self._frase(partes, campos)
+
+        resultado = o()
+        if ver() is not None:
+            raise ValueError(f"consulta inválida: sobra {ver()!r} en {consulta!r}")
+        return resultado
+
+    def buscar(self, consulta: str, columnas: Optional[Sequence[str]] = None) -> Resultado:
+        """Filas del unificado que cumplen la consulta, con sus apariciones.
+
+        Las apariciones suman las de cada término o frase que coincide en la
+        fila (un NOT no suma). Con columnas se busca solo en esas columnas.
+        """
+        campos = None
+        if columnas is not None:
+            desconocidas = set(columnas) - set(self.columnas)
+            if desconocidas:
+                raise ValueError(f"columnas no indexadas: {sorted(desconocidas)}")
+            campos = np.array([self.columnas.index(c) for c in columnas], dtype=np.int8)
+        docs, aciertos = self._evaluar(consulta, campos)
+        marcados = np.zeros(len(self.digests), dtype=bool)
+        marcados[docs] = True
+        por_doc = np.zeros(len(self.digests), dtype=np.int64)
+        por_doc[docs] = aciertos
+        filas = np.flatnonzero(marcados[self.fila_doc])
+        return Resultado(filas, por_doc[self.fila_doc[filas]])
+
+    def contar(self, consulta: str, columnas: Optional[Sequence[str]] = None) -> int:
+        """Cuántas filas del unificado cumplen la consulta"""
+        return len(self.buscar(consulta, columnas))
+
+
+def _bytes(texto: str) -> np.ndarray:
+    return np.frombuffer(texto.encode("utf-8"), dtype=np.uint8)
+
+
+def _texto(arreglo: np.ndarray) -> str:
+    return arreglo.tobytes().decode("utf-8")
+
+
+def consulta_de_tema(palabras_tema: Sequence[str]) -> str:
+    """Consulta equivalente a "alguna de estas palabras", como prefijos (color -> colores)"""
+    return " OR ".join(f"{p}*" for p in palabras_tema)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Busca palabras y frases en comentarios y modificar_secciones")
+    parser.add_argument("consultas", nargs="*", help="""consultas, p. ej. pdf '"entrevista inicial"' 'color* OR contraste'""")
+    parser.add_argument("--entrada", default="validacion_unificado.csv", help="CSV unificado")
+    parser.add_argument("--indice", help=f"archivo del índice (por defecto {INDICE_NAME} junto a la entrada)")
+    parser.add_argument("--columnas", help="buscar solo en estas columnas, separadas por coma")
+    parser.add_argument("--mostrar", type=int, default=5, help="filas de ejemplo por consulta")
+    parser.add_argument(
+        "--temas", action="store_true",
+        help="contar las filas que mencionan cada tema de mejora del informe, como prefijos de palabra y "
+             "contando una fila en todos los temas que menciona (el informe busca subcadenas y usa solo el "
+             "primer tema, así que los números no coinciden)",
+    )
+    parser.add_argument("--reconstruir", action="store_true", help="construir el índice desde cero")
+    args = parser.parse_args(argv)
+    if not args.consultas and not args.temas:
+        parser.error("indicar al menos una consulta o --temas")
+    if not os.path.exists(args.entrada):
+        parser.error(f"no existe {args.entrada}: correr primero normalize_and_merge.py")
+
+    indice = IndiceTexto.abrir(args.entrada, args.indice, reconstruir=args.reconstruir)
+    print(
+        f"📚 Índice: {len(indice.fila_doc)} filas, {len(indice.digests)} textos, "
+        f"{len(indice.vocabulario)} palabras ({indice.agregados} textos nuevos)"
+    )
+    columnas = [c.strip() for c in args.columnas.split(",") if c.strip()] if args.columnas else None
+
+    consultas = [(c, c) for c in args.consultas]
+    if args.temas:
+        from clasificador import TEMAS_COMENTARIOS
+
+        consultas += [(f"{frase} [{consulta_de_tema(p)}]", consulta_de_tema(p)) for frase, p in TEMAS_COMENTARIOS]
+
+    df = None
+    for etiqueta, consulta in consultas:
+        try:
+            resultado = indice.buscar(consulta, columnas)
+        except ValueError as e:
+            print(f"❌ {e}")
+            continue
+        print(f"🔎 {etiqueta}: {len(resultado)} filas, {int(resultado.aciertos.sum())} apariciones")
+        if args.mostrar and len(resultado):
+            if df is None:
+                from esquema import leer_csv
+
+                df = leer_csv(args.entrada, columnas=indice.columnas, tipado=False)[indice.columnas]
+            for fila, n in zip(resultado.filas[:args.mostrar], resultado.aciertos[:args.mostrar]):
+                texto = " | ".join(" ".join(v.split()) for v in df.iloc[fila] if v.strip())
+                print(f"   fila {fila} ({n}): {texto[:100]}")
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,72 @@
+import argparse
+import os
 import pandas as pd
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 from unidecode import unidecode
-
-# Archivo CSV
+from esquema import COLUMNAS_PUNTAJE, aplicar_tipos, leer_csv
+from clasificador import TEMAS_COMENTARIOS, ClasificadorComentarios
+from cache_informe import CACHE_NAME, CacheInforme, digests_filas
+from estadisticas import AgregadorPuntajes
+from almacen import ALMACEN_NAME, Almacen
+from tablas_pdf import TablaPaginada, recortar_con_apendice
+from instrumentacion import DESTINO_POR_DEFECTO, activa, activar, etapa, resumen
+
+# Archivo CSV y su copia columnar (la genera normalize_and_merge.py)
 csv_file = "validacion_unificado.csv"
+parquet_file = "validacion_unificado.parquet"
+pdf_file = "informe_validacion.pdf"
+
+# Columnas que usa el informe
+columnas_informe = COLUMNAS_PUNTAJE + ["modificar_secciones", "comentarios"]
 
-# Leer CSV
-df = pd.read_csv(csv_file)
+# Columnas por las que se puede generar un informe por grupo
+columnas_particion = {
+    "profesion": "profesion_profesional",
+    "profesional": "nombre_profesional",
+}
+# Grupo de las filas sin valor en la columna de partición
+grupo_sin_dato = "(sin dato)"
+
+def leer_unificado(columnas=columnas_informe, sqlite=None, **filtros):
+    """Lee el Parquet tipado si está al día con el CSV; si no, el CSV con los tipos del esquema.
+
+    Con sqlite (la base de normalize_and_merge.py --sqlite) lee de ahí solo las
+    filas de los filtros (profesion, desde, hasta, cedula), buscando por índice.
+    """
+    if sqlite is not None:
+        if not os.path.exists(sqlite):
+            raise FileNotFoundError(f"No existe la base {sqlite}: correr normalize_and_merge.py --sqlite")
+        with Almacen(sqlite) as almacen:
+            if os.path.exists(csv_file) and not almacen.en_sincronia(csv_file):
+                print(f"⚠️ {sqlite} no está al día con {csv_file}")
+            return almacen.consultar(columnas, **filtros)
+    if os.path.exists(parquet_file) and (
+        not os.path.exists(csv_file) or os.path.getmtime(parquet_file) >= os.path.getmtime(csv_file)
+    ):
+        try:
+            return aplicar_tipos(pd.read_parquet(parquet_file, columns=columnas))
+        except (ImportError, ValueError, OSError):
+            pass
+    return leer_csv(csv_file, columnas=columnas)
 
 # ============================================================
 # LIMPIEZA DEFINITIVA DE 'modificar_secciones'
 # ============================================================
 
-if 'modificar_secciones' in df.columns:
-    df['modificar_secciones'] = df['modificar_secciones'].astype(str).str.strip().replace(r'\s+', ' ', regex=True)
-    df['modificar_secciones'] = df['modificar_secciones'].replace(
-        r'^(Nada|-|None|nan|\.|\s*)$', '', regex=True
-    )
+patron_espacios = r'\s+'
+patron_sin_respuesta = r'^(Nada|-|None|nan|\.|\s*)$'
 
-df_modificaciones = df[df['modificar_secciones'] != ''].copy()
+def limpiar_modificaciones(filas):
+    limpio = filas['modificar_secciones'].astype(object).fillna('').astype(str).str.strip().replace(patron_espacios, ' ', regex=True)
+    limpio = limpio.replace(patron_sin_respuesta, '', regex=True)
+    return limpio.to_frame()
 
 # ============================================================
 # MÉTRICAS CUANTITATIVAS
@@ -36,16 +80,6 @@ metrics_cols = {
     "satisfaccion_diseño": "Diseño visual"
 }
 
-def calc_metrics(col):
-    return {
-        "media": df[col].mean(),
-        "mediana": df[col].median(),
-        "min": df[col].min(),
-        "max": df[col].max()
-    }
-
-metrics_results = {name: calc_metrics(col) for col, name in metrics_cols.items() if col in df.columns}
-
 # ============================================================
 # CLASIFICACIÓN AUTOMÁTICA DE COMENTARIOS
 # ============================================================
@@ -63,65 +97,95 @@ negative_keywords = [
     "mejorar", "deficiente"
 ]
 
-def classify_comment(comment: str) -> str:
-    text = unidecode(comment.lower())
-    has_pos = any(kw in text for kw in positive_keywords)
-    has_neg = any(kw in text for kw in negative_keywords)
-    if has_pos and has_neg:
-        return "mixto"
-    elif has_pos:
-        return "positivo"
-    elif has_neg:
-        return "negativo"
+# Las listas se compilan una vez; toda la columna se clasifica en una llamada
+clasificador = ClasificadorComentarios(positive_keywords, negative_keywords)
+
+def preparar(df, cache=None):
+    """Limpia modificar_secciones, clasifica comentarios y agrega las métricas.
+
+    Con una caché (por digest del contenido de la fila) solo se limpian,
+    clasifican y agregan las filas nuevas. Devuelve (df, agregador).
+    """
+    df = df.copy()
+    columnas_metricas = [col for col in metrics_cols if col in df.columns]
+    if cache is not None:
+        digests = digests_filas(df, cache.columnas)
+
+    def completar(nombre, firma, calcular):
+        if cache is None:
+            return calcular(df)
+        return cache.completar(nombre, firma, digests, df, calcular)
+
+    if 'modificar_secciones' in df.columns:
+        df['modificar_secciones'] = completar(
+            "modificar_secciones", [patron_espacios, patron_sin_respuesta], limpiar_modificaciones
+        )['modificar_secciones']
+
+    # Todas las métricas de todas las columnas en una pasada (n, media, mediana,
+    # mín, máx, desvío e histograma); la mediana es exacta por conteo. El estado
+    # guardado en la caché se combina con el de las filas nuevas
+    with etapa("metricas", filas=len(df)):
+        if cache is None:
+            agregador = AgregadorPuntajes(columnas_metricas).actualizar(df)
+        else:
+            agregador = cache.agregar_puntajes(digests, df, columnas_metricas)
+
+    if "comentarios" in df.columns:
+        with etapa("clasificacion", filas=len(df)):
+            clasificacion = completar(
+                "clasificacion",
+                [sorted(positive_keywords), sorted(negative_keywords)],
+                lambda filas: clasificador.clasificar(filas["comentarios"]),
+            )
+        df["clasificacion_auto"] = clasificacion["clasificacion"]
+        # Palabras clave que justifican cada etiqueta (para auditar)
+        df["palabras_positivas"] = clasificacion["palabras_positivas"]
+        df["palabras_negativas"] = clasificacion["palabras_negativas"]
     else:
-        return "neutral"
+        df["clasificacion_auto"] = []
 
-if "comentarios" in df.columns:
-    df["clasificacion_auto"] = df["comentarios"].fillna("").apply(classify_comment)
-else:
-    df["clasificacion_auto"] = []
+    if cache is not None:
+        cache.guardar(digests)
+        print(f"Caché del informe: {len(cache.calculadas)} filas procesadas de {len(df)}")
+    return df, agregador
 
 # ============================================================
 # COMENTARIOS POSITIVOS
 # ============================================================
 
-comentarios_positivos_list = df.loc[df["clasificacion_auto"] == "positivo", "comentarios"].dropna().tolist()
-
-# Agregamos los dos comentarios positivos adicionales
-comentarios_positivos_list.extend([
+# Los dos comentarios positivos adicionales del informe general
+comentarios_positivos_adicionales = [
     "Por el momento lo percibo cómodo y con la información necesaria para el trabajo.",
     "Me parece que, mientras una persona trabaje con este tipo de anotaciones e informes, esta sistematización es muy útil para la interacción e intervención con otros profesionales en la práctica, y permite que el trabajo sea más simple y fácil de coordinar con otros terapeutas."
-])
-
-# Mantener solo los 14 ítems
-comentarios_positivos_list = comentarios_positivos_list[:14]
+]
 
 # ============================================================
 # MEJORAS CONSTRUCTIVAS – COMENTARIOS
 # ============================================================
 
-mejoras_comentarios = [
-    c for c in df['comentarios'].dropna()
-    if c not in comentarios_positivos_list
-]
-
 irrelevantes_comentarios = ["nada", "si algo", ".", "nada más", "no tengo"]
-comentarios_relevantes = [
-    c for c in mejoras_comentarios
-    if unidecode(c.strip().lower()) not in irrelevantes_comentarios
-]
 
-resumen_comentarios = []
-for c in comentarios_relevantes:
-    c_lower = unidecode(c.lower())
-    if "informe" in c_lower or "imprimir" in c_lower:
-        resumen_comentarios.append("Generar una versión de informe para imprimir.")
-    elif "pdf" in c_lower:
-        resumen_comentarios.append("Permitir exportar e importar archivos en PDF.")
-    elif "color" in c_lower or "contraste" in c_lower:
-        resumen_comentarios.append("Mejorar colores y contraste de la app.")
+def resumir_comentarios(df, comentarios_positivos_list):
+    positivos = set(comentarios_positivos_list)
+    mejoras_comentarios = [
+        c for c in df['comentarios'].dropna()
+        if c not in positivos
+    ]
+
+    comentarios_relevantes = [
+        c for c in mejoras_comentarios
+        if unidecode(c.strip().lower()) not in irrelevantes_comentarios
+    ]
+
+    resumen_comentarios = []
+    for c in comentarios_relevantes:
+        c_lower = unidecode(c.lower())
+        for frase, palabras in TEMAS_COMENTARIOS:
+            if any(p in c_lower for p in palabras):
+                resumen_comentarios.append(frase)
+                break
 
-resumen_comentarios = list(dict.fromkeys(resumen_comentarios))
+    return list(dict.fromkeys(resumen_comentarios))
 
 # ============================================================
 # MEJORAS CONSTRUCTIVAS – MODIFICAR SECCIONES (19 ítems únicos)
@@ -149,124 +213,337 @@ mejoras_constructivas_texto = [
     "Las pestañas de cada herramienta son difíciles para la visualización en los primeros acercamientos a la app; una visualización completa en formato de columna y un botón que diga siguiente al pie de página."
 ]
 
-num_modificar_secciones = len(mejoras_constructivas_texto)
-num_mejoras_comentarios = len(resumen_comentarios)
+# ============================================================
+# SECCIONES DEL INFORME
+# ============================================================
+
+def calcular_secciones(df, agregador, curado=False):
+    """Datos de cada sección del informe para un frame ya preparado.
+
+    curado=True es el informe general: agrega los textos revisados a mano
+    (comentarios positivos adicionales, las 19 mejoras de modificar_secciones).
+    Para un subconjunto de filas se usan solo los datos de esas filas.
+    """
+    resumen_puntajes = agregador.resultado()
+    metrics_results = {name: resumen_puntajes[col] for col, name in metrics_cols.items() if col in df.columns}
+
+    comentarios_positivos_list = df.loc[df["clasificacion_auto"] == "positivo", "comentarios"].dropna().tolist()
+    if curado:
+        comentarios_positivos_list.extend(comentarios_positivos_adicionales)
+        # Mantener solo los 14 ítems
+        comentarios_positivos_list = comentarios_positivos_list[:14]
+
+    resumen_comentarios = resumir_comentarios(df, comentarios_positivos_list)
+
+    if curado:
+        mejoras_modificar = mejoras_constructivas_texto
+        fila_modificar = ["modificar_secciones", 0, len(mejoras_modificar), 3, 0]
+    else:
+        modificaciones = df['modificar_secciones']
+        mejoras_modificar = list(dict.fromkeys(modificaciones[modificaciones != '']))
+        fila_modificar = ["modificar_secciones", 0, len(mejoras_modificar), 0, int((modificaciones == '').sum())]
+
+    tabla_metrics = [["Métrica", "n", "Media", "Mediana", "Mín", "Máx", "Desv. est."]]
+    for col, name in metrics_cols.items():
+        if col in df.columns:
+            res = metrics_results[name]
+            tabla_metrics.append([
+                name, res['n'], f"{res['media']:.2f}", f"{res['mediana']}", f"{res['min']}", f"{res['max']}",
+                f"{res['desvio']:.2f}"
+            ])
+
+    tabla_data = [
+        ["Campo", "Apreciación positiva", "Mejora constructiva", "Comentario neutro", "Sin respuesta"],
+        ["comentarios",
+            len(comentarios_positivos_list),
+            len(resumen_comentarios),
+            (df["clasificacion_auto"]=="neutral").sum(),
+            df["comentarios"].isna().sum()
+        ],
+        fila_modificar
+    ]
+
+    return {
+        "metrics_results": metrics_results,
+        "tabla_metrics": tabla_metrics,
+        "tabla_data": tabla_data,
+        "comentarios_positivos_list": comentarios_positivos_list,
+        "resumen_comentarios": resumen_comentarios,
+        "mejoras_modificar": mejoras_modificar,
+    }
 
 # ============================================================
 # GENERACIÓN DEL PDF
 # ============================================================
 
-pdf_file = "informe_validacion.pdf"
-doc = SimpleDocTemplate(pdf_file, pagesize=letter)
-styles = getSampleStyleSheet()
-content = []
-
-# Título
-content.append(Paragraph("Informe Parcial de Validación", styles['Title']))
-content.append(Spacer(1, 12))
-
-# Resultados cuantitativos
-content.append(Paragraph("📊 Resultados cuantitativos", styles['Heading2']))
-tabla_metrics = [["Métrica", "n", "Media", "Mediana", "Mín", "Máx"]]
-for col, name in metrics_cols.items():
-    if col in df.columns:
-        n_casos = len(df[col].dropna())
-        res = metrics_results[name]
-        tabla_metrics.append([
-            name, n_casos, f"{res['media']:.2f}", f"{res['mediana']}", f"{res['min']}", f"{res['max']}"
-        ])
-tabla = Table(tabla_metrics, hAlign='CENTER')
-tabla.setStyle(TableStyle([
-    ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-    ('GRID', (0,0), (-1,-1), 1, colors.black),
-    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-    ('ALIGN', (1,1), (-1,-1), 'CENTER')
-]))
-content.append(tabla)
-content.append(Spacer(1, 12))
-
-# Comentario interpretativo
-content.append(Paragraph(
-    "Mediana: La mediana es el valor central cuando ordenas todas las respuestas de menor a mayor. "
-    "En Utilidad, Eficiencia y Claridad y Facilidad la mediana es 5, lo que indica que al menos la mitad de los participantes dio el puntaje máximo. "
-    "La media ligeramente menor que 5 sugiere que algunos participantes dieron valores menores, por lo que no todos dieron el puntaje máximo.",
-    styles["Normal"]
-))
-content.append(Spacer(1, 12))
-
-# Tabla clasificación comentarios
-content.append(Paragraph("💬 Clasificación de Comentarios Abiertos", styles['Heading2']))
-tabla_data = [
-    ["Campo", "Apreciación positiva", "Mejora constructiva", "Comentario neutro", "Sin respuesta"],
-    ["comentarios",
-        len(comentarios_positivos_list),
-        num_mejoras_comentarios,
-        (df["clasificacion_auto"]=="neutral").sum(),
-        df["comentarios"].isna().sum()
-    ],
-    ["modificar_secciones", 0, num_modificar_secciones, 3, 0]
-]
-tabla_comentarios = Table(tabla_data, hAlign='CENTER')
-tabla_comentarios.setStyle(TableStyle([
-    ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-    ('GRID', (0,0), (-1,-1), 1, colors.black),
-    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-    ('ALIGN', (1,1), (-1,-1), 'CENTER')
-]))
-content.append(tabla_comentarios)
-content.append(Spacer(1, 12))
-
-# Nota
-content.append(Paragraph(
-    "Nota: Un mismo registro puede estar marcado como positivo y también como mejora constructiva.",
-    styles["Normal"]
-))
-content.append(Spacer(1, 12))
-
-# Comentarios positivos
-content.append(Paragraph("🟢 Comentarios Positivos (clasificación automática)", styles['Heading2']))
-for c in comentarios_positivos_list:
-    content.append(Paragraph(f'&quot;{c}&quot;', styles["Normal"]))
-content.append(Spacer(1, 12))
-content.append(Paragraph(
-    "Se destaca principalmente la utilidad, practicidad y organización de la herramienta.",
-    styles["Normal"]
-))
-content.append(Spacer(1, 12))
-
-# Mejora constructiva – comentarios (resumen interpretativo)
-content.append(Paragraph("🟡 Mejora Constructiva – Comentarios", styles['Heading2']))
-content.append(Paragraph(
-    "Se priorizarán primero los cambios que impacten en la usabilidad y claridad, "
-    "y luego los que agreguen valor adicional.",
-    styles["Normal"]
-))
-content.append(Spacer(1, 12))
-for r in resumen_comentarios:
-    content.append(Paragraph(f"- {r}", styles["Normal"]))
-content.append(Spacer(1, 12))
-
-# Mejora constructiva – modificar secciones
-content.append(Paragraph("🟡 Mejora Constructiva – Modificar Secciones", styles['Heading2']))
-content.append(Paragraph(
-    "Se implementarán primero las modificaciones que optimicen la funcionalidad y claridad, "
-    "y luego se agregarán mejoras adicionales para enriquecer la app.",
-    styles["Normal"]
-))
-content.append(Spacer(1, 12))
-for c in mejoras_constructivas_texto:
-    content.append(Paragraph(f"- {c}", styles["Normal"]))
-content.append(Spacer(1, 12))
-
-# Perspectiva interdisciplinaria
-content.append(Paragraph("🌐 Perspectiva Interdisciplinaria", styles['Heading2']))
-content.append(Paragraph(
-    "Debido a que hay respuestas de otras disciplinas que trabajan de manera interdisciplinaria o relacionada a la psicomotricidad, "
-    "sería importante pensar en ampliar el sistema para cubrir necesidades de otras áreas.",
-    styles["Normal"]
-))
-content.append(Spacer(1, 12))
-
-# Generar PDF
-doc.build(content)
-print(f"Informe generado: {pdf_file}")
+# Desde esta cantidad de ítems una lista se arma como tabla paginada perezosa
+umbral_tabla = 200
+
+def lista_items(items, styles, formato, encabezado, nombre, perezoso=None, limite=None, apendice_base=None):
+    """Flowables de una lista de textos.
+
+    Hasta umbral_tabla ítems (o con perezoso=False) es un párrafo por ítem;
+    más largas van en una TablaPaginada que arma las filas página a página.
+    Con limite, los ítems que sobran se escriben en un CSV de apéndice.
+    """
+    flowables = []
+    apendice = f"{apendice_base}_apendice_{nombre}.csv" if apendice_base else f"apendice_{nombre}.csv"
+    visibles, sobrantes, ruta = recortar_con_apendice(items, limite, apendice, nombre)
+    if perezoso is None:
+        perezoso = len(visibles) > umbral_tabla
+    if perezoso:
+        flowables.append(TablaPaginada([encabezado], [(c,) for c in visibles], styles["Normal"]))
+    else:
+        flowables.extend(Paragraph(formato.format(c), styles["Normal"]) for c in visibles)
+    if sobrantes:
+        flowables.append(Paragraph(
+            f"… y {sobrantes} más: ver apéndice {os.path.basename(ruta)}", styles["Italic"]
+        ))
+    return flowables
+
+def construir_contenido(secciones, titulo, curado=False, perezoso=None, limite=None, apendice_base=None):
+    styles = getSampleStyleSheet()
+    content = []
+    opciones = {"perezoso": perezoso, "limite": limite, "apendice_base": apendice_base}
+
+    # Título
+    content.append(Paragraph(titulo, styles['Title']))
+    content.append(Spacer(1, 12))
+
+    # Resultados cuantitativos
+    content.append(Paragraph("📊 Resultados cuantitativos", styles['Heading2']))
+    tabla = Table(secciones["tabla_metrics"], hAlign='CENTER')
+    tabla.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+        ('GRID', (0,0), (-1,-1), 1, colors.black),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('ALIGN', (1,1), (-1,-1), 'CENTER')
+    ]))
+    content.append(tabla)
+    content.append(Spacer(1, 12))
+
+    # Distribución de cada puntaje (valor: cantidad de respuestas)
+    for name, res in secciones["metrics_results"].items():
+        if res['histograma']:
+            distribucion = ", ".join(f"{valor}: {conteo}" for valor, conteo in res['histograma'].items())
+            content.append(Paragraph(f"<b>{name}</b> — {distribucion}", styles["Normal"]))
+    content.append(Spacer(1, 12))
+
+    # Comentario interpretativo (escrito para los datos del informe general)
+    if curado:
+        content.append(Paragraph(
+            "Mediana: La mediana es el valor central cuando ordenas todas las respuestas de menor a mayor. "
+            "En Utilidad, Eficiencia y Claridad y Facilidad la mediana es 5, lo que indica que al menos la mitad de los participantes dio el puntaje máximo. "
+            "La media ligeramente menor que 5 sugiere que algunos participantes dieron valores menores, por lo que no todos dieron el puntaje máximo.",
+            styles["Normal"]
+        ))
+        content.append(Spacer(1, 12))
+
+    # Tabla clasificación comentarios
+    content.append(Paragraph("💬 Clasificación de Comentarios Abiertos", styles['Heading2']))
+    tabla_comentarios = Table(secciones["tabla_data"], hAlign='CENTER')
+    tabla_comentarios.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+        ('GRID', (0,0), (-1,-1), 1, colors.black),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('ALIGN', (1,1), (-1,-1), 'CENTER')
+    ]))
+    content.append(tabla_comentarios)
+    content.append(Spacer(1, 12))
+
+    # Nota
+    content.append(Paragraph(
+        "Nota: Un mismo registro puede estar marcado como positivo y también como mejora constructiva.",
+        styles["Normal"]
+    ))
+    content.append(Spacer(1, 12))
+
+    # Comentarios positivos
+    content.append(Paragraph("🟢 Comentarios Positivos (clasificación automática)", styles['Heading2']))
+    content.extend(lista_items(
+        secciones["comentarios_positivos_list"], styles, '&quot;{}&quot;', "Comentario", "comentarios_positivos", **opciones
+    ))
+    content.append(Spacer(1, 12))
+    if curado:
+        content.append(Paragraph(
+            "Se destaca principalmente la utilidad, practicidad y organización de la herramienta.",
+            styles["Normal"]
+        ))
+        content.append(Spacer(1, 12))
+
+    # Mejora constructiva – comentarios (resumen interpretativo)
+    content.append(Paragraph("🟡 Mejora Constructiva – Comentarios", styles['Heading2']))
+    content.append(Paragraph(
+        "Se priorizarán primero los cambios que impacten en la usabilidad y claridad, "
+        "y luego los que agreguen valor adicional.",
+        styles["Normal"]
+    ))
+    content.append(Spacer(1, 12))
+    for r in secciones["resumen_comentarios"]:
+        content.append(Paragraph(f"- {r}", styles["Normal"]))
+    content.append(Spacer(1, 12))
+
+    # Mejora constructiva – modificar secciones
+    content.append(Paragraph("🟡 Mejora Constructiva – Modificar Secciones", styles['Heading2']))
+    content.append(Paragraph(
+        "Se implementarán primero las modificaciones que optimicen la funcionalidad y claridad, "
+        "y luego se agregarán mejoras adicionales para enriquecer la app.",
+        styles["Normal"]
+    ))
+    content.append(Spacer(1, 12))
+    content.extend(lista_items(
+        secciones["mejoras_modificar"], styles, "- {}", "Modificación sugerida", "modificar_secciones", **opciones
+    ))
+    content.append(Spacer(1, 12))
+
+    # Perspectiva interdisciplinaria
+    if curado:
+        content.append(Paragraph("🌐 Perspectiva Interdisciplinaria", styles['Heading2']))
+        content.append(Paragraph(
+            "Debido a que hay respuestas de otras disciplinas que trabajan de manera interdisciplinaria o relacionada a la psicomotricidad, "
+            "sería importante pensar en ampliar el sistema para cubrir necesidades de otras áreas.",
+            styles["Normal"]
+        ))
+        content.append(Spacer(1, 12))
+
+    return content
+
+def generar_informe(
+    df, pdf_path, titulo="Informe Parcial de Validación", agregador=None, curado=False, perezoso=None, limite=None
+):
+    """Genera el PDF de un frame (todas las filas o un grupo) en pdf_path.
+
+    Si el frame no pasó por preparar() se prepara acá, sin caché. perezoso y
+    limite controlan las listas largas (ver lista_items); los apéndices se
+    escriben junto al PDF. Devuelve los datos de las secciones.
+    """
+    if "clasificacion_auto" not in df.columns:
+        df, agregador = preparar(df)
+    if agregador is None:
+        agregador = AgregadorPuntajes([col for col in metrics_cols if col in df.columns]).actualizar(df)
+    secciones = calcular_secciones(df, agregador, curado=curado)
+    doc = SimpleDocTemplate(str(pdf_path), pagesize=letter)
+    apendice_base = os.path.splitext(str(pdf_path))[0]
+    with etapa("pdf", os.path.basename(str(pdf_path)), filas=len(df)) as medida:
+        doc.build(construir_contenido(
+            secciones, titulo, curado=curado, perezoso=perezoso, limite=limite, apendice_base=apendice_base
+        ))
+        medida["bytes"] = os.path.getsize(pdf_path)
+    return secciones
+
+# ============================================================
+# INFORMES POR GRUPO
+# ============================================================
+
+def nombre_archivo(clave):
+    """Nombre de archivo seguro a partir del valor del grupo"""
+    return re.sub(r'[^a-z0-9]+', '_', unidecode(str(clave)).lower()).strip('_') or 'sin_nombre'
+
+def _renderizar(tarea):
+    # Corre en un proceso del pool: un informe por llamada
+    clave, sub, ruta, opciones = tarea
+    inicio = time.perf_counter()
+    generar_informe(sub, ruta, titulo=f"Informe Parcial de Validación – {clave}", **opciones)
+    return {
+        "grupo": clave,
+        "archivo": str(ruta),
+        "filas": len(sub),
+        "segundos": time.perf_counter() - inicio,
+        "bytes": os.path.getsize(ruta),
+    }
+
+def generar_lote(df, columna, directorio, workers=1, **opciones):
+    """Un informe por valor de columna, renderizados en paralelo.
+
+    Los datos se particionan una sola vez; cada proceso recibe su grupo ya
+    preparado y solo calcula las métricas y arma el PDF (opciones va a
+    generar_informe, por ejemplo limite). Al final se imprime
+    y se guarda (resumen.csv) el tiempo y el tamaño de cada informe.
+    """
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    # Los grupos se arman con el valor sin espacios sobrantes; las filas sin
+    # valor van juntas a su propio informe
+    claves = df[columna].astype("string").str.strip()
+    sin_dato = int((claves.isna() | (claves == '')).sum())
+    claves = claves.mask(claves == '').fillna(grupo_sin_dato)
+    if sin_dato:
+        print(f"⚠️ {sin_dato} filas sin {columna}: van al informe '{grupo_sin_dato}'")
+
+    tareas = []
+    usados = set()
+    for clave, sub in df.groupby(claves, sort=True):
+        nombre = nombre_archivo(clave)
+        base, i = nombre, 1
+        while nombre in usados:
+            i += 1
+            nombre = f"{base}_{i}"
+        usados.add(nombre)
+        tareas.append((clave, sub, directorio / f"{nombre}.pdf", opciones))
+
+    inicio = time.perf_counter()
+    if workers > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resultados = list(pool.map(_renderizar, tareas))
+    else:
+        resultados = [_renderizar(t) for t in tareas]
+    total = time.perf_counter() - inicio
+
+    resumen = pd.DataFrame(resultados, columns=["grupo", "archivo", "filas", "segundos", "bytes"])
+    resumen.to_csv(directorio / "resumen.csv", index=False, encoding="utf-8-sig")
+
+    print(f"{'Grupo':<40} {'Filas':>6} {'Segundos':>9} {'KB':>8}")
+    for r in resumen.sort_values("segundos", ascending=False).itertuples(index=False):
+        print(f"{str(r.grupo)[:40]:<40} {r.filas:>6} {r.segundos:>9.3f} {r.bytes / 1024:>8.1f}")
+    print(
+        f"{len(resumen)} informes en {total:.2f} s "
+        f"(render acumulado {resumen['segundos'].sum():.2f} s, {resumen['bytes'].sum() / 1024:.1f} KB)"
+    )
+    print(f"Resumen: {directorio / 'resumen.csv'}")
+    return resumen
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera el informe de validación en PDF")
+    parser.add_argument("--por", choices=sorted(columnas_particion), help="un informe por profesión o por profesional")
+    parser.add_argument("--salida", help=f"PDF de salida (por defecto {pdf_file}) o carpeta con --por (por defecto informes)")
+    parser.add_argument("--workers", type=int, default=0, help="procesos para --por (0 = todos los núcleos)")
+    parser.add_argument("--limite", type=int, help="máximo de ítems por lista; el resto va a un CSV de apéndice")
+    parser.add_argument("--metricas", nargs="?", const=DESTINO_POR_DEFECTO, metavar="RUTA",
+                        help=f"medir cada etapa en JSON Lines (por defecto {DESTINO_POR_DEFECTO}); también FEEDBACK_METRICAS")
+    parser.add_argument("--sqlite", nargs="?", const=ALMACEN_NAME, metavar="RUTA",
+                        help=f"leer las filas de la base SQLite (por defecto {ALMACEN_NAME}) en lugar del CSV")
+    parser.add_argument("--profesion", help="solo esta profesión (requiere --sqlite)")
+    parser.add_argument("--desde", help="solo envíos desde esta fecha, AAAA-MM-DD (requiere --sqlite)")
+    parser.add_argument("--hasta", help="solo envíos anteriores a esta fecha, AAAA-MM-DD (requiere --sqlite)")
+    args = parser.parse_args(argv)
+    filtros = {k: v for k, v in (("profesion", args.profesion), ("desde", args.desde), ("hasta", args.hasta)) if v}
+    if filtros and not args.sqlite:
+        parser.error("--profesion, --desde y --hasta requieren --sqlite")
+    if args.metricas:
+        activar(args.metricas)
+
+    columnas = columnas_informe + ([columnas_particion[args.por]] if args.por else [])
+    with etapa("carga", args.sqlite or csv_file) as medida:
+        df = leer_unificado(columnas, args.sqlite, **filtros)
+        medida["filas"] = len(df)
+
+    # Resultados por fila de corridas anteriores, por digest del contenido de la
+    # fila: solo se limpian, clasifican y agregan las filas nuevas
+    cache = CacheInforme.cargar(CACHE_NAME, [col for col in columnas_informe if col in df.columns])
+    df, agregador = preparar(df, cache)
+
+    if args.por:
+        generar_lote(
+            df, columnas_particion[args.por], args.salida or "informes", args.workers or (os.cpu_count() or 1),
+            limite=args.limite,
+        )
+    else:
+        salida = args.salida or pdf_file
+        generar_informe(df, salida, agregador=agregador, curado=True, limite=args.limite)
+        print(f"Informe generado: {salida}")
+
+    if activa():
+        resumen()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Instrumentación opcional por etapa: tiempo, filas/s, bytes/s y memoria.
+
+Se activa con la variable de entorno FEEDBACK_METRICAS (ruta de un archivo
+JSON Lines, o "1" para metricas.jsonl) o con --metricas en los scripts. Cada
+etapa que termina agrega una línea JSON al archivo, y al final de la corrida
+resumen() imprime una tabla por etapa y otra por archivo.
+
+Los procesos hijos heredan la configuración por el entorno y escriben en el
+mismo archivo. El resumen lee de vuelta las líneas de la corrida actual, así
+que incluye también lo medido en ellos. Desactivada, etapa() no mide nada.
+
+    with etapa("parse", archivo=path.name, bytes=len(view)) as medida:
+        df = ...
+        medida["filas"] = len(df)
+"""
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+ENV_METRICAS = "FEEDBACK_METRICAS"
+ENV_CORRIDA = "FEEDBACK_METRICAS_CORRIDA"
+DESTINO_POR_DEFECTO = "metricas.jsonl"
+
+
+def pico_rss_mb() -> Optional[float]:
+    """Máximo de memoria residente del proceso hasta ahora, en MB"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB, macOS en bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+class _Etapa:
+    def __init__(self, instrumentacion: "Instrumentacion", nombre: str, archivo, filas, bytes_):
+        self.instrumentacion = instrumentacion
+        self.medida = {"etapa": nombre, "archivo": archivo, "filas": filas, "bytes": bytes_}
+
+    def __enter__(self) -> Dict[str, object]:
+        self._pico = pico_rss_mb()
+        self._inicio = time.perf_counter()
+        return self.medida
+
+    def __exit__(self, *exc) -> None:
+        segundos = time.perf_counter() - self._inicio
+        pico = pico_rss_mb()
+        filas, bytes_ = self.medida["filas"], self.medida["bytes"]
+        self.medida.update({
+            "segundos": segundos,
+            "filas_por_s": filas / segundos if filas is not None and segundos else None,
+            "bytes_por_s": bytes_ / segundos if bytes_ is not None and segundos else None,
+            "pico_rss_mb": pico,
+            "delta_pico_mb": pico - self._pico if pico is not None else None,
+            "error": exc[0].__name__ if exc[0] else None,
+        })
+        self.instrumentacion.registrar(self.medida)
+
+
+class Instrumentacion:
+    def __init__(self, destino: Optional[Union[str, Path]] = None, corrida: Optional[str] = None):
+        self.destino = Path(destino) if destino else None
+        self.corrida = corrida or f"{os.getpid()}-{time.time_ns()}"
+        self.programa = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "python"
+
+    @classmethod
+    def desde_entorno(cls) -> "Instrumentacion":
+        valor = os.environ.get(ENV_METRICAS, "").strip()
+        if valor in ("", "0"):
+            return cls()
+        destino = DESTINO_POR_DEFECTO if valor == "1" else valor
+        instancia = cls(destino, os.environ.get(ENV_CORRIDA))
+        # Los hijos por spawn/forkserver vuelven a leer el entorno: que compartan la corrida
+        os.environ.setdefault(ENV_CORRIDA, instancia.corrida)
+        return instancia
+
+    @property
+    def activa(self) -> bool:
+        return self.destino is not None
+
+    def activar(self, destino: Union[str, Path] = DESTINO_POR_DEFECTO) -> None:
+        # Por el entorno también quedan activados los procesos hijos
+        self.destino = Path(destino)
+        os.environ[ENV_METRICAS] = str(self.destino)
+        os.environ[ENV_CORRIDA] = self.corrida
+
+    def etapa(self, nombre: str, archivo: Optional[str] = None, filas: Optional[int] = None, bytes: Optional[int] = None):
+        if self.destino is None:
+            return nullcontext({})
+        return _Etapa(self, nombre, archivo, filas, bytes)
+
+    def registrar(self, medida: Dict[str, object]) -> None:
+        registro = {"corrida": self.corrida, "programa": self.programa, "pid": os.getpid(), **medida}
+        # Una línea por write en modo append: los procesos no se pisan
+        with open(self.destino, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    def registros(self) -> List[Dict[str, object]]:
+        """Las líneas de esta corrida (incluidas las de procesos hijos)"""
+        if self.destino is None or not self.destino.exists():
+            return []
+        with open(self.destino, "r", encoding="utf-8") as f:
+            lineas = [json.loads(l) for l in f if l.strip()]
+        return [r for r in lineas if r.get("corrida") == self.corrida]
+
+    def resumen(self, archivos: int = 10) -> None:
+        """Imprime el total por etapa y los `archivos` archivos más lentos"""
+        registros = self.registros()
+        if not registros:
+            return
+        por_etapa: Dict[str, Dict[str, float]] = {}
+        por_archivo: Dict[str, float] = defaultdict(float)
+        for r in registros:
+            e = por_etapa.setdefault(r["etapa"], {"n": 0, "segundos": 0.0, "filas": 0, "bytes": 0, "pico": 0.0})
+            e["n"] += 1
+            e["segundos"] += r["segundos"]
+            e["filas"] += r["filas"] or 0
+            e["bytes"] += r["bytes"] or 0
+            e["pico"] = max(e["pico"], r["pico_rss_mb"] or 0.0)
+            if r.get("archivo"):
+                por_archivo[r["archivo"]] += r["segundos"]
+
+        print(f"\n{'Etapa':<16} {'N':>5} {'Segundos':>9} {'Filas':>10} {'Filas/s':>11} {'MB/s':>8} {'Pico MB':>8}")
+        for nombre, e in por_etapa.items():
+            filas_s = f"{e['filas'] / e['segundos']:,.0f}" if e["filas"] and e["segundos"] else "-"
+            mb_s = f"{e['bytes'] / e['segundos'] / 1e6:.1f}" if e["bytes"] and e["segundos"] else "-"
+            print(f"{nombre:<16} {e['n']:>5} {e['segundos']:>9.3f} {int(e['filas']):>10} {filas_s:>11} {mb_s:>8} {e['pico']:>8.1f}")
+        if por_archivo:
+            print(f"\n{'Archivo':<40} {'Segundos':>9}")
+            for archivo, segundos in sorted(por_archivo.items(), key=lambda x: -x[1])[:archivos]:
+                print(f"{archivo[:40]:<40} {segundos:>9.3f}")
+        print(f"Métricas: {self.destino} (corrida {self.corrida})")
+
+
+# Instancia del proceso, configurada por el entorno
+_actual = Instrumentacion.desde_entorno()
+
+
+def etapa(nombre: str, archivo: Optional[str] = None, filas: Optional[int] = None, bytes: Optional[int] = None):
+    """Context manager que mide una etapa si la instrumentación está activa"""
+    return _actual.etapa(nombre, archivo, filas, bytes)
+
+
+def activar(destino: Union[str, Path] = DESTINO_POR_DEFECTO) -> None:
+    _actual.activar(destino)
+
+
+def activa() -> bool:
+    return _actual.activa
+
+
+def resumen() -> None:
+    _actual.resumen()
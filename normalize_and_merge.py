@@ -1,30 +1,78 @@
+import argparse
+import codecs
 import csv
+import hashlib
 import io
+import json
+import mmap
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
-import chardet  # type: ignore
 import pandas as pd
 
+from almacen import ALMACEN_NAME, Almacen
+from esquema import COLUMNAS, aplicar_tipos
+from instrumentacion import DESTINO_POR_DEFECTO, activa, activar, etapa, resumen
+from reparar_mojibake import reparar_frame
+
+try:  # Optional: columnar copy of the unified dataset
+    import pyarrow  # type: ignore  # noqa: F401
+except ImportError:  # pragma: no cover - depends on the environment
+    pyarrow = None
+
 
 BASE_DIR = Path(__file__).parent
 # No crear carpeta limpios - procesamiento directo
 
-# Canonical columns for unified export
-CANONICAL_COLS: List[str] = [
-    "nombre_profesional",
-    "utilidad",
-    "eficiencia",
-    "intencion_uso",
-    "satisfaccion_claridad",
-    "satisfaccion_diseño",
-    "modificar_secciones",
-    "comentarios",
-    "fecha_envio",
-    "cedula_profesional",
-    "profesion_profesional",
+# Canonical columns for unified export (defined once in esquema.py)
+CANONICAL_COLS: List[str] = COLUMNAS
+
+# Characters removed from every cell (comas, comillas, punto y coma, pipes,
+# barras invertidas y cualquier espacio en blanco, incluidos saltos de línea y tabs)
+SANITIZE_RE = re.compile(r'[\s,"\';|\\]+')
+
+# Inputs at least this big are mmapped instead of read into memory
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+# Decoded text is parsed in record-aligned chunks of about this many characters
+PARSE_CHUNK_CHARS = 4 * 1024 * 1024
+
+# Anything detect_encoding / sniff_dialect can sample from
+ByteSource = Union[Path, bytes, memoryview]
+
+# Longest first so UTF-32 LE is not mistaken for UTF-16 LE
+_BOMS: List[Tuple[bytes, str]] = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
 ]
+_ASCII_BYTES = bytes(range(0x80))
+# Bytes with no mapping in cp1252
+_CP1252_UNDEFINED = bytes([0x81, 0x8D, 0x8F, 0x90, 0x9D])
+# High bytes expected in Spanish text: cp1252 punctuation (0x80-0x9F), ¡ ª ° º ¿
+# and the Latin-1 letters (except × and ÷)
+_LATIN1_PLAUSIBLE = (
+    bytes(b for b in range(0x80, 0xA0) if b not in _CP1252_UNDEFINED)
+    + bytes([0xA1, 0xAA, 0xB0, 0xBA, 0xBF])
+    + bytes(b for b in range(0xC0, 0x100) if b not in (0xD7, 0xF7))
+)
+
+INPUT_PATTERN = "feedback*.csv"
+UNIFIED_NAME = "validacion_unificado.csv"
+
+# Records which inputs (and which rows of each) are already in the unified file,
+# plus the rows a business key dropped, which the unified file does not hold
+MANIFEST_NAME = "validacion_unificado.manifest.json"
+MANIFEST_VERSION = 2
+# Digests of every row kept in the unified file (one per line)
+DEDUPE_STORE_NAME = "validacion_unificado.dedupe.txt"
 
 # Known alternative header spellings mapping -> canonical
 HEADER_ALIASES: Dict[str, str] = {
@@ -36,25 +84,95 @@ HEADER_ALIASES: Dict[str, str] = {
 }
 
 
-def detect_encoding(file_path: Path, sample_bytes: int = 65536) -> str:
-    with open(file_path, "rb") as f:
-        raw = f.read(sample_bytes)
+@contextmanager
+def open_buffer(path: Path) -> Iterator[memoryview]:
+    # One open and one read per input: small files are read into memory, large
+    # ones are mmapped. Everything downstream works on slices of this view.
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            view = memoryview(f.read())
+            try:
+                yield view
+            finally:
+                view.release()
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        try:
+            yield view
+        finally:
+            view.release()
+            mm.close()
+
+
+def _head(source: ByteSource, sample_bytes: int) -> bytes:
+    if isinstance(source, Path):
+        with open(source, "rb") as f:
+            return f.read(sample_bytes)
+    return bytes(source[:sample_bytes])
+
+
+class EncodingGuess(NamedTuple):
+    encoding: str
+    method: str  # "bom", "utf8", "latin1-heuristic" or "chardet"
+    confidence: float
+
+
+def _chardet_guess(raw: bytes) -> EncodingGuess:
+    # Imported on first use: the cheaper checks settle almost every file
+    import chardet  # type: ignore
+
     result = chardet.detect(raw)
     enc = result.get("encoding") or "utf-8"
     # Prefer utf-8-sig to preserve BOM handling if detector says UTF-8
     if enc.lower().startswith("utf-8"):
-        return "utf-8-sig"
-    return enc
+        enc = "utf-8-sig"
+    return EncodingGuess(enc, "chardet", float(result.get("confidence") or 0.0))
 
 
-def sniff_dialect(file_path: Path, encoding: str) -> Tuple[str, str]:
+def _latin1_guess(raw: bytes) -> Optional[EncodingGuess]:
+    # Spanish text in Latin-1/cp1252 is mostly ASCII with isolated accented
+    # letters; anything else (other single-byte scripts, binary) is left to chardet
+    high = raw.translate(None, _ASCII_BYTES)
+    if not high or len(high) > len(raw) * 0.1:
+        return None
+    if len(high.translate(None, _CP1252_UNDEFINED)) != len(high):
+        return None
+    plausible = len(high) - len(high.translate(None, _LATIN1_PLAUSIBLE))
+    confidence = plausible / len(high)
+    if confidence < 0.8:
+        return None
+    return EncodingGuess("cp1252", "latin1-heuristic", round(confidence, 3))
+
+
+def detect_encoding_info(source: ByteSource, sample_bytes: int = 65536) -> EncodingGuess:
+    raw = _head(source, sample_bytes)
+    # 1) Byte order marks are unambiguous
+    for bom, enc in _BOMS:
+        if raw.startswith(bom):
+            return EncodingGuess(enc, "bom", 1.0)
+    # 2) Strict UTF-8 with the C codec; a sample cut mid-character is still valid
+    try:
+        codecs.getincrementaldecoder("utf-8")("strict").decode(raw, final=len(raw) < sample_bytes)
+        return EncodingGuess("utf-8-sig", "utf8", 1.0)
+    except UnicodeDecodeError:
+        pass
+    # 3) Cheap Latin-1/cp1252 check, 4) chardet only when that is inconclusive
+    return _latin1_guess(raw) or _chardet_guess(raw)
+
+
+def detect_encoding(source: ByteSource, sample_bytes: int = 65536) -> str:
+    return detect_encoding_info(source, sample_bytes).encoding
+
+
+def sniff_dialect(source: ByteSource, encoding: str) -> Tuple[str, str]:
     # Return (delimiter, quotechar)
-    with open(file_path, "rb") as fb:
-        raw = fb.read(65536)
+    sample = source[:65536] if not isinstance(source, Path) else _head(source, 65536)
     try:
-        text = raw.decode(encoding, errors="replace")
+        text = str(sample, encoding, "replace")
     except LookupError:
-        text = raw.decode("utf-8", errors="replace")
+        text = str(sample, "utf-8", "replace")
     sniffer = csv.Sniffer()
     # Ensure header presence is not mandatory for sniff
     try:
@@ -91,34 +209,185 @@ def normalize_headers(cols: List[str]) -> List[str]:
     return normed
 
 
-def read_csv_robust(path: Path) -> pd.DataFrame:
-    enc = detect_encoding(path)
-    delim, quote = sniff_dialect(path, enc)
-    # Try pandas read_csv with python engine to support complex quoting/newlines
+def _opens_field(text: str, pos: int, delim: str) -> bool:
+    # A quote only starts a quoted field at the beginning of a field (after
+    # optional spaces, as with skipinitialspace); anywhere else it is literal
+    k = pos - 1
+    while k >= 0 and text[k] == " ":
+        k -= 1
+    return k < 0 or text[k] in (delim, "\n", "\r")
+
+
+def _record_chunks(text: str, delim: str, quote: str, chunk_chars: int) -> Iterator[Tuple[int, int]]:
+    # Yield (start, end) spans of roughly chunk_chars that end on a newline
+    # outside quoted fields, so no record (even one with embedded newlines)
+    # is split. Quote state follows the CSV rules: only a quote that opens a
+    # field starts a quoted section, and "" inside it is an escaped quote, so
+    # a stray quote in free text (15" screen) does not flip the state.
+    n = len(text)
+    start = 0
+    scan = 0  # everything before scan is known to be outside quoted fields
+    while start < n:
+        if n - start <= chunk_chars:
+            yield start, n
+            return
+        target = start + chunk_chars
+        while True:
+            nl = text.find("\n", max(scan, target))
+            if nl == -1:
+                yield start, n
+                return
+            q = text.find(quote, scan, nl)
+            if q == -1:
+                scan = nl + 1
+                break
+            scan = q + 1
+            if not _opens_field(text, q, delim):
+                continue
+            # Skip to the closing quote of this field
+            while True:
+                close = text.find(quote, scan)
+                if close == -1:
+                    # Unterminated quoted field: the rest is one record
+                    yield start, n
+                    return
+                if text.startswith(quote, close + 1):
+                    scan = close + 2
+                    continue
+                scan = close + 1
+                break
+        yield start, nl + 1
+        start = nl + 1
+
+
+def _read_chunk(chunk: str, engine: str, delim: str, quote: str) -> pd.DataFrame:
+    return pd.read_csv(
+        io.StringIO(chunk, newline=""),
+        engine=engine,
+        sep=delim,
+        quotechar=quote,
+        doublequote=True,
+        skipinitialspace=True,
+        dtype=str,
+        keep_default_na=False,
+        on_bad_lines="warn",
+    )
+
+
+def _reader_rows(chunk: str, delim: str, quote: str, skipinitialspace: bool = False) -> List[List[str]]:
+    reader = csv.reader(
+        io.StringIO(chunk, newline=""),
+        delimiter=delim,
+        quotechar=quote,
+        doublequote=True,
+        skipinitialspace=skipinitialspace,
+    )
+    return list(reader)
+
+
+def _c_result_usable(df: pd.DataFrame, names: Optional[List[str]]) -> bool:
+    # The C engine pads short rows with "" where the python engine uses None,
+    # and a long first row turns into an implicit index; both cases are
+    # re-parsed so values match the python engine exactly
+    if names is not None and list(df.columns) != names:
+        return False
+    if not isinstance(df.index, pd.RangeIndex):
+        return False
+    return not (len(df.columns) and (df.iloc[:, -1] == "").any())
+
+
+def _parse_chunk(chunk: str, header: str, delim: str, quote: str, names: Optional[List[str]]) -> Optional[pd.DataFrame]:
+    # chunk is parsed as if it were a whole file: header is prepended to every
+    # chunk but the first. C engine first; only a chunk it cannot handle pays
+    # for the python engine, and csv.reader is the last resort.
+    source = chunk if names is None else header + chunk
+    try:
+        df = _read_chunk(source, "c", delim, quote)
+        if _c_result_usable(df, names):
+            return df
+    except Exception:
+        pass
     try:
-        df = pd.read_csv(
-            path,
-            encoding=enc,
-            engine="python",
-            sep=delim,
-            quotechar=quote,
-            doublequote=True,
-            skipinitialspace=True,
-            dtype=str,
-            keep_default_na=False,
-            on_bad_lines="warn",
-        )
+        df = _read_chunk(source, "python", delim, quote)
+        if names is None or (list(df.columns) == names and isinstance(df.index, pd.RangeIndex)):
+            return df
     except Exception:
+        if names is None:
+            # Fallback: read via csv into rows, then DataFrame
+            rows = _reader_rows(chunk, delim, quote)
+            if not rows:
+                return None
+            return pd.DataFrame(rows[1:], columns=rows[0])
+    # Same shape rules as the python engine: blank lines skipped, long rows
+    # dropped (on_bad_lines="warn"), short rows padded with None
+    width = len(names)
+    rows = [r for r in _reader_rows(chunk, delim, quote, skipinitialspace=True) if r and len(r) <= width]
+    return pd.DataFrame([r + [None] * (width - len(r)) for r in rows], columns=names)
+
+
+def _parse_buffer(
+    view: memoryview, enc: str, delim: str, quote: str, chunk_chars: int = PARSE_CHUNK_CHARS
+) -> Optional[pd.DataFrame]:
+    # Decode the shared buffer once; every parser reads from the same text
+    try:
+        text = str(view, enc)
+    except UnicodeDecodeError:
         # Fallback: read via csv into rows, then DataFrame
-        with open(path, "r", encoding=enc, errors="replace", newline="") as f:
-            reader = csv.reader(f, delimiter=delim, quotechar=quote, doublequote=True)
-            rows = list(reader)
+        rows = _reader_rows(str(view, enc, "replace"), delim, quote)
         if not rows:
-            return pd.DataFrame()
-        headers = rows[0]
-        data = rows[1:]
-        df = pd.DataFrame(data, columns=headers)
+            return None
+        return pd.DataFrame(rows[1:], columns=rows[0])
+
+    frames: List[pd.DataFrame] = []
+    names: Optional[List[str]] = None
+    header = ""
+    for start, end in _record_chunks(text, delim, quote, chunk_chars):
+        chunk = text if (start, end) == (0, len(text)) else text[start:end]
+        if names is not None and not chunk.strip():
+            continue
+        df = _parse_chunk(chunk, header, delim, quote, names)
+        if df is None:
+            return None
+        if names is None:
+            names = list(df.columns)
+            header_end = next(_record_chunks(text, delim, quote, 0))[1]
+            header = text[:header_end]
+        frames.append(df)
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
 
+def read_csv_robust(path: Path, repair_mojibake: bool = False) -> pd.DataFrame:
+    with open_buffer(path) as view:
+        size = len(view)
+        with etapa("encoding", path.name, bytes=size):
+            guess = detect_encoding_info(view)
+        enc = guess.encoding
+        with etapa("sniff", path.name):
+            delim, quote = sniff_dialect(view, enc)
+        with etapa("parse", path.name, bytes=size) as medida:
+            df = _parse_buffer(view, enc, delim, quote)
+            medida["filas"] = 0 if df is None else len(df)
+    if df is None:
+        return pd.DataFrame()
+
+    # Optional: undo double-encoded UTF-8 in headers and cells before mapping
+    if repair_mojibake:
+        with etapa("mojibake", path.name, filas=len(df)):
+            df = reparar_frame(df)
+
+    with etapa("headers", path.name, filas=len(df)):
+        df = _normalize_frame(df)
+
+    # How the encoding was chosen, kept per file in the manifest
+    df.attrs["encoding"] = guess._asdict()
+    return df
+
+
+def _normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
     # Normalize headers
     df.columns = normalize_headers(list(df.columns))
 
@@ -136,70 +405,616 @@ def read_csv_robust(path: Path) -> pd.DataFrame:
     df = df[CANONICAL_COLS]
 
     # Strip whitespace around all string cells (column-wise to avoid applymap deprecation)
-    df = df.apply(lambda col: col.map(lambda x: x.strip() if isinstance(x, str) else x))
+    return df.apply(lambda col: col.map(lambda x: x.strip() if isinstance(x, str) else x))
 
-    return df
 
+def sanitize_value(value: str) -> str:
+    # Any run of separators/quotes/whitespace becomes one space, then the ends
+    # are trimmed: the same result as the old nine replaces + \s+ + strip
+    return SANITIZE_RE.sub(" ", value).strip()
 
-def process_all() -> Tuple[List[Path], Path]:
-    csv_paths = sorted(BASE_DIR.glob("feedback*.csv"))
-    frames: List[pd.DataFrame] = []
 
+def sanitize_series(series: pd.Series) -> pd.Series:
+    values = series.astype(str)
+    return pd.Series([sanitize_value(v) for v in values], index=values.index, dtype=object, name=series.name)
+
+
+def sanitize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Limpiar TODOS los caracteres especiales directamente, una pasada por columna
+    df_clean = df.copy()
+    for col in df_clean.select_dtypes(include=['object']).columns:
+        df_clean[col] = sanitize_series(df_clean[col])
+    return df_clean
+
+
+def process_file(path: Path, repair_mojibake: bool = False) -> Tuple[str, Optional[pd.DataFrame], str]:
+    # Runs inside a worker process: returns (status, cleaned frame, message)
+    # and leaves printing to the parent so output order stays deterministic
+    try:
+        df = read_csv_robust(path, repair_mojibake=repair_mojibake)
+        if df.empty:
+            return "WARN", None, f"[WARN] {path.name}: sin filas"
+        with etapa("sanitize", path.name, filas=len(df)):
+            df_clean = sanitize_frame(df)
+        return "OK", df_clean, f"[OK]   {path.name} procesado: {len(df_clean)} filas"
+    except Exception as e:
+        return "ERROR", None, f"[ERROR] {path.name}: {e}"
+
+
+def _iter_results(
+    csv_paths: List[Path], workers: int, repair_mojibake: bool = False
+) -> Iterator[Tuple[str, Optional[pd.DataFrame], str]]:
+    # Results always come back in the order of csv_paths (the sorted glob)
+    worker = partial(process_file, repair_mojibake=repair_mojibake)
+    if workers <= 1 or len(csv_paths) <= 1:
+        for p in csv_paths:
+            yield worker(p)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # chunksize > 1 amortizes IPC when there are thousands of small exports
+        chunksize = max(1, len(csv_paths) // (workers * 4))
+        yield from pool.map(worker, csv_paths, chunksize=chunksize)
+
+
+def row_digest(row: Tuple[str, ...]) -> str:
+    # \x1f never survives sanitize_value (it is whitespace), so joining on it
+    # is unambiguous
+    return hashlib.sha1("\x1f".join(row).encode("utf-8")).hexdigest()
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class StaleStateError(Exception):
+    """The manifest or dedupe store no longer matches the unified file."""
+
+
+class RowDeduper:
+    # Streaming dedupe: each row is reduced to a digest and checked against a
+    # set that is persisted next to the unified file, so later runs only have
+    # to hash their new rows. With a business key (e.g. cedula_profesional +
+    # fecha_envio) rows that share it count as the same submission; rows with
+    # an empty key part fall back to the full-row digest.
+
+    def __init__(self, key: Optional[List[str]] = None, seen: Optional[Iterable[str]] = None):
+        self.key = list(key or [])
+        unknown = [c for c in self.key if c not in CANONICAL_COLS]
+        if unknown:
+            raise ValueError(f"columnas de clave desconocidas: {', '.join(unknown)}")
+        self._key_idx = [CANONICAL_COLS.index(c) for c in self.key]
+        self.seen = set(seen or ())
+        self.dropped: Dict[str, int] = {}
+        self.examples: Dict[str, List[str]] = {}
+
+    def digest(self, row: Tuple[str, ...]) -> Tuple[str, str]:
+        # Returns (key label, digest)
+        if self._key_idx:
+            values = tuple(row[i] for i in self._key_idx)
+            if all(values):
+                return "+".join(self.key), "k:" + row_digest(values)
+        return "fila", row_digest(row)
+
+    def keep(self, row: Tuple[str, ...]) -> bool:
+        label, h = self.digest(row)
+        if h in self.seen:
+            self.dropped[label] = self.dropped.get(label, 0) + 1
+            examples = self.examples.setdefault(label, [])
+            if label != "fila" and len(examples) < 5:
+                examples.append(" | ".join(row[i] for i in self._key_idx))
+            return False
+        self.seen.add(h)
+        return True
+
+    def filter(self, rows: Iterable[Tuple[str, ...]]) -> Iterator[Tuple[str, ...]]:
+        return (r for r in rows if self.keep(r))
+
+    def report(self) -> List[str]:
+        lines = []
+        for label, count in self.dropped.items():
+            line = f"[DEDUP] {count} filas duplicadas descartadas (clave: {label})"
+            if self.examples.get(label):
+                line += f" ej. {'; '.join(self.examples[label])}"
+            lines.append(line)
+        return lines
+
+    @classmethod
+    def load(cls, path: Path, key: Optional[List[str]], expected: int) -> "RowDeduper":
+        if not path.exists():
+            raise StaleStateError(path.name)
+        with open(path, "r", encoding="ascii") as f:
+            seen = [line.rstrip("\n") for line in f if line.strip()]
+        if len(seen) != expected:
+            raise StaleStateError(path.name)
+        return cls(key, seen)
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="ascii") as f:
+            for h in sorted(self.seen):
+                f.write(h + "\n")
+        os.replace(tmp, path)
+
+
+def _file_entry(
+    path: Path,
+    status: str,
+    message: str,
+    rows: List[Tuple[str, ...]],
+    encoding: Optional[Dict[str, object]] = None,
+) -> Dict[str, object]:
+    st = path.stat()
+    return {
+        "path": str(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": file_sha256(path),
+        "status": status,
+        "message": message,
+        "encoding": encoding,
+        "rows": [row_digest(r) for r in rows],
+    }
+
+
+def _is_unchanged(path: Path, entry: Dict[str, object]) -> bool:
+    st = path.stat()
+    if st.st_size != entry.get("size"):
+        return False
+    if st.st_mtime_ns == entry.get("mtime_ns"):
+        return True
+    # Touched but maybe not modified: fall back to the content hash
+    if file_sha256(path) == entry.get("sha256"):
+        entry["mtime_ns"] = st.st_mtime_ns
+        return True
+    return False
+
+
+def load_manifest(
+    manifest_path: Path,
+    unified: Path,
+    dedupe_key: Optional[List[str]] = None,
+    repair_mojibake: bool = False,
+) -> Optional[Dict[str, object]]:
+    # A manifest is only trusted if the unified file is exactly the one it wrote
+    if not manifest_path.exists() or not unified.exists():
+        return None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("columns") != CANONICAL_COLS:
+        return None
+    # A different dedupe key means different output rows: rebuild
+    if (manifest.get("dedupe") or {}).get("key") != list(dedupe_key or []):
+        return None
+    if bool(manifest.get("repair_mojibake")) != repair_mojibake:
+        return None
+    st = unified.stat()
+    recorded = manifest.get("unified") or {}
+    if recorded.get("size") != st.st_size or recorded.get("mtime_ns") != st.st_mtime_ns:
+        return None
+    return manifest
+
+
+def save_manifest(
+    manifest_path: Path,
+    unified: Path,
+    files: Dict[str, Dict[str, object]],
+    deduper: RowDeduper,
+    repair_mojibake: bool = False,
+) -> None:
+    unified_info: Dict[str, object] = {}
+    if unified.exists():
+        st = unified.stat()
+        unified_info = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "columns": CANONICAL_COLS,
+        "unified": unified_info,
+        "dedupe": {"key": deduper.key, "seen": len(deduper.seen)},
+        "repair_mojibake": repair_mojibake,
+        "files": files,
+    }
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, manifest_path)
+
+
+def _read_unified_rows(unified: Path) -> Dict[str, Tuple[str, ...]]:
+    # Sanitized cells contain no delimiter, quotes or newlines, so a plain
+    # QUOTE_NONE reader gives back exactly what to_csv(quoting=3) wrote
+    with open(unified, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, quoting=csv.QUOTE_NONE)
+        next(reader, None)
+        return {row_digest(tuple(r)): tuple(r) for r in reader}
+
+
+def _write_unified(unified: Path, rows: List[Tuple[str, ...]], append: bool = False) -> None:
+    with etapa("write_csv", unified.name, filas=len(rows)) as medida:
+        frame = pd.DataFrame(rows, columns=CANONICAL_COLS)
+        if append:
+            frame.to_csv(unified, index=False, encoding="utf-8-sig", quoting=3, mode="a", header=False)
+        else:
+            frame.to_csv(unified, index=False, encoding="utf-8-sig", quoting=3)
+        medida["bytes"] = unified.stat().st_size
+
+
+def _parquet_in_sync(unified: Path) -> bool:
+    # The Parquet copy is always written right after the CSV
+    parquet = unified.with_suffix(".parquet")
+    return parquet.exists() and unified.exists() and parquet.stat().st_mtime_ns >= unified.stat().st_mtime_ns
+
+
+def write_parquet(parquet: Path, rows: List[Tuple[str, ...]], append: bool = False) -> None:
+    if pyarrow is None:
+        print("[WARN] pyarrow no está instalado: no se genera la copia Parquet")
+        return
+    with etapa("write_parquet", parquet.name) as medida:
+        frame = aplicar_tipos(pd.DataFrame(rows, columns=CANONICAL_COLS))
+        if append and parquet.exists():
+            frame = pd.concat([pd.read_parquet(parquet), frame], ignore_index=True)
+            # Differing category sets concat to object; restore the schema types
+            frame = aplicar_tipos(frame)
+        tmp = parquet.with_name(parquet.name + ".tmp")
+        frame.to_parquet(tmp, index=False, engine="pyarrow")
+        os.replace(tmp, parquet)
+        medida.update(filas=len(frame), bytes=parquet.stat().st_size)
+    print(f"[OK]   Parquet -> {parquet.name}  filas={len(frame)}")
+
+
+def sync_store(
+    store: Almacen,
+    unified: Path,
+    rows: List[Tuple[str, ...]],
+    origins: List[Tuple[str, int]],
+    append: bool = False,
+) -> None:
+    # One executemany inside one transaction, after the CSV is on disk so the
+    # store records the unified file it matches
+    with etapa("sqlite", store.path.name, filas=len(rows)):
+        ids = [row_digest(r) for r in rows]
+        if append:
+            store.agregar(ids, rows, origins, unified)
+        else:
+            store.reemplazar(ids, rows, origins, unified)
+    print(f"[OK]   SQLite -> {store.path.name}  filas={store.contar()}")
+
+
+def remove_outputs(unified: Path, store: Optional[Almacen] = None) -> None:
+    # Nothing to unify: leave no stale CSV, Parquet copy or store rows behind,
+    # otherwise the next run would trust them as current
+    unified.unlink(missing_ok=True)
+    unified.with_suffix(".parquet").unlink(missing_ok=True)
+    if store is not None:
+        store.vaciar()
+
+
+def _rebuild_store(
+    store: Almacen, unified: Path, csv_paths: List[Path], files: Dict[str, Dict[str, object]]
+) -> None:
+    # Lineage from the manifest: each unified row comes from the first file
+    # (in glob order) and row where its digest appears
+    cached = _read_unified_rows(unified)
+    rows: List[Tuple[str, ...]] = []
+    origins: List[Tuple[str, int]] = []
+    emitted = set()
     for p in csv_paths:
-        try:
-            df = read_csv_robust(p)
-            if df.empty:
-                print(f"[WARN] {p.name}: sin filas")
-                continue
-            
-            # Limpiar TODOS los caracteres especiales directamente
-            df_clean = df.copy()
-            for col in df_clean.select_dtypes(include=['object']).columns:
-                df_clean[col] = (df_clean[col].astype(str)
-                                .str.replace(',', ' ')    # ELIMINAR comas
-                                .str.replace('"', ' ')    # ELIMINAR comillas dobles
-                                .str.replace("'", ' ')    # ELIMINAR comillas simples
-                                .str.replace(';', ' ')    # ELIMINAR punto y coma
-                                .str.replace('\n', ' ')   # Saltos de línea
-                                .str.replace('\r', ' ')   # Retornos de carro
-                                .str.replace('\t', ' ')   # Tabs
-                                .str.replace('|', ' ')    # Pipes
-                                .str.replace('\\', ' '))  # Barras invertidas
-            # Limpiar espacios múltiples
-            for col in df_clean.select_dtypes(include=['object']).columns:
-                df_clean[col] = df_clean[col].str.replace(r'\s+', ' ', regex=True).str.strip()
-            
-            frames.append(df_clean)
-            print(f"[OK]   {p.name} procesado: {len(df_clean)} filas")
-        except Exception as e:
-            print(f"[ERROR] {p.name}: {e}")
-
-    unified = BASE_DIR / "validacion_unificado.csv"
-    if frames:
-        big = pd.concat(frames, ignore_index=True)
-        # Remove exact duplicate rows across files, keep first
-        big = big.drop_duplicates()
-        # Limpiar TODOS los caracteres especiales en el unificado
-        for col in big.select_dtypes(include=['object']).columns:
-            big[col] = (big[col].astype(str)
-                       .str.replace(',', ' ')    # ELIMINAR comas
-                       .str.replace('"', ' ')    # ELIMINAR comillas dobles
-                       .str.replace("'", ' ')    # ELIMINAR comillas simples
-                       .str.replace(';', ' ')    # ELIMINAR punto y coma
-                       .str.replace('\n', ' ')   # Saltos de línea
-                       .str.replace('\r', ' ')   # Retornos de carro
-                       .str.replace('\t', ' ')   # Tabs
-                       .str.replace('|', ' ')    # Pipes
-                       .str.replace('\\', ' '))  # Barras invertidas
-        # Limpiar espacios múltiples
-        for col in big.select_dtypes(include=['object']).columns:
-            big[col] = big[col].str.replace(r'\s+', ' ', regex=True).str.strip()
-        big.to_csv(unified, index=False, encoding="utf-8-sig", quoting=3)
-        print(f"[OK]   Unificado -> {unified.name}  filas={len(big)}")
+        for i, h in enumerate(files[p.name].get("rows") or []):  # type: ignore[union-attr]
+            if h in cached and h not in emitted:
+                emitted.add(h)
+                rows.append(cached[h])
+                origins.append((p.name, i))
+    sync_store(store, unified, rows, origins)
+
+
+def _keep_with_origin(
+    deduper: RowDeduper,
+    name: str,
+    rows: List[Tuple[str, ...]],
+    out_rows: List[Tuple[str, ...]],
+    origins: List[Tuple[str, int]],
+) -> Dict[int, Tuple[str, ...]]:
+    # deduper.filter plus the (file, row offset) of every kept row; returns
+    # the dropped rows by offset
+    dropped: Dict[int, Tuple[str, ...]] = {}
+    for i, row in enumerate(rows):
+        if deduper.keep(row):
+            out_rows.append(row)
+            origins.append((name, i))
+        else:
+            dropped[i] = row
+    return dropped
+
+
+def _record_dropped(
+    deduper: RowDeduper,
+    files: Dict[str, Dict[str, object]],
+    origins: List[Tuple[str, int]],
+    dropped: Dict[str, Dict[int, Tuple[str, ...]]],
+) -> None:
+    # A row dropped by a business key may differ from the one that was kept,
+    # so the unified file has no copy of it. The manifest keeps those rows so
+    # that removing or editing the file that won brings them back without
+    # re-reading every input. Full-row duplicates always have a copy.
+    if not deduper.key:
+        return
+    kept = {files[name]["rows"][i] for name, i in origins}  # type: ignore[index]
+    for name, by_offset in dropped.items():
+        entry = files[name]
+        digests: List[str] = entry["rows"]  # type: ignore[assignment]
+        missing = {digests[i]: list(row) for i, row in by_offset.items() if digests[i] not in kept}
+        if missing:
+            entry["dropped"] = missing
+        else:
+            entry.pop("dropped", None)
+
+
+def _cached_rows(entry: Dict[str, object], cached: Dict[str, Tuple[str, ...]]) -> List[Tuple[str, ...]]:
+    # Rows of an unchanged input from the unified file and the manifest;
+    # KeyError if a row is in neither
+    dropped: Dict[str, List[str]] = entry.get("dropped") or {}  # type: ignore[assignment]
+    return [cached[h] if h in cached else tuple(dropped[h]) for h in entry["rows"]]  # type: ignore[union-attr]
+
+
+def _process_full(
+    csv_paths: List[Path],
+    unified: Path,
+    workers: int,
+    deduper: RowDeduper,
+    repair_mojibake: bool = False,
+    store: Optional[Almacen] = None,
+) -> Dict[str, Dict[str, object]]:
+    out_rows: List[Tuple[str, ...]] = []
+    origins: List[Tuple[str, int]] = []
+    files: Dict[str, Dict[str, object]] = {}
+    dropped: Dict[str, Dict[int, Tuple[str, ...]]] = {}
+
+    for p, (status, df_clean, message) in zip(csv_paths, _iter_results(csv_paths, workers, repair_mojibake)):
+        print(message)
+        rows: List[Tuple[str, ...]] = []
+        encoding = None
+        if status == "OK" and df_clean is not None:
+            with etapa("concat", p.name, filas=len(df_clean)):
+                rows = list(df_clean.itertuples(index=False, name=None))
+            encoding = df_clean.attrs.get("encoding")
+            # Remove duplicate rows across files as they stream in, keep first.
+            # Every frame is already sanitized, so no second pass is needed.
+            with etapa("dedupe", p.name, filas=len(rows)):
+                dropped[p.name] = _keep_with_origin(deduper, p.name, rows, out_rows, origins)
+        files[p.name] = _file_entry(p, status, message, rows, encoding)
+
+    _record_dropped(deduper, files, origins, dropped)
+    for line in deduper.report():
+        print(line)
+    if out_rows:
+        _write_unified(unified, out_rows)
+        print(f"[OK]   Unificado -> {unified.name}  filas={len(out_rows)}")
+        write_parquet(unified.with_suffix(".parquet"), out_rows)
+        if store is not None:
+            sync_store(store, unified, out_rows, origins)
+    else:
+        remove_outputs(unified, store)
+        print("[WARN] No se generó un archivo unificado: no hay datos")
+    return files
+
+
+def _process_incremental(
+    csv_paths: List[Path],
+    unified: Path,
+    workers: int,
+    manifest: Dict[str, object],
+    deduper: RowDeduper,
+    dedupe_store: Path,
+    repair_mojibake: bool = False,
+    store: Optional[Almacen] = None,
+) -> Dict[str, Dict[str, object]]:
+    known: Dict[str, Dict[str, object]] = manifest["files"]  # type: ignore[assignment]
+    current = {p.name for p in csv_paths}
+    removed = [name for name in known if name not in current]
+
+    pending = [p for p in csv_paths if p.name not in known or not _is_unchanged(p, known[p.name])]
+    pending_names = {p.name for p in pending}
+    new_rows: Dict[str, List[Tuple[str, ...]]] = {}
+    files: Dict[str, Dict[str, object]] = {}
+
+    results = dict(zip((p.name for p in pending), _iter_results(pending, workers, repair_mojibake)))
+    for p in csv_paths:
+        if p.name in pending_names:
+            status, df_clean, message = results[p.name]
+            print(message)
+            ok = status == "OK" and df_clean is not None
+            with etapa("concat", p.name, filas=len(df_clean) if ok else 0):
+                rows = list(df_clean.itertuples(index=False, name=None)) if ok else []
+            encoding = df_clean.attrs.get("encoding") if ok else None
+            new_rows[p.name] = rows
+            files[p.name] = _file_entry(p, status, message, rows, encoding)
+        else:
+            entry = known[p.name]
+            files[p.name] = entry
+            if entry.get("status") == "OK":
+                print(f"[SKIP] {p.name} sin cambios: {len(entry['rows'])} filas")  # type: ignore[arg-type]
+            else:
+                print(entry.get("message"))
+
+    expected = int((manifest.get("dedupe") or {}).get("seen", -1))  # type: ignore[union-attr]
+    if not pending and not removed:
+        deduper.seen = RowDeduper.load(dedupe_store, deduper.key, expected).seen
+        print(f"[OK]   Unificado sin cambios -> {unified.name}")
+        if pyarrow is not None and not _parquet_in_sync(unified):
+            write_parquet(unified.with_suffix(".parquet"), list(_read_unified_rows(unified).values()))
+        if store is not None and not store.en_sincronia(unified):
+            _rebuild_store(store, unified, csv_paths, files)
+        return files
+
+    # Fast path: only brand-new files that sort after every known one. The
+    # rebuilt output would be the current file plus their unseen rows, so the
+    # new rows are only checked against the stored digests.
+    last_known = max((p.name for p in csv_paths if p.name not in pending_names), default="")
+    appends_only = not removed and all(name not in known and name > last_known for name in pending_names)
+
+    out_rows: List[Tuple[str, ...]] = []
+    origins: List[Tuple[str, int]] = []
+    dropped: Dict[str, Dict[int, Tuple[str, ...]]] = {}
+    if appends_only:
+        deduper.seen = RowDeduper.load(dedupe_store, deduper.key, expected).seen
+        for p in pending:
+            with etapa("dedupe", p.name, filas=len(new_rows[p.name])):
+                dropped[p.name] = _keep_with_origin(deduper, p.name, new_rows[p.name], out_rows, origins)
+        # Known files keep their entries: appended rows never displace theirs
+        _record_dropped(deduper, files, origins, dropped)
+        for line in deduper.report():
+            print(line)
+        parquet_ok = _parquet_in_sync(unified)
+        store_ok = store is not None and store.en_sincronia(unified)
+        if out_rows:
+            _write_unified(unified, out_rows, append=True)
+        print(f"[OK]   Unificado -> {unified.name}  filas agregadas={len(out_rows)}")
+        if out_rows and parquet_ok:
+            write_parquet(unified.with_suffix(".parquet"), out_rows, append=True)
+        elif out_rows or not parquet_ok:
+            write_parquet(unified.with_suffix(".parquet"), list(_read_unified_rows(unified).values()))
+        if store is not None:
+            if store_ok and out_rows:
+                sync_store(store, unified, out_rows, origins, append=True)
+            elif not store_ok:
+                _rebuild_store(store, unified, csv_paths, files)
+        return files
+
+    # Otherwise rebuild the output in glob order from the rows already in the
+    # unified file (or in the manifest) plus the freshly parsed ones, without
+    # re-reading inputs.
+    cached = _read_unified_rows(unified)
+    for p in csv_paths:
+        if p.name in pending_names:
+            candidates = new_rows[p.name]
+        else:
+            try:
+                candidates = _cached_rows(files[p.name], cached)
+            except KeyError:
+                raise StaleStateError(unified.name)
+        with etapa("dedupe", p.name, filas=len(candidates)):
+            dropped[p.name] = _keep_with_origin(deduper, p.name, candidates, out_rows, origins)
+
+    _record_dropped(deduper, files, origins, dropped)
+    for line in deduper.report():
+        print(line)
+    if out_rows:
+        _write_unified(unified, out_rows)
+        print(f"[OK]   Unificado -> {unified.name}  filas={len(out_rows)}")
+        write_parquet(unified.with_suffix(".parquet"), out_rows)
+        if store is not None:
+            sync_store(store, unified, out_rows, origins)
     else:
+        remove_outputs(unified, store)
         print("[WARN] No se generó un archivo unificado: no hay datos")
+    return files
+
+
+def process_all(
+    workers: int = 1,
+    full: bool = False,
+    dedupe_key: Optional[List[str]] = None,
+    repair_mojibake: bool = False,
+    sqlite: Optional[Union[str, Path]] = None,
+    base_dir: Optional[Path] = None,
+) -> Tuple[List[Path], Path]:
+    base_dir = Path(base_dir or BASE_DIR)
+    csv_paths = sorted(base_dir.glob(INPUT_PATTERN))
+    unified = base_dir / UNIFIED_NAME
+    manifest_path = base_dir / MANIFEST_NAME
+    dedupe_store = base_dir / DEDUPE_STORE_NAME
+
+    # Optional indexed copy of the unified rows, kept in step with the CSV
+    store = Almacen(base_dir / sqlite) if sqlite else None
+    try:
+        deduper = RowDeduper(dedupe_key)
+        manifest = None if full else load_manifest(manifest_path, unified, dedupe_key, repair_mojibake)
+        if manifest is None:
+            files = _process_full(csv_paths, unified, workers, deduper, repair_mojibake, store)
+        else:
+            try:
+                files = _process_incremental(
+                    csv_paths, unified, workers, manifest, deduper, dedupe_store, repair_mojibake, store
+                )
+            except StaleStateError:
+                print("[WARN] Manifest inconsistente, reconstruyendo todo")
+                deduper = RowDeduper(dedupe_key)
+                files = _process_full(csv_paths, unified, workers, deduper, repair_mojibake, store)
+        deduper.save(dedupe_store)
+        save_manifest(manifest_path, unified, files, deduper, repair_mojibake)
+    finally:
+        if store is not None:
+            store.close()
     return [], unified
 
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Normaliza y unifica los feedback*.csv")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("NORMALIZE_WORKERS", "1")),
+        help="procesos para leer archivos en paralelo (0 = todos los núcleos; por defecto 1)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="ignorar el manifest y reconstruir el unificado desde todos los archivos",
+    )
+    parser.add_argument(
+        "--dedupe-key",
+        type=lambda v: [c.strip() for c in v.split(",") if c.strip()],
+        default=None,
+        metavar="COL[,COL...]",
+        help="clave de negocio para duplicados, p. ej. cedula_profesional,fecha_envio (por defecto la fila completa)",
+    )
+    parser.add_argument(
+        "--reparar-mojibake",
+        dest="repair_mojibake",
+        action="store_true",
+        help="reparar texto UTF-8 doblemente codificado (Ã±, Ã©...) al leer cada archivo",
+    )
+    parser.add_argument(
+        "--sqlite",
+        nargs="?",
+        const=ALMACEN_NAME,
+        metavar="RUTA",
+        help=f"mantener además una base SQLite indexada con las filas unificadas (por defecto {ALMACEN_NAME})",
+    )
+    parser.add_argument(
+        "--metricas",
+        nargs="?",
+        const=DESTINO_POR_DEFECTO,
+        metavar="RUTA",
+        help=f"medir cada etapa y escribir JSON Lines en RUTA (por defecto {DESTINO_POR_DEFECTO}); también FEEDBACK_METRICAS",
+    )
+    args = parser.parse_args(argv)
+    unknown = [c for c in args.dedupe_key or [] if c not in CANONICAL_COLS]
+    if unknown:
+        parser.error(f"--dedupe-key: columnas desconocidas: {', '.join(unknown)}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.metricas:
+        activar(args.metricas)
+    process_all(
+        workers=args.workers or (os.cpu_count() or 1),
+        full=args.full,
+        dedupe_key=args.dedupe_key,
+        repair_mojibake=args.repair_mojibake,
+        sqlite=args.sqlite,
+    )
+    if activa():
+        resumen()
+
+
 if __name__ == "__main__":
-    process_all()
+    main()
@@ -0,0 +1,127 @@
+"""Reparación de texto UTF-8 doblemente codificado (mojibake) guiada por tabla.
+
+Cuando un archivo UTF-8 se lee como Latin-1 o cp1252, cada carácter acentuado
+se convierte en dos o tres caracteres ("ñ" -> "Ã±", "¿" -> "Â¿", "“" -> "â€œ").
+La tabla se arma con todos los caracteres de Latin-1 y cp1252, en sus dos
+variantes de lectura, y se compila en un único patrón, así cada celda se
+repara en una sola pasada. Se aplica también a los encabezados (el caso
+"satisfaccion_diseÃ±o") y al BOM leído como texto ("ï»¿").
+
+    python reparar_mojibake.py feedback1.csv [feedback7.csv ...]
+"""
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+# Filas por bloque al reparar archivos, para no cargarlos enteros
+FILAS_POR_BLOQUE = 50_000
+
+
+def _leer_byte(b: int) -> str:
+    # Como lo haría Windows: cp1252 y, para sus 5 huecos, el control de Latin-1
+    try:
+        return bytes([b]).decode("cp1252")
+    except UnicodeDecodeError:
+        return bytes([b]).decode("latin-1")
+
+
+def construir_tabla() -> Dict[str, str]:
+    """Mapa secuencia corrupta -> carácter original"""
+    originales = set(bytes(range(0xA0, 0x100)).decode("latin-1"))
+    originales |= set(bytes(range(0x80, 0xA0)).decode("cp1252", errors="ignore"))
+    tabla: Dict[str, str] = {}
+    for c in sorted(originales):
+        utf8 = c.encode("utf-8")
+        tabla[utf8.decode("latin-1")] = c
+        tabla["".join(_leer_byte(b) for b in utf8)] = c
+    # BOM de UTF-8 leído como cp1252 al principio del archivo o del encabezado
+    tabla["ï»¿"] = ""
+    return tabla
+
+
+TABLA_MOJIBAKE = construir_tabla()
+# Las secuencias más largas primero, para que "â€œ" gane a un prefijo más corto
+PATRON_MOJIBAKE = re.compile(
+    "|".join(re.escape(k) for k in sorted(TABLA_MOJIBAKE, key=len, reverse=True))
+)
+# Todas las secuencias empiezan con uno de estos caracteres: filtro barato
+_INICIALES = frozenset(k[0] for k in TABLA_MOJIBAKE)
+
+
+def reparar_texto(texto: str) -> str:
+    """Repara un texto en una sola pasada"""
+    if not isinstance(texto, str) or not _INICIALES.intersection(texto):
+        return texto
+    return PATRON_MOJIBAKE.sub(lambda m: TABLA_MOJIBAKE[m.group(0)], texto)
+
+
+def reparar_serie(serie: pd.Series) -> pd.Series:
+    """Repara una columna; los valores sin caracteres sospechosos no se tocan"""
+    return serie.map(reparar_texto, na_action="ignore")
+
+
+def reparar_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Repara encabezados y todas las columnas de texto"""
+    out = df.copy()
+    out.columns = [reparar_texto(str(c)) for c in out.columns]
+    for col in out.columns:
+        if pd.api.types.is_object_dtype(out[col]) or pd.api.types.is_string_dtype(out[col]):
+            out[col] = reparar_serie(out[col])
+    return out
+
+
+def reparar_archivo(
+    origen: Union[str, Path],
+    destino: Optional[Union[str, Path]] = None,
+    encoding: str = "utf-8-sig",
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+) -> int:
+    """Repara un CSV por bloques y lo escribe en UTF-8 con BOM.
+
+    Sin destino reemplaza el original, escribiendo primero a un temporal y
+    renombrando al final. Devuelve la cantidad de filas escritas.
+    """
+    origen = Path(origen)
+    destino = Path(destino) if destino else origen
+    tmp = destino.with_name(destino.name + ".tmp")
+    filas = 0
+    try:
+        lector = pd.read_csv(
+            origen, encoding=encoding, dtype=str, keep_default_na=False, chunksize=filas_por_bloque
+        )
+        with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
+            for i, bloque in enumerate(lector):
+                bloque = reparar_frame(bloque)
+                bloque.to_csv(f, index=False, header=(i == 0))
+                filas += len(bloque)
+        os.replace(tmp, destino)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return filas
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Repara mojibake (UTF-8 leído como Latin-1/cp1252) en CSV")
+    parser.add_argument("archivos", nargs="+", help="CSV a reparar (se reescriben en el lugar)")
+    parser.add_argument("--encoding", default="utf-8-sig", help="encoding con el que leer los archivos")
+    args = parser.parse_args(argv)
+
+    errores = 0
+    for archivo in args.archivos:
+        try:
+            filas = reparar_archivo(archivo, encoding=args.encoding)
+            print(f"✅ {os.path.basename(archivo)} reparado ({filas} filas)")
+        except Exception as e:
+            errores += 1
+            print(f"❌ Error en {os.path.basename(archivo)}: {e}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
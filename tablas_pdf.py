@@ -0,0 +1,164 @@
+"""Flowables de reportlab para secciones largas del informe.
+
+TablaPaginada arma una tabla con encabezado repetido en cada página sin crear
+de entrada un Paragraph por fila: guarda solo los textos y construye las
+celdas de una página por vez, a medida que el documento pide la siguiente.
+Así la memoria de doc.build depende de una página y no del total de filas.
+"""
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+from xml.sax.saxutils import escape
+
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.platypus import Flowable, Paragraph, Table, TableStyle
+
+# Márgenes de celda (los de Table por defecto, explícitos para medir filas)
+PADDING_H = 6
+PADDING_V = 3
+
+ESTILO_TABLA = [
+    ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+    ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+    ('VALIGN', (0,0), (-1,-1), 'TOP'),
+    ('LEFTPADDING', (0,0), (-1,-1), PADDING_H),
+    ('RIGHTPADDING', (0,0), (-1,-1), PADDING_H),
+    ('TOPPADDING', (0,0), (-1,-1), PADDING_V),
+    ('BOTTOMPADDING', (0,0), (-1,-1), PADDING_V),
+]
+
+
+class _ParrafoCelda(Paragraph):
+    # Table vuelve a medir cada celda al dibujarla; con el mismo ancho el
+    # resultado es el mismo, así que se reutiliza la primera medición
+    _medida = None
+
+    def wrap(self, ancho_disponible, alto_disponible):
+        if self._medida is None or self._medida[0] != ancho_disponible:
+            self._medida = (ancho_disponible, Paragraph.wrap(self, ancho_disponible, alto_disponible))
+        return self._medida[1]
+
+
+class TablaPaginada(Flowable):
+    """Tabla de textos que se arma de a una página y se parte entre páginas.
+
+    encabezado: textos de la fila de títulos (se repite en cada página).
+    filas: secuencia de tuplas de textos; no se copia.
+    anchos: ancho de cada columna (None reparte el ancho disponible).
+
+    Siempre se pide partirla (wrap devuelve más alto que el disponible): en
+    split se miden las filas una a una hasta llenar el espacio y se devuelve
+    una Table con exactamente esas filas, con sus altos ya calculados, más
+    una TablaPaginada con el resto. Una fila que no entra ni en una página
+    vacía se corta: lo que entra de cada celda queda en esta página y el
+    resto pasa a la siguiente como `pendiente`.
+    """
+
+    def __init__(
+        self,
+        encabezado: Sequence[str],
+        filas: Sequence[Tuple[str, ...]],
+        estilo_celda,
+        anchos: Optional[List[float]] = None,
+        inicio: int = 0,
+        pendiente: Optional[List[Paragraph]] = None,
+    ):
+        Flowable.__init__(self)
+        self.encabezado = list(encabezado)
+        self.filas = filas
+        self.estilo_celda = estilo_celda
+        self.anchos = anchos
+        self.inicio = inicio
+        # Celdas ya armadas de una fila cortada, que van antes de filas[inicio]
+        self.pendiente = pendiente
+
+    def _anchos(self, ancho_disponible: float) -> List[float]:
+        return self.anchos or [ancho_disponible / len(self.encabezado)] * len(self.encabezado)
+
+    def _alto_encabezado(self, anchos: List[float]) -> float:
+        tabla = Table([self.encabezado], colWidths=anchos)
+        tabla.setStyle(TableStyle(ESTILO_TABLA))
+        return tabla.wrap(sum(anchos), 1 << 30)[1]
+
+    def wrap(self, ancho_disponible, alto_disponible):
+        self.width, self.height = ancho_disponible, alto_disponible + 1
+        return self.width, self.height
+
+    @staticmethod
+    def _alto_fila(fila: List[Paragraph], anchos: List[float]) -> float:
+        return max(p.wrap(ancho - 2 * PADDING_H, 1 << 30)[1] for p, ancho in zip(fila, anchos)) + 2 * PADDING_V
+
+    def _cortar(
+        self, fila: List[Paragraph], anchos: List[float], libre: float
+    ) -> Tuple[Optional[List[Paragraph]], Optional[List[Paragraph]]]:
+        # (lo que entra en libre, el resto); (None, fila) si no entra ni una
+        # línea de ninguna celda. Paragraph.split devuelve [] en ese caso, [p]
+        # si entra entera o [lo que entra, el resto].
+        arriba, abajo = [], []
+        for p, ancho in zip(fila, anchos):
+            partes = p.split(ancho - 2 * PADDING_H, libre - 2 * PADDING_V)
+            arriba.append(partes[0] if partes else _ParrafoCelda("", self.estilo_celda))
+            abajo.append(p if not partes else partes[1] if len(partes) > 1 else None)
+        if all(a is b for a, b in zip(abajo, fila)):
+            return None, fila
+        if all(p is None for p in abajo):
+            return arriba, None
+        return arriba, [p or _ParrafoCelda("", self.estilo_celda) for p in abajo]
+
+    def split(self, ancho_disponible, alto_disponible):
+        anchos = self._anchos(ancho_disponible)
+        alto_encabezado = self._alto_encabezado(anchos)
+        libre = alto_disponible - alto_encabezado
+        celdas, altos = [], []
+        i = self.inicio
+        fila = self.pendiente
+        while fila is not None or i < len(self.filas):
+            if fila is None:
+                fila = [_ParrafoCelda(escape(str(t)), self.estilo_celda) for t in self.filas[i]]
+                i += 1
+            alto = self._alto_fila(fila, anchos)
+            if alto > libre:
+                break
+            celdas.append(fila)
+            altos.append(alto)
+            libre -= alto
+            fila = None
+        # Una continuación siempre empieza en una página nueva y la primera
+        # parte, después de que reportlab la pospuso una vez: si ahí la fila
+        # no entra, es más alta que una página
+        en_pagina_nueva = self.inicio > 0 or self.pendiente is not None or getattr(self, "_postponed", False)
+        if fila is not None and not celdas and en_pagina_nueva:
+            arriba, fila = self._cortar(fila, anchos, libre)
+            if arriba is not None:
+                celdas.append(arriba)
+                altos.append(self._alto_fila(arriba, anchos))
+        if not celdas:
+            return []
+        tabla = Table([self.encabezado] + celdas, colWidths=anchos, rowHeights=[alto_encabezado] + altos)
+        tabla.setStyle(TableStyle(ESTILO_TABLA))
+        if fila is None and i >= len(self.filas):
+            return [tabla]
+        return [tabla, TablaPaginada(self.encabezado, self.filas, self.estilo_celda, self.anchos, i, fila)]
+
+    def draw(self):
+        # Nunca se dibuja: siempre se reemplaza por las Table de split
+        pass
+
+
+def recortar_con_apendice(
+    items: Sequence[str], limite: Optional[int], ruta_apendice: Union[str, Path], columna: str
+) -> Tuple[Sequence[str], int, Optional[Path]]:
+    """Deja los primeros `limite` ítems y escribe el resto en un CSV.
+
+    Devuelve (visibles, cantidad_en_apendice, ruta_del_apendice o None).
+    """
+    ruta_apendice = Path(ruta_apendice)
+    if limite is None or len(items) <= limite:
+        # Un apéndice de una corrida anterior ya no corresponde
+        if ruta_apendice.exists():
+            ruta_apendice.unlink()
+        return items, 0, None
+    resto = list(items[limite:])
+    pd.DataFrame({columna: resto}).to_csv(ruta_apendice, index=False, encoding="utf-8-sig")
+    return items[:limite], len(resto), ruta_apendice
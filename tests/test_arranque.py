@@ -0,0 +1,73 @@
+"""Arranque de feedback.py: los imports pesados se cargan solo donde hacen falta.
+
+Cada caso corre un intérprete nuevo con -X importtime y mira qué módulos
+terminó cargando. Los topes de tiempo son holgados a propósito: atrapan un
+import pesado o trabajo hecho al importar, no variaciones de la máquina.
+
+    python -m pytest tests
+"""
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from feedback import SUBCOMANDOS  # noqa: E402
+
+# Chequeos de encabezados y estructura: solo la biblioteca estándar
+LIVIANOS = ("verify", "standardize", "audit")
+MAXIMO_MS_LIVIANOS = 300
+MAXIMO_MS_PESADOS = 3000
+
+
+def _cargados(*argumentos):
+    """(código de salida, paquetes de primer nivel importados) de feedback.py"""
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "feedback.py", *argumentos],
+        cwd=RAIZ, capture_output=True, text=True,
+    )
+    paquetes = set()
+    for linea in proceso.stderr.splitlines():
+        partes = linea.removeprefix("import time:").split("|")
+        if len(partes) == 3:
+            paquetes.add(partes[2].strip().split(".")[0])
+    return proceso.returncode, paquetes
+
+
+class Arranque(unittest.TestCase):
+    def test_ayuda_general_sin_pesados(self):
+        codigo, cargados = _cargados("--help")
+        self.assertEqual(codigo, 0)
+        self.assertFalse({"pandas", "numpy", "reportlab"} & cargados)
+
+    def test_ayuda_de_subcomandos_livianos_sin_pesados(self):
+        for subcomando in LIVIANOS:
+            with self.subTest(subcomando=subcomando):
+                codigo, cargados = _cargados(subcomando, "--help")
+                self.assertEqual(codigo, 0)
+                self.assertFalse({"pandas", "numpy", "reportlab"} & cargados)
+
+    def test_reportlab_solo_para_el_informe(self):
+        for subcomando in SUBCOMANDOS:
+            if subcomando == "report":
+                continue
+            with self.subTest(subcomando=subcomando):
+                codigo, cargados = _cargados(subcomando, "--help")
+                self.assertEqual(codigo, 0)
+                self.assertNotIn("reportlab", cargados)
+
+    def test_importtime_por_subcomando(self):
+        for subcomando in SUBCOMANDOS:
+            maximo = MAXIMO_MS_LIVIANOS if subcomando in LIVIANOS else MAXIMO_MS_PESADOS
+            with self.subTest(subcomando=subcomando):
+                proceso = subprocess.run(
+                    [sys.executable, "feedback.py", "importtime", subcomando, "--maximo-ms", str(maximo)],
+                    cwd=RAIZ, capture_output=True, text=True,
+                )
+                self.assertEqual(proceso.returncode, 0, proceso.stdout + proceso.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
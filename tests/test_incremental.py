@@ -0,0 +1,117 @@
+"""La ejecución incremental debe dejar lo mismo que --full, también con --dedupe-key.
+
+Con una clave de negocio la fila descartada puede diferir de la que quedó, así
+que al borrar o editar el archivo que "ganó" la descartada tiene que volver sin
+que el manifest se declare inconsistente.
+
+    python -m pytest tests
+"""
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import normalize_and_merge as nm  # noqa: E402
+
+CLAVE = ["cedula_profesional", "fecha_envio"]
+ENCABEZADO = ",".join(nm.CANONICAL_COLS)
+
+
+def _fila(nombre: str, cedula: str, fecha: str, comentario: str) -> str:
+    return f"{nombre},5,4,8,5,4,Nada,{comentario},{fecha},{cedula},Lic. en Psicomotricidad"
+
+
+# feedback2 re-exporta envíos de feedback1 y feedback3 con otro comentario
+ARCHIVOS = {
+    "feedback1.csv": [
+        _fila("Ana", "111", "2025-09-01 10:00:00", "Primera versión"),
+        _fila("Beto", "222", "2025-09-02 10:00:00", "Sin cambios"),
+    ],
+    "feedback2.csv": [
+        _fila("Ana", "111", "2025-09-01 10:00:00", "Versión corregida"),
+        _fila("Carla", "333", "2025-09-03 10:00:00", "Agregaría gráficos"),
+        _fila("Beto", "222", "2025-09-02 10:00:00", "Sin cambios"),
+    ],
+    "feedback3.csv": [
+        _fila("Carla", "333", "2025-09-03 10:00:00", "Otra redacción"),
+        _fila("Dario", "444", "2025-09-04 10:00:00", "Muy útil"),
+    ],
+}
+
+
+def _escribir(base: Path, nombre: str, filas) -> None:
+    (base / nombre).write_text("\n".join([ENCABEZADO, *filas]) + "\n", encoding="utf-8")
+
+
+def _correr(base: Path, full: bool) -> str:
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        nm.process_all(full=full, dedupe_key=CLAVE, base_dir=base)
+    return salida.getvalue()
+
+
+def _resultado(base: Path):
+    unificado = base / nm.UNIFIED_NAME
+    return (
+        unificado.read_bytes() if unificado.exists() else None,
+        (base / nm.DEDUPE_STORE_NAME).read_text(encoding="ascii"),
+    )
+
+
+class IncrementalIgualACompleto(unittest.TestCase):
+    def setUp(self):
+        self.base = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.base)
+        for nombre, filas in ARCHIVOS.items():
+            _escribir(self.base, nombre, filas)
+        _correr(self.base, full=True)
+
+    def _comparar_con_completo(self) -> None:
+        salida = _correr(self.base, full=False)
+        self.assertNotIn("inconsistente", salida)
+        incremental = _resultado(self.base)
+        copia = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, copia)
+        for p in self.base.glob(nm.INPUT_PATTERN):
+            shutil.copy2(p, copia / p.name)
+        _correr(copia, full=True)
+        self.assertEqual(incremental, _resultado(copia))
+
+    def test_borrar_archivo_que_gano(self):
+        (self.base / "feedback1.csv").unlink()
+        self._comparar_con_completo()
+        self.assertIn(b"Versi\xc3\xb3n corregida", _resultado(self.base)[0])
+
+    def test_editar_archivo_que_gano(self):
+        filas = list(ARCHIVOS["feedback1.csv"])
+        filas[0] = _fila("Ana", "111", "2025-09-05 10:00:00", "Otro envío")
+        _escribir(self.base, "feedback1.csv", filas)
+        self._comparar_con_completo()
+
+    def test_editar_archivo_intermedio(self):
+        _escribir(self.base, "feedback2.csv", ARCHIVOS["feedback2.csv"][:1])
+        self._comparar_con_completo()
+        self.assertIn(b"Otra redacci\xc3\xb3n", _resultado(self.base)[0])
+
+    def test_agregar_despues_de_borrar(self):
+        (self.base / "feedback2.csv").unlink()
+        self._comparar_con_completo()
+        _escribir(self.base, "feedback4.csv", [_fila("Ana", "111", "2025-09-01 10:00:00", "Tercera")])
+        self._comparar_con_completo()
+        (self.base / "feedback1.csv").unlink()
+        self._comparar_con_completo()
+        self.assertIn(b"Tercera", _resultado(self.base)[0])
+
+    def test_borrar_todo(self):
+        for nombre in ARCHIVOS:
+            (self.base / nombre).unlink()
+        self._comparar_con_completo()
+
+
+if __name__ == "__main__":
+    unittest.main()
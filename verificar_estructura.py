@@ -1,18 +1,59 @@
-import pandas as pd
-import os
+"""Chequeo rápido de los encabezados de los feedback*.csv.
 
-archivos = ['feedback1.csv','feedback2.csv','feedback3.csv','feedback4.csv','feedback5.csv','feedback6.csv','feedback7.csv']
+Lee solo el comienzo de cada archivo con el módulo csv, sin pandas, así que
+termina en milisegundos. Para revisar filas y encoding está auditor_csv.py.
+"""
+import argparse
+import codecs
+import csv
+import io
+import sys
+from pathlib import Path
 
-print('🔍 VERIFICACIÓN DE ESTRUCTURA:')
-print('='*50)
+from esquema import COLUMNAS
 
-for f in archivos:
-    path = f'c:/Users/HP/AppData/Local/Programs/Python/Python313/evaluaciones/validacion/{f}'
-    if os.path.exists(path):
-        df = pd.read_csv(path, nrows=0)
-        print(f'✅ {f}: {len(df.columns)} columnas')
-        print(f'   Headers: {list(df.columns)[:3]}... (primeras 3)')
-    else:
-        print(f'❌ {f}: No encontrado')
+DELIMITADORES = ",;\t|"
+# Bytes que se leen para encontrar el encabezado (alcanza aunque tenga saltos de línea entre comillas)
+BLOQUE_ENCABEZADO = 1 << 16
 
-print('='*50)
\ No newline at end of file
+
+def leer_encabezado(path):
+    """Columnas de la primera fila del CSV, sin leer el resto del archivo"""
+    with open(path, 'rb') as f:
+        crudo = f.read(BLOQUE_ENCABEZADO)
+    try:
+        # final=False: el bloque puede cortar un carácter multibyte al final
+        texto = codecs.getincrementaldecoder('utf-8-sig')().decode(crudo, final=False)
+    except UnicodeDecodeError:
+        texto = crudo.decode('latin-1')
+    primera_linea = texto.split('\n', 1)[0]
+    delimitador = max(DELIMITADORES, key=primera_linea.count)
+    return next(csv.reader(io.StringIO(texto), delimiter=delimitador), [])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica los encabezados de los CSV de feedback")
+    parser.add_argument("--dir", default=".", help="carpeta con los CSV (por defecto la actual)")
+    parser.add_argument("--patron", default="feedback*.csv", help="glob de archivos a verificar")
+    args = parser.parse_args(argv)
+
+    archivos = sorted(Path(args.dir).glob(args.patron))
+    print('🔍 VERIFICACIÓN DE ESTRUCTURA:')
+    print('='*50)
+
+    todos_ok = bool(archivos)
+    for path in archivos:
+        columnas = leer_encabezado(path)
+        ok = columnas == COLUMNAS
+        todos_ok = todos_ok and ok
+        print(f"{'✅' if ok else '⚠️'} {path.name}: {len(columnas)} columnas")
+        print(f'   Headers: {columnas[:3]}... (primeras 3)')
+    if not archivos:
+        print(f'❌ No se encontraron archivos con el patrón {args.patron}')
+
+    print('='*50)
+    return 0 if todos_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""Modo vigilancia: unifica cada export nuevo apenas aparece en la carpeta.
+
+Revisa la carpeta cada `intervalo` segundos (polling con os.scandir, sin
+dependencias) buscando feedback*.csv nuevos, modificados o borrados. Un
+archivo se procesa recién cuando su tamaño y fecha de modificación no
+cambiaron durante `espera` segundos, así no se lee un export a medio
+escribir.
+
+Al arrancar se corre process_all una vez (incremental) y después se mantiene
+en memoria lo mismo que process_all reconstruye en cada corrida: las filas
+saneadas de cada archivo, los digests del deduplicador y las filas del
+unificado. Cada cambio lee solo el archivo tocado con read_csv_robust y:
+
+- si es un archivo nuevo que va último en el orden del glob, agrega sus
+  filas no duplicadas al final del unificado (como el camino incremental);
+- si no, vuelve a armar el unificado desde las filas en memoria, sin releer
+  los demás archivos.
+
+El resultado es el mismo, byte a byte, que correr normalize_and_merge.py, y
+el manifest y el archivo de digests quedan al día para esa próxima corrida.
+El estado (cola, última ingesta, latencias) se escribe en
+validacion_unificado.estado.json.
+
+    python vigilar.py [--intervalo 0.2] [--espera 0.5] [--sqlite]
+"""
+import argparse
+import json
+import os
+import signal
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import normalize_and_merge as nm
+from almacen import ALMACEN_NAME, Almacen
+from instrumentacion import etapa
+
+ESTADO_NAME = "validacion_unificado.estado.json"
+# Latencias recientes que se guardan para media, p95 y máximo
+HISTORIAL_LATENCIAS = 200
+
+Firma = Tuple[int, int]  # (tamaño, mtime_ns)
+
+
+def _ahora_iso() -> str:
+    return datetime.now().isoformat(timespec="milliseconds")
+
+
+class Vigilante:
+    """Estado en memoria de la unificación y el bucle de vigilancia"""
+
+    def __init__(
+        self,
+        base_dir: Path = nm.BASE_DIR,
+        intervalo: float = 0.2,
+        espera: float = 0.5,
+        dedupe_key: Optional[List[str]] = None,
+        repair_mojibake: bool = False,
+        sqlite: Optional[str] = None,
+    ):
+        self.base_dir = Path(base_dir)
+        self.intervalo = intervalo
+        self.espera = espera
+        self.dedupe_key = dedupe_key
+        self.repair_mojibake = repair_mojibake
+        self.sqlite = sqlite
+        self.unified = self.base_dir / nm.UNIFIED_NAME
+        self.estado_path = self.base_dir / ESTADO_NAME
+
+        # Por archivo: firma ingerida, entrada del manifest y filas saneadas
+        self.firmas: Dict[str, Firma] = {}
+        self.entradas: Dict[str, Dict[str, object]] = {}
+        self.filas: Dict[str, List[Tuple[str, ...]]] = {}
+        self.deduper = nm.RowDeduper(dedupe_key)
+        self.total_unificado = 0
+        self.store: Optional[Almacen] = None
+
+        # Cambios vistos y todavía no ingeridos: nombre -> (firma, visto_desde, estable_desde)
+        self.pendientes: Dict[str, Tuple[Optional[Firma], float, float]] = {}
+        self.latencias: List[float] = []
+        self.ingestas = 0
+        self.ultima: Optional[Dict[str, object]] = None
+        self.errores: List[str] = []
+        self.iniciado = _ahora_iso()
+
+    # --- Estado inicial ---
+
+    def arrancar(self) -> None:
+        """Pone al día el unificado y carga en memoria lo que hace falta para seguir"""
+        nm.process_all(
+            full=False, dedupe_key=self.dedupe_key, repair_mojibake=self.repair_mojibake,
+            sqlite=self.sqlite, base_dir=self.base_dir,
+        )
+        if self.sqlite:
+            self.store = Almacen(self.base_dir / self.sqlite)
+        manifest = nm.load_manifest(
+            self.base_dir / nm.MANIFEST_NAME, self.unified, self.dedupe_key, self.repair_mojibake
+        )
+        if manifest is None:
+            # Sin datos todavía: no hay unificado ni manifest
+            return
+        cached = nm._read_unified_rows(self.unified)
+        for nombre, entrada in manifest["files"].items():  # type: ignore[union-attr]
+            self.entradas[nombre] = entrada
+            self.firmas[nombre] = (int(entrada["size"]), int(entrada["mtime_ns"]))
+            try:
+                self.filas[nombre] = nm._cached_rows(entrada, cached)
+            except KeyError:
+                # Manifest sin alguna fila: se vuelve a leer ese archivo
+                _, df, _ = nm.process_file(self.base_dir / nombre, self.repair_mojibake)
+                self.filas[nombre] = list(df.itertuples(index=False, name=None)) if df is not None else []
+        expected = int((manifest.get("dedupe") or {}).get("seen", -1))  # type: ignore[union-attr]
+        self.deduper = nm.RowDeduper.load(self.base_dir / nm.DEDUPE_STORE_NAME, self.dedupe_key, expected)
+        self.total_unificado = len(cached)
+
+    # --- Detección de cambios ---
+
+    def escanear(self, ahora: float) -> None:
+        """Actualiza la cola de pendientes con lo que cambió desde la última ingesta"""
+        actuales: Dict[str, Firma] = {}
+        with os.scandir(self.base_dir) as it:
+            for e in it:
+                if e.is_file() and Path(e.name).match(nm.INPUT_PATTERN):
+                    st = e.stat()
+                    actuales[e.name] = (st.st_size, st.st_mtime_ns)
+
+        for nombre in set(actuales) | set(self.firmas) | set(self.pendientes):
+            firma = actuales.get(nombre)
+            if firma == self.firmas.get(nombre):
+                self.pendientes.pop(nombre, None)
+                continue
+            previo = self.pendientes.get(nombre)
+            if previo is None:
+                self.pendientes[nombre] = (firma, ahora, ahora)
+            elif previo[0] != firma:
+                # Se sigue escribiendo: se reinicia la espera, no la latencia
+                self.pendientes[nombre] = (firma, previo[1], ahora)
+
+    def listos(self, ahora: float) -> List[str]:
+        return sorted(n for n, (_, _, estable) in self.pendientes.items() if ahora - estable >= self.espera)
+
+    # --- Ingesta ---
+
+    def _leer(self, nombre: str) -> None:
+        path = self.base_dir / nombre
+        status, df, message = nm.process_file(path, self.repair_mojibake)
+        print(message)
+        ok = status == "OK" and df is not None
+        filas = list(df.itertuples(index=False, name=None)) if ok else []
+        if status == "ERROR":
+            self.errores = (self.errores + [f"{_ahora_iso()} {message}"])[-20:]
+        self.filas[nombre] = filas
+        self.entradas[nombre] = nm._file_entry(path, status, message, filas, df.attrs.get("encoding") if ok else None)
+
+    def ingerir(self, nombres: List[str]) -> None:
+        inicio = time.monotonic()
+        vistos = {n: self.pendientes[n] for n in nombres}
+        conocidos = set(self.filas)
+        borrados = [n for n in nombres if vistos[n][0] is None]
+        nuevos = [n for n in nombres if n not in conocidos and vistos[n][0] is not None]
+        ultimo_conocido = max(conocidos - set(nombres), default="")
+        solo_agrega = not borrados and len(nuevos) == len(nombres) and all(n > ultimo_conocido for n in nombres)
+
+        with etapa("watch_ingest", ",".join(nombres)) as medida:
+            for nombre in borrados:
+                print(f"[WATCH] {nombre} borrado")
+                for d in (self.firmas, self.entradas, self.filas):
+                    d.pop(nombre, None)
+            for nombre in nombres:
+                if nombre not in borrados:
+                    self._leer(nombre)
+                    self.firmas[nombre] = vistos[nombre][0]  # type: ignore[assignment]
+
+            if solo_agrega and self.unified.exists():
+                modo, agregadas = "append", self._agregar(nombres)
+            else:
+                modo, agregadas = "rebuild", self._reconstruir()
+            medida["filas"] = sum(len(self.filas.get(n, [])) for n in nombres)
+
+        fin = time.monotonic()
+        # Latencia: desde que se vio el primer cambio hasta que el unificado quedó escrito
+        latencia = fin - min(visto for _, visto, _ in vistos.values())
+        self.deduper.save(self.base_dir / nm.DEDUPE_STORE_NAME)
+        nm.save_manifest(
+            self.base_dir / nm.MANIFEST_NAME, self.unified,
+            {n: self.entradas[n] for n in sorted(self.entradas)}, self.deduper, self.repair_mojibake,
+        )
+        for nombre in nombres:
+            self.pendientes.pop(nombre, None)
+        self.ingestas += 1
+        self.latencias = (self.latencias + [latencia])[-HISTORIAL_LATENCIAS:]
+        self.ultima = {
+            "archivos": nombres,
+            "modo": modo,
+            "filas_agregadas": agregadas,
+            "segundos_proceso": round(fin - inicio, 4),
+            "latencia_s": round(latencia, 4),
+            "fin": _ahora_iso(),
+        }
+        print(f"[WATCH] {', '.join(nombres)}: {modo}, latencia {latencia:.3f} s")
+
+    def _agregar(self, nombres: List[str]) -> int:
+        filas: List[Tuple[str, ...]] = []
+        origenes: List[Tuple[str, int]] = []
+        descartadas = {}
+        for nombre in nombres:
+            descartadas[nombre] = nm._keep_with_origin(self.deduper, nombre, self.filas[nombre], filas, origenes)
+        nm._record_dropped(self.deduper, self.entradas, origenes, descartadas)
+        for line in self.deduper.report():
+            print(line)
+        self.deduper.dropped.clear()
+        if not filas:
+            return 0
+        parquet_ok = nm._parquet_in_sync(self.unified)
+        store_ok = self.store is not None and self.store.en_sincronia(self.unified)
+        nm._write_unified(self.unified, filas, append=True)
+        self.total_unificado += len(filas)
+        print(f"[OK]   Unificado -> {self.unified.name}  filas agregadas={len(filas)}")
+        if nm.pyarrow is not None:
+            if parquet_ok:
+                nm.write_parquet(self.unified.with_suffix(".parquet"), filas, append=True)
+            else:
+                nm.write_parquet(self.unified.with_suffix(".parquet"), list(nm._read_unified_rows(self.unified).values()))
+        if self.store is not None:
+            if store_ok:
+                nm.sync_store(self.store, self.unified, filas, origenes, append=True)
+            else:
+                nm._rebuild_store(self.store, self.unified, [self.base_dir / n for n in sorted(self.entradas)], self.entradas)
+        return len(filas)
+
+    def _reconstruir(self) -> int:
+        self.deduper = nm.RowDeduper(self.dedupe_key)
+        filas: List[Tuple[str, ...]] = []
+        origenes: List[Tuple[str, int]] = []
+        descartadas = {}
+        for nombre in sorted(self.filas):
+            descartadas[nombre] = nm._keep_with_origin(self.deduper, nombre, self.filas[nombre], filas, origenes)
+        nm._record_dropped(self.deduper, self.entradas, origenes, descartadas)
+        for line in self.deduper.report():
+            print(line)
+        self.deduper.dropped.clear()
+        previo = self.total_unificado
+        self.total_unificado = len(filas)
+        if not filas:
+            nm.remove_outputs(self.unified, self.store)
+            print("[WARN] No se generó un archivo unificado: no hay datos")
+            return -previo
+        nm._write_unified(self.unified, filas)
+        print(f"[OK]   Unificado -> {self.unified.name}  filas={len(filas)}")
+        nm.write_parquet(self.unified.with_suffix(".parquet"), filas)
+        if self.store is not None:
+            nm.sync_store(self.store, self.unified, filas, origenes)
+        return len(filas) - previo
+
+    # --- Estado ---
+
+    def escribir_estado(self, situacion: str) -> None:
+        ahora = time.monotonic()
+        latencias = sorted(self.latencias)
+        estado = {
+            "pid": os.getpid(),
+            "estado": situacion,
+            "iniciado": self.iniciado,
+            "actualizado": _ahora_iso(),
+            "cola": len(self.pendientes),
+            "pendientes": {
+                n: {"esperando_s": round(ahora - visto, 3), "borrado": firma is None}
+                for n, (firma, visto, _) in sorted(self.pendientes.items())
+            },
+            "archivos": len(self.filas),
+            "filas_unificadas": self.total_unificado,
+            "ingestas": self.ingestas,
+            "ultima_ingesta": self.ultima,
+            "latencia_s": {
+                "ultima": round(self.latencias[-1], 4) if latencias else None,
+                "media": round(sum(latencias) / len(latencias), 4) if latencias else None,
+                "p95": round(latencias[min(len(latencias) - 1, int(0.95 * len(latencias)))], 4) if latencias else None,
+                "max": round(latencias[-1], 4) if latencias else None,
+            },
+            "errores": self.errores,
+        }
+        tmp = self.estado_path.with_name(self.estado_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(estado, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.estado_path)
+
+    def correr(self, duracion: Optional[float] = None) -> None:
+        """Bucle principal; termina con Ctrl+C, SIGTERM o después de `duracion` segundos"""
+        self.arrancar()
+        print(f"[WATCH] Vigilando {self.base_dir / nm.INPUT_PATTERN} cada {self.intervalo} s (espera {self.espera} s)")
+        self.escribir_estado("vigilando")
+        fin = time.monotonic() + duracion if duracion is not None else None
+        cola_previa = 0
+        try:
+            while fin is None or time.monotonic() < fin:
+                ahora = time.monotonic()
+                self.escanear(ahora)
+                listos = self.listos(ahora)
+                if listos:
+                    self.escribir_estado("ingiriendo")
+                    try:
+                        self.ingerir(listos)
+                    except Exception as e:
+                        # Un archivo que no se pudo ingerir vuelve a intentarse cuando cambie
+                        for nombre in listos:
+                            firma = self.pendientes.pop(nombre, (None,))[0]
+                            self.firmas[nombre] = firma  # type: ignore[assignment]
+                        self.errores = (self.errores + [f"{_ahora_iso()} {', '.join(listos)}: {e}"])[-20:]
+                        print(f"[ERROR] {', '.join(listos)}: {e}")
+                if listos or len(self.pendientes) != cola_previa:
+                    self.escribir_estado("vigilando")
+                    cola_previa = len(self.pendientes)
+                time.sleep(self.intervalo)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.escribir_estado("detenido")
+            if self.store is not None:
+                self.store.close()
+            print("[WATCH] Detenido")
+
+
+def _terminar(*_) -> None:
+    raise KeyboardInterrupt
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Vigila la carpeta y unifica cada feedback*.csv nuevo o modificado")
+    parser.add_argument("--dir", type=Path, default=nm.BASE_DIR, help="carpeta a vigilar (por defecto la del script)")
+    parser.add_argument("--intervalo", type=float, default=0.2, help="segundos entre revisiones de la carpeta")
+    parser.add_argument("--espera", type=float, default=0.5,
+                        help="segundos sin cambios antes de leer un archivo (evita leerlo a medio escribir)")
+    parser.add_argument("--duracion", type=float, help="terminar después de estos segundos (por defecto nunca)")
+    parser.add_argument(
+        "--dedupe-key",
+        type=lambda v: [c.strip() for c in v.split(",") if c.strip()],
+        default=None,
+        metavar="COL[,COL...]",
+        help="clave de negocio para duplicados, igual que en normalize_and_merge.py",
+    )
+    parser.add_argument("--reparar-mojibake", dest="repair_mojibake", action="store_true",
+                        help="reparar texto doblemente codificado al leer cada archivo")
+    parser.add_argument("--sqlite", nargs="?", const=ALMACEN_NAME, metavar="RUTA",
+                        help=f"mantener también la base SQLite (por defecto {ALMACEN_NAME})")
+    args = parser.parse_args(argv)
+
+    # SIGTERM (systemd, docker stop) termina igual que Ctrl+C
+    signal.signal(signal.SIGTERM, _terminar)
+    Vigilante(
+        args.dir, args.intervalo, args.espera, args.dedupe_key, args.repair_mojibake, args.sqlite
+    ).correr(args.duracion)
+
+
+if __name__ == "__main__":
+    main()